@@ -0,0 +1,321 @@
+#Benchmark suite for the gameplay hot paths
+#Times each hot path on seeded synthetic scenes at several sizes & writes the results as JSON
+#
+#   python benchmarks/run_benchmarks.py                         # full suite, JSON to stdout
+#   python benchmarks/run_benchmarks.py -o results.json         # ...or to a file
+#   python benchmarks/run_benchmarks.py --quick --filter enemy  # fewer iterations, matching cases only
+#   python benchmarks/run_benchmarks.py -o new.json --compare old.json   # flag regressions
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import scenes
+from scenes import arcade, np, settings
+from tilemap import TileMapLoader
+from enemies.enemy_physics import EnemyPhysicsBatch
+from enemies.goomba import Goomba
+from entities.coin import Coin
+from utils.object_pool import get_pool
+
+SUITE_VERSION = 1
+ENTITY_SCALES = (10, 1000, 10000)
+LEVEL_WIDTHS = (100, 1000, 10000)
+DELTA_TIME = settings.FIXED_TIMESTEP
+
+def case_key(name, params):
+    return name + ''.join(f" {k}={v}" for k, v in sorted(params.items()))
+
+def iterations_for(count, budget=200000, low=10, high=2000):
+    #Bigger scenes get fewer iterations, fixed per scale so runs stay comparable
+    return max(low, min(high, budget // max(1, count)))
+
+def keep_alive(run, *objects):
+    #Ties objects to the timed callable - the animation manager only holds its sprites weakly,
+    #so a scene's sprites would otherwise be collected before timing starts
+    run.keep_alive = objects
+    return run
+
+class Case:
+    #One benchmark: name, parameters & a setup() returning the callable to time
+
+    def __init__(self, name, params, setup, iterations, warmup=None):
+        self.name = name
+        self.params = params
+        self.setup = setup
+        self.iterations = iterations
+        self.warmup = warmup if warmup is not None else max(1, iterations // 10)
+
+    @property
+    def key(self):
+        return case_key(self.name, self.params)
+
+def physics_case(width):
+    def setup():
+        tilemap, player, engine = scenes.physics_scene(width)
+        spawn_x, spawn_y = tilemap.player_spawn
+        end_x = (width - 4) * tilemap.tile_size
+        tick = [0]
+
+        def run():
+            #Runs right, jumping every 40 ticks, & starts over at the end of the level or in a pit
+            tick[0] += 1
+            if player.center_x > end_x or player.center_y < -100:
+                player.center_x, player.center_y = spawn_x, spawn_y
+                player.change_y = 0
+            player.change_x = settings.PLAYER_MOVEMENT_SPEED
+            if tick[0] % 40 == 0 and engine.can_jump():
+                player.change_y = settings.PLAYER_JUMP_SPEED
+            engine.update()
+        return run
+
+    return Case('physics_engine.update', {'level_width': width}, setup, 2000)
+
+def enemy_update_case(count, storage):
+    def setup():
+        _, manager, player = scenes.enemy_scene(count, compact=storage == 'compact')
+        return lambda: manager.update(DELTA_TIME, player)
+
+    return Case('enemy_manager.update', {'entities': count, 'storage': storage}, setup, iterations_for(count))
+
+def enemy_physics_case(count, storage):
+    def setup():
+        tilemap, manager, _ = scenes.enemy_scene(count, compact=storage == 'compact')
+        grid = tilemap.build_collision_grid()
+        if manager.store is not None:
+            return lambda: manager.store.step_physics(grid)
+
+        batch = EnemyPhysicsBatch()
+        return lambda: batch.step(manager.enemy_list, grid)
+
+    return Case('enemy_physics.step', {'entities': count, 'storage': storage}, setup, iterations_for(count))
+
+def enemy_interactions_case(count, storage):
+    def setup():
+        _, manager, player = scenes.enemy_scene(count, compact=storage == 'compact')
+        player.center_y = 400  # Clear of every enemy, so the broad phase is what gets timed
+        return lambda: manager.check_player_interactions(player)
+
+    return Case('enemy_manager.check_player_interactions', {'entities': count, 'storage': storage}, setup, iterations_for(count))
+
+def coin_case(count):
+    def setup():
+        manager, player = scenes.coin_scene(count)
+        return lambda: manager.update(DELTA_TIME, player)
+
+    return Case('coin_manager.update', {'entities': count}, setup, iterations_for(count))
+
+def coin_collection_case(count):
+    def setup():
+        manager, player = scenes.coin_scene(count)
+        return lambda: manager.check_player_collection(player)
+
+    return Case('coin_manager.check_player_collection', {'entities': count}, setup, iterations_for(count))
+
+def animation_case(count):
+    def setup():
+        manager, sprites = scenes.animation_scene(count)
+        return keep_alive(lambda: manager.update_all(DELTA_TIME), sprites)
+
+    return Case('animation_manager.update_all', {'entities': count}, setup, iterations_for(count))
+
+def animation_group_case(count):
+    def setup():
+        manager, sprites = scenes.animation_group_scene(count)
+        return keep_alive(lambda: manager.update_all(DELTA_TIME), sprites)
+
+    return Case('animation_manager.update_all', {'entities': count, 'mode': 'groups'}, setup, iterations_for(count))
+
+def level_restart_case(count, pooling):
+    def setup():
+        for pool in (get_pool(Goomba), get_pool(Coin)):
+            pool.enabled = pooling == 'on'
+            pool.clear()
+        _, _, restart = scenes.restart_scene(count)
+        return restart
+
+    return Case('level.restart', {'entities': count, 'pooling': pooling}, setup, iterations_for(count, budget=20000))
+
+def tmx_cases(width, directory):
+    #Same generated TMX through the tile reader & the compiled cache
+    path = os.path.join(directory, f'bench-{width}.tmx')
+    iterations = 20 if width <= 1000 else 3
+
+    def tile_reader():
+        scenes.write_tmx(path, width)
+        return lambda: TileMapLoader.read_tiled_tmx(path)
+
+    def compiled():
+        from level_cache import load_compiled_level
+        scenes.write_tmx(path, width)
+        load_compiled_level(path, rebuild=True)
+        return lambda: load_compiled_level(path)
+
+    return [
+        Case('tilemap.read_tiled_tmx', {'level_width': width}, tile_reader, iterations, warmup=1),
+        Case('level_cache.load_compiled_level', {'level_width': width}, compiled, iterations * 10, warmup=1)
+    ]
+
+def build_suite(directory):
+    cases = [physics_case(width) for width in LEVEL_WIDTHS]
+    for storage in ('sprites', 'compact'):
+        cases += [enemy_update_case(count, storage) for count in ENTITY_SCALES]
+        cases += [enemy_physics_case(count, storage) for count in ENTITY_SCALES]
+        cases += [enemy_interactions_case(count, storage) for count in ENTITY_SCALES]
+    cases += [coin_case(count) for count in ENTITY_SCALES]
+    cases += [coin_collection_case(count) for count in ENTITY_SCALES]
+    cases += [animation_case(count) for count in ENTITY_SCALES]
+    cases += [animation_group_case(count) for count in ENTITY_SCALES]
+    for pooling in ('off', 'on'):
+        cases += [level_restart_case(count, pooling) for count in ENTITY_SCALES]
+    for width in LEVEL_WIDTHS:
+        cases += tmx_cases(width, directory)
+    return cases
+
+def time_case(case, seed, quick=False):
+    iterations = max(1, case.iterations // 10) if quick else case.iterations
+    scenes.seed_everything(seed)
+
+    result = {'name': case.name, 'params': case.params, 'unit': 'ms'}
+    try:
+        setup_start = time.perf_counter()
+        run = case.setup()
+        result['setup_s'] = round(time.perf_counter() - setup_start, 4)
+
+        for _ in range(case.warmup):
+            run()
+
+        #Collector off while timing, like timeit - a stray collection would land in one sample
+        gc.collect()
+        gc.disable()
+        samples = []
+        try:
+            for _ in range(iterations):
+                start = time.perf_counter_ns()
+                run()
+                samples.append((time.perf_counter_ns() - start) / 1e6)
+        finally:
+            gc.enable()
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        return result
+
+    result.update({
+        'iterations': iterations,
+        'min': round(min(samples), 6),
+        'median': round(statistics.median(samples), 6),
+        'mean': round(statistics.fmean(samples), 6),
+        'p95': round(float(np.percentile(samples, 95)), 6),
+        'stdev': round(statistics.pstdev(samples), 6)
+    })
+    return result
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'arcade': arcade.__version__,
+        'numpy': np.__version__,
+        'git_commit': commit,
+        'settings': {
+            'FIXED_TIMESTEP': settings.FIXED_TIMESTEP,
+            'TILE_SIZE': settings.TILE_SIZE,
+            'COMPACT_ENEMY_STORAGE': settings.COMPACT_ENEMY_STORAGE,
+            'ACTIVATION_WINDOW': settings.ACTIVATION_WINDOW
+        }
+    }
+
+def compare(results, baseline_path, threshold):
+    #Prints median ratios against a baseline run, returns the cases slower by more than threshold
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    def key(entry):
+        return case_key(entry['name'], entry['params'])
+
+    previous = {key(entry): entry for entry in baseline['results'] if 'median' in entry}
+    regressions = []
+    for entry in results:
+        old = previous.get(key(entry))
+        if not old or 'median' not in entry or old['median'] <= 0:
+            continue
+
+        ratio = entry['median'] / old['median']
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  REGRESSION'
+            regressions.append(key(entry))
+        print(f"{key(entry):<72}{old['median']:>10.4f}{entry['median']:>10.4f}  x{ratio:.2f}{flag}", file=sys.stderr)
+
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the gameplay hot paths")
+    parser.add_argument('-o', '--output', help="write JSON here instead of stdout")
+    parser.add_argument('--filter', default='', help="only run cases whose name contains this")
+    parser.add_argument('--quick', action='store_true', help="a tenth of the iterations, for smoke runs")
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--compare', help="baseline JSON from an earlier run")
+    parser.add_argument('--threshold', type=float, default=0.25, help="allowed median slowdown vs the baseline")
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp(prefix='platformer-bench-')
+    results = []
+    try:
+        for case in build_suite(directory):
+            if args.filter not in case.key:
+                continue
+
+            print(f"{case.key} ...", file=sys.stderr, flush=True)
+            #Gameplay code prints events (stomps, falls) - keep them out of the timings & the JSON
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                result = time_case(case, args.seed, args.quick)
+            results.append(result)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    report = {
+        'suite': 'gameplay-hot-paths',
+        'version': SUITE_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'config': {'seed': args.seed, 'quick': args.quick, 'filter': args.filter},
+        'environment': environment(),
+        'results': results
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
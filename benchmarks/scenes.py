@@ -0,0 +1,214 @@
+#Synthetic scenes for the benchmark suite
+#Everything is generated from a seed so two runs (or two releases) time the same work
+import os
+import random
+import sys
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import arcade
+import settings
+from PIL import Image
+from tilemap import TileMap, TileType
+from physics import PlatformPhysicsEngine
+from user import Player
+from entities.coin import CoinManager
+from enemies.enemy_base import EnemyManager
+from enemies.goomba import Goomba
+from utils.animation import AnimationManager, AnimationController, Animation, mirror_frames
+
+LEVEL_HEIGHT = 20
+GOOMBA_VARIANTS = ('normal', 'fast', 'large', 'elite')
+
+def seed_everything(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+
+def flat_level(width, seed=0):
+    #Two rows of ground with gaps, brick platforms & pipes scattered over `width` columns
+    rng = random.Random(seed)
+    tilemap = TileMap(width, LEVEL_HEIGHT)
+    tilemap.name = f"bench-{width}"
+
+    for x in range(width):
+        if x > 8 and x % 53 == 0:
+            continue  # Pit
+        tilemap.set_tile(x, 0, TileType.GROUND)
+        tilemap.set_tile(x, 1, TileType.GROUND)
+
+    for x in range(12, width - 4, 17):
+        y = rng.randint(4, 8)
+        for offset in range(rng.randint(2, 5)):
+            tilemap.set_tile(x + offset, y, rng.choice((TileType.BRICK, TileType.BRICK, TileType.QUESTION_BLOCK)))
+
+    for x in range(30, width - 2, 41):
+        for y in range(2, 2 + rng.randint(1, 3)):
+            tilemap.set_tile(x, y, TileType.PIPE)
+
+    tilemap.player_spawn = tilemap.grid_to_pixel(3, 3)
+    return tilemap
+
+def spread_positions(count, width_px, seed=0, y=None):
+    #`count` x positions spread over the level, deterministic for a seed
+    rng = random.Random(seed)
+    step = width_px / max(1, count)
+    positions = []
+    for i in range(count):
+        x = step * i + rng.uniform(0, step * 0.5) + 16
+        positions.append((x, y if y is not None else rng.uniform(96, 320)))
+    return positions
+
+def make_player(x, y):
+    player = Player()
+    player.setup(x, y)
+    return player
+
+def physics_scene(width, seed=0):
+    #Player running & jumping over a generated level, resolved against its collision grid
+    tilemap = flat_level(width, seed)
+    player = make_player(*tilemap.player_spawn)
+    engine = PlatformPhysicsEngine(
+        player, arcade.SpriteList(use_spatial_hash=True),
+        gravity=settings.GRAVITY,
+        collision_grid=tilemap.build_collision_grid()
+    )
+    return tilemap, player, engine
+
+def enemy_scene(count, seed=0, compact=False):
+    #`count` goombas spread over a level wide enough for them, player parked in the middle
+    width = max(100, count)
+    width_px = width * settings.TILE_SIZE
+    tilemap = flat_level(width, seed)
+
+    manager = EnemyManager(compact=compact)
+    manager.collision_method = 3  # CPU hit tests, same as headless runs
+    rng = random.Random(seed)
+    for x, _ in spread_positions(count, width_px, seed, y=96):
+        manager.add_enemy(Goomba, x, 96, variant=rng.choice(GOOMBA_VARIANTS))
+
+    player = make_player(width_px / 2, 96)
+    return tilemap, manager, player
+
+def coin_scene(count, seed=0):
+    width_px = max(100, count) * settings.TILE_SIZE
+    manager = CoinManager()
+    for x, y in spread_positions(count, width_px, seed):
+        manager.add_coin(x, y)
+
+    player = make_player(width_px / 2, 128)
+    return manager, player
+
+def animation_scene(count, frames=4, seed=0):
+    #`count` sprites, each with a looping walk animation of `frames` generated textures
+    rng = random.Random(seed)
+    textures = [
+        arcade.Texture(Image.new('RGBA', (32, 32), (40 * i, 120, 200, 255)), hash=f"bench-frame-{i}")
+        for i in range(frames)
+    ]
+
+    mirrored = mirror_frames(textures)
+
+    manager = AnimationManager()
+    sprites = []
+    for i in range(count):
+        sprite = arcade.Sprite(textures[0])
+        sprite.change_x = rng.choice((-1, 1))
+        controller = AnimationController(sprite)
+        controller.add_anmiation(Animation(
+            'walk', textures, frame_duration=rng.choice((0.08, 0.1, 0.15)), mirrored_frames=mirrored
+        ))
+        manager.controllers[sprite] = controller
+        sprites.append(sprite)
+
+    return manager, sprites
+
+def animation_group_scene(count, frames=4, seed=0):
+    #Same crowd as animation_scene, but on shared clocks - groups per phase instead of a controller per sprite
+    rng = random.Random(seed)
+    textures = [
+        arcade.Texture(Image.new('RGBA', (32, 32), (40 * i, 120, 200, 255)), hash=f"bench-frame-{i}")
+        for i in range(frames)
+    ]
+
+    manager = AnimationManager()
+    manager.animation_definitions['bench'] = {'walk': {'frames': [f"bench-frame-{i}" for i in range(frames)], 'duration': 0.1}}
+    manager.frame_sets[('bench', 'walk')] = (textures, mirror_frames(textures))
+    sprites = []
+    for i in range(count):
+        sprite = arcade.Sprite(textures[0])
+        sprite.change_x = rng.choice((-1, 1))
+        manager.join_group(sprite, 'bench', 'walk')
+        sprites.append(sprite)
+
+    return manager, sprites
+
+def restart_scene(count, seed=0):
+    #`count` goombas & coins plus a restart() that clears both managers & spawns the same level again
+    width_px = max(100, count) * settings.TILE_SIZE
+    rng = random.Random(seed)
+    enemies = [(x, rng.choice(GOOMBA_VARIANTS)) for x, _ in spread_positions(count, width_px, seed, y=96)]
+    coins = spread_positions(count, width_px, seed + 1)
+
+    enemy_manager = EnemyManager(compact=False)
+    coin_manager = CoinManager()
+
+    def restart():
+        enemy_manager.reset()
+        coin_manager.reset()
+        for x, variant in enemies:
+            enemy_manager.add_enemy(Goomba, x, 96, variant=variant)
+        for x, y in coins:
+            coin_manager.add_coin(x, y)
+
+    restart()
+    return enemy_manager, coin_manager, restart
+
+def write_tmx(path, width, seed=0):
+    #TMX in the layout of levels/*.tmx (Terrain & Collectibles layers, Objects group) plus its tileset image
+    tilemap = flat_level(width, seed)
+    directory = os.path.dirname(path)
+    tileset_path = os.path.join(directory, 'tileset.png')
+    if not os.path.exists(tileset_path):
+        Image.new('RGBA', (96, 96), (150, 90, 40, 255)).save(tileset_path)
+
+    tile_px = tilemap.tile_size
+    terrain_rows = []
+    coin_rows = []
+    for y in reversed(range(tilemap.height)):
+        #gid = tileset tile id + firstgid (1), the tileset declares tile id n as TileType n
+        terrain_rows.append(','.join(str(value + 1) if value else '0' for value in tilemap.tiles[y]))
+        coin_rows.append(','.join(
+            str(TileType.COIN + 1) if y == 3 and x % 7 == 0 else '0' for x in range(tilemap.width)
+        ))
+    tile_types = ''.join(f'  <tile id="{value}" type="{name}"/>\n' for name, value in TileType.NAMES.items())
+
+    objects = [f'  <object id="1" name="player_spawn" type="spawn" x="96" y="{(LEVEL_HEIGHT - 3) * tile_px}"/>']
+    for index, x in enumerate(range(200, width * tile_px - 64, 640)):
+        objects.append(
+            f'  <object id="{index + 2}" name="goomba_spawn_{index}" type="spawn" x="{x}" y="{(LEVEL_HEIGHT - 3) * tile_px}">\n'
+            '   <properties>\n'
+            '    <property name="spawn_type" value="enemy"/>\n'
+            '    <property name="enemy_type" value="goomba"/>\n'
+            '   </properties>\n'
+            '  </object>'
+        )
+
+    with open(path, 'w') as f:
+        f.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<map version="1.10" tiledversion="1.10.2" orientation="orthogonal" renderorder="right-down" '
+            f'width="{width}" height="{LEVEL_HEIGHT}" tilewidth="{tile_px}" tileheight="{tile_px}" infinite="0" '
+            f'nextlayerid="4" nextobjectid="{len(objects) + 1}">\n'
+            f' <tileset firstgid="1" name="bench_tiles" tilewidth="{tile_px}" tileheight="{tile_px}" tilecount="9" columns="3">\n'
+            '  <image source="tileset.png" width="96" height="96"/>\n'
+            + tile_types +
+            ' </tileset>\n'
+            f' <layer id="1" name="Terrain" width="{width}" height="{LEVEL_HEIGHT}">\n'
+            '  <data encoding="csv">\n' + ',\n'.join(terrain_rows) + '\n  </data>\n </layer>\n'
+            f' <layer id="2" name="Collectibles" width="{width}" height="{LEVEL_HEIGHT}">\n'
+            '  <data encoding="csv">\n' + ',\n'.join(coin_rows) + '\n  </data>\n </layer>\n'
+            ' <objectgroup id="3" name="Objects">\n' + '\n'.join(objects) + '\n </objectgroup>\n'
+            '</map>\n'
+        )
+    return path
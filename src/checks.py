@@ -0,0 +1,213 @@
+#Component checks for python src/simulation.py --check
+#Each check builds its own small fixture & returns a list of failures, empty when everything passed
+import os
+import json
+import shutil
+import tempfile
+import arcade
+import settings
+from physics import CollisionGrid
+from tilemap import TileMap, TileType
+from level_streaming import ChunkedLevel
+from utils.timestep import FixedTimestep
+from utils.object_pool import ObjectPool
+from utils.activation import ActivationWindow, ColumnBuckets
+
+TILE = 32
+
+def _expect(failures, condition, message):
+    if not condition:
+        failures.append(message)
+
+def _close(a, b):
+    return abs(a - b) < 1e-9
+
+def check_fixed_timestep():
+    failures = []
+    timestep = FixedTimestep(step=0.01, max_steps=3)
+    ticks = []
+
+    steps = timestep.advance(0.025, ticks.append)
+    _expect(failures, steps == 2 and ticks == [0.01, 0.01], f"0.025s ran {steps} ticks, expected 2")
+    _expect(failures, _close(timestep.alpha, 0.5), f"alpha after 0.025s is {timestep.alpha}, expected 0.5")
+
+    #0.105s due with 3 ticks allowed - the rest of the backlog is dropped, the sub-tick remainder kept
+    steps = timestep.advance(0.1, ticks.append)
+    _expect(failures, steps == 3, f"backlog frame ran {steps} ticks, expected max_steps (3)")
+    _expect(failures, _close(timestep.dropped_time, 0.07), f"dropped {timestep.dropped_time}s, expected 0.07s")
+    _expect(failures, timestep.accumulator < timestep.step, f"accumulator {timestep.accumulator} left a whole tick due")
+    _expect(failures, 0.0 <= timestep.alpha < 1.0, f"alpha {timestep.alpha} out of range after a dropped backlog")
+
+    #A step function returning False (level ended) stops the frame & clears what was due
+    steps = timestep.advance(0.05, lambda step: False)
+    _expect(failures, steps == 0 and timestep.accumulator == 0.0, "stopped tick didn't clear the accumulator")
+    _expect(failures, timestep.total_steps == 5, f"total_steps {timestep.total_steps}, expected 5")
+    return failures
+
+def check_collision_grid():
+    failures = []
+    #6x4 cells: floor on row 0, wall in column 4
+    tiles = [[TileType.EMPTY] * 6 for _ in range(4)]
+    tiles[0] = [TileType.GROUND] * 6
+    for row in range(1, 4):
+        tiles[row][4] = TileType.BRICK
+    grid = CollisionGrid.from_tiles(tiles, TileType.SOLID_TYPES, TILE)
+
+    #Body in cell (1, 1), 20px wide
+    left, bottom, right, top = 1 * TILE, 1 * TILE, 1 * TILE + 20, 1 * TILE + 20
+
+    dx, hits = grid.sweep_x(left, bottom, right, top, 10)
+    _expect(failures, dx == 10 and not hits, f"clear sweep_x moved {dx} with hits {hits}")
+
+    #Far faster than a tile per tick - has to stop at the wall, not tunnel through it
+    dx, hits = grid.sweep_x(left, bottom, right, top, 500)
+    _expect(failures, _close(dx, 4 * TILE - right), f"sweep_x into the wall allowed {dx}, expected {4 * TILE - right}")
+    _expect(failures, hits == [(4, 1)], f"sweep_x into the wall hit {hits}, expected [(4, 1)]")
+
+    dy, hits = grid.sweep_y(left, bottom + 40, right, top + 40, -500)
+    _expect(failures, _close(dy, TILE - (bottom + 40)), f"sweep_y onto the floor allowed {dy}")
+    _expect(failures, hits == [(1, 0)], f"sweep_y onto the floor hit {hits}, expected [(1, 0)]")
+
+    #Two chunks stitched left to right keep every cell & callback sprite in place
+    left_grid = CollisionGrid.from_tiles([row[:3] for row in tiles], TileType.SOLID_TYPES, TILE)
+    right_grid = CollisionGrid.from_tiles([row[3:] for row in tiles], TileType.SOLID_TYPES, TILE)
+    right_grid.origin_x = 3 * TILE
+    marker = object()
+    right_grid.cell_sprites[2 * right_grid.width + 1] = marker  # Wall cell (4, 2)
+
+    stitched = CollisionGrid.stitch([left_grid, right_grid])
+    _expect(failures, stitched.width == 6 and stitched.solid == grid.solid, "stitched chunks differ from the whole grid")
+    _expect(failures, stitched.sprite_at(4, 2) is marker, "stitch lost a chunk's cell sprite")
+    return failures
+
+def check_chunk_write_back():
+    failures = []
+    tilemap = TileMap(12, 4, TILE)
+    for x in range(12):
+        tilemap.set_tile(x, 0, TileType.GROUND)
+    tilemap.set_tile(1, 2, TileType.BRICK)
+
+    level = ChunkedLevel(tilemap, chunk_columns=4)
+    level.update(0, 3 * TILE)
+    chunk = level.chunks[0]
+    brick = next(sprite for _, _, sprite in chunk.cells if sprite.tile_type == TileType.BRICK)
+
+    #Broken the way the physics engine breaks it - out of its lists & cleared in the live grid
+    brick.remove_from_sprite_lists()
+    level.collision_grid.remove_sprite(brick)
+
+    level.update(10 * TILE, 11 * TILE)  # Scrolled away, chunk 0 unloads
+    _expect(failures, 0 not in level.chunks, "chunk 0 still loaded after scrolling away")
+    _expect(failures, tilemap.get_tile(1, 2) == TileType.EMPTY, f"broken brick written back as {tilemap.get_tile(1, 2)}")
+    _expect(failures, tilemap.get_tile(1, 0) == TileType.GROUND, "unbroken ground lost on write-back")
+
+    level.update(0, 3 * TILE)  # And back
+    rebuilt = [sprite for _, _, sprite in level.chunks[0].cells if sprite.tile_type == TileType.BRICK]
+    _expect(failures, not rebuilt, "broken brick came back when its chunk was rebuilt")
+    _expect(failures, not level.collision_grid.is_solid(1, 2), "broken brick's cell is solid again after reload")
+    _expect(failures, level.collision_grid.is_solid(1, 0), "ground cell lost after reload")
+    return failures
+
+def check_level_cache():
+    from level_cache import load_compiled_level, cache_path, read_header, VERSION
+    failures = []
+    directory = tempfile.mkdtemp()
+    try:
+        source = os.path.join(directory, 'check.json')
+        level = {'name': 'check', 'width': 4, 'height': 2, 'tiles': [[1, 1, 1, 1], [0, 0, 0, 0]]}
+        with open(source, 'w') as f:
+            json.dump(level, f)
+
+        tilemap = load_compiled_level(source)
+        header = read_header(cache_path(source))
+        _expect(failures, header is not None and header[0] == VERSION, f"no BLVL artifact written, header {header}")
+        _expect(failures, tilemap is not None and list(tilemap.tiles[0]) == [1, 1, 1, 1], "compiled tiles differ from the source")
+
+        #Unchanged source - served from the artifact, not re-parsed
+        mtime = os.path.getmtime(cache_path(source))
+        tilemap = load_compiled_level(source)
+        _expect(failures, os.path.getmtime(cache_path(source)) == mtime, "unchanged source rewrote the artifact")
+        _expect(failures, hasattr(tilemap, 'compiled_level'), "unchanged source wasn't loaded from the artifact")
+
+        #Edited source - the hash no longer matches, so it's recompiled
+        level['tiles'][1][2] = TileType.BRICK
+        with open(source, 'w') as f:
+            json.dump(level, f)
+        tilemap = load_compiled_level(source)
+        new_header = read_header(cache_path(source))
+        _expect(failures, new_header and header and new_header[2] != header[2], "edited source kept the old hash")
+        _expect(failures, tilemap is not None and tilemap.get_tile(2, 1) == TileType.BRICK, "edited tile missing after recompiling")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return failures
+
+class _Pooled:
+    def __init__(self, value=0):
+        self.reset(value)
+
+    def reset(self, value=0):
+        self.value = value
+        self.touched = False
+
+def check_object_pool():
+    failures = []
+    pool = ObjectPool(_Pooled, max_free=1, enabled=True)
+
+    first = pool.acquire(1)
+    first.touched = True
+    _expect(failures, pool.created == 1 and not first.in_pool, "acquire on an empty pool didn't construct")
+    _expect(failures, pool.release(first) and first.in_pool, "release didn't take the item")
+    _expect(failures, not pool.release(first) and len(pool) == 1, "double release put the item in twice")
+
+    again = pool.acquire(2)
+    _expect(failures, again is first and pool.reused == 1, "acquire didn't reuse the free item")
+    _expect(failures, again.value == 2 and not again.touched, "reused item wasn't reset with the new arguments")
+
+    second = pool.acquire(3)
+    pool.release_all([again, second])
+    _expect(failures, len(pool) == 1 and pool.discarded == 1, f"max_free=1 kept {len(pool)}, discarded {pool.discarded}")
+
+    disabled = ObjectPool(_Pooled, enabled=False)
+    _expect(failures, not disabled.release(disabled.acquire()) and len(disabled) == 0, "disabled pool kept an item")
+    return failures
+
+def check_column_buckets():
+    failures = []
+    buckets = ColumnBuckets(bucket_width=100)
+    sprite_list = arcade.SpriteList()
+    sprites = []
+    for x in (10, 150, 450):
+        sprite = arcade.SpriteSolidColor(8, 8, color=settings.WHITE)
+        sprite.center_x = x
+        sprite_list.append(sprite)
+        buckets.add(sprite)
+        sprites.append(sprite)
+    near, middle, far = sprites
+
+    window = ActivationWindow(margin=0, view_width=200)
+    window.left, window.right = 0, 200
+    _expect(failures, buckets.query(window) == [near, middle], "query missed or added sprites")
+
+    far.center_x = 120
+    buckets.rebucket([far])
+    _expect(failures, buckets.columns[far] == 1, f"rebucket left the sprite in column {buckets.columns[far]}")
+    _expect(failures, 4 not in buckets.buckets, "rebucket left an empty bucket behind")
+    _expect(failures, far in buckets.query(window), "moved sprite not found in its new column")
+
+    buckets.discard(near)
+    buckets.discard(near)  # Twice is a no-op
+    _expect(failures, near not in buckets.columns and 0 not in buckets.buckets, "discard left the sprite bucketed")
+
+    middle.remove_from_sprite_lists()
+    _expect(failures, buckets.query(window) == [far], "query returned a sprite that left its lists")
+    _expect(failures, len(buckets) == 1, f"{len(buckets)} sprites bucketed, expected 1 after query dropped the removed one")
+    return failures
+
+CHECKS = (
+    ('Fixed timestep', check_fixed_timestep),
+    ('Collision grid', check_collision_grid),
+    ('Chunk write-back', check_chunk_write_back),
+    ('Level cache', check_level_cache),
+    ('Object pool', check_object_pool),
+    ('Column buckets', check_column_buckets)
+)
@@ -8,6 +8,8 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import settings
+from utils.activation import ColumnBuckets
+from utils.object_pool import get_pool, is_poolable
 
 class EnemyState:
     IDLE ='idle'
@@ -25,6 +27,10 @@ class BaseEnemy(arcade.Sprite):
         self.enemy_type = enemy_type
         self.enemy_id = id(self)
 
+        self._init_state()
+        self._create_enemy_texture()
+
+    def _init_state(self):
         self.state = EnemyState.WALKING
         self.previous_state = EnemyState.IDLE
         self.state_timer = 0
@@ -62,6 +68,7 @@ class BaseEnemy(arcade.Sprite):
         self.animation_timer = 0
         self.walk_animation_speed = 0.2
         self.current_animation = 'walk'
+        self.animation_set = None  # AnimationManager set to walk in a group with, None keeps the static texture
 
         self.score_value = 200
         self.death_timer = 0
@@ -71,7 +78,14 @@ class BaseEnemy(arcade.Sprite):
         self.can_activate_switches = False
         self.pushes_other_enemeies = True
 
-        self._create_enemy_texture()
+    def reset(self, scale=1.0):
+        #Back to a freshly constructed enemy for the object pool, subclasses reset their own state after this
+        #The texture is kept - the subclass sets its own anyway
+        self.scale = scale
+        self.change_x = 0
+        self.change_y = 0
+        self.__dict__.pop('_counted_as_defeated', None)
+        self._init_state()
 
     def _create_enemy_texture(self):
         colors = {
@@ -288,21 +302,72 @@ class BaseEnemy(arcade.Sprite):
     
 class EnemyManager:
 
-    def __init__(self):
-        self.enemy_list = arcade.SpriteList()
+    def __init__(self, compact=None, animation_manager=None):
         self.total_enemies = 0
         self.defeated_enemies = 0
 
+        self.collision_method = 0  # arcade auto-select, 3 = CPU only (headless)
+
+        #Compact mode keeps enemies in an EnemyStore, enemy_list then only holds draw sprites
+        if compact is None:
+            compact = settings.COMPACT_ENEMY_STORAGE
+
+        if compact:
+            from .enemy_store import EnemyStore
+            self.store = EnemyStore()
+            self.enemy_list = self.store.sprite_list
+        else:
+            self.store = None
+            self.enemy_list = arcade.SpriteList()
+
+        self.buckets = ColumnBuckets()
+        self.awake_enemies = None  # None while every enemy is awake
+
+        #Sprite enemies walk in shared AnimationGroups & get their own controller once stomped
+        self.animation_manager = animation_manager
+
     def add_enemy(self, enemy_class, x, y, **kwargs):
-        enemy = enemy_class(**kwargs)
+        #Returns the sprite, or the store slot in compact mode
+        if self.store is not None:
+            self.total_enemies += 1
+            return self.store.spawn(enemy_class, x, y, **kwargs)
+
+        #Pooled classes reuse enemies that died or were cleared by reset()
+        enemy = get_pool(enemy_class).acquire(**kwargs) if is_poolable(enemy_class) else enemy_class(**kwargs)
         enemy.setup_position(x, y)
         self.enemy_list.append(enemy)
+        self.buckets.add(enemy)
+        if self.animation_manager and enemy.animation_set:
+            self.animation_manager.join_group(enemy, enemy.animation_set, 'walk')
         self.total_enemies+=1
 
         return enemy
+
+    def activate(self, window=None):
+        #Picks the enemies simulated this tick, everything outside the window sleeps
+        if self.store is not None:
+            self.store.activate(window.mask(self.store.x[:self.store.count]) if window else None)
+        elif window is None:
+            self.awake_enemies = None
+        else:
+            self.awake_enemies = self.buckets.query(window)
+
+    def get_awake_enemies(self):
+        if self.store is not None:
+            return self.enemy_list
+        return self.enemy_list if self.awake_enemies is None else self.awake_enemies
     
     def update(self, delta_time, player_sprite=None):
-        for enemy in self.enemy_list:
+        if self.store is not None:
+            for _ in range(self.store.update(delta_time, player_sprite)):
+                self.defeated_enemies += 1
+                print(f"Enemy fell off map! Defeated: {self.defeated_enemies}")
+            return
+
+        awake = self.get_awake_enemies()
+        dead = []
+        #Snapshot - an enemy that finishes dying removes itself from enemy_list mid-loop, which would skip the next one
+        for enemy in list(awake):
 
             if enemy.center_y < -100 and enemy.state not in [EnemyState.DEAD, EnemyState.DYING]:
                 enemy.die()
@@ -317,10 +382,33 @@ class EnemyManager:
                         enemy.set_state(EnemyState.CHASING)
 
             enemy.update(delta_time)
+            if enemy.state == EnemyState.DEAD and not enemy.sprite_lists:
+                dead.append(enemy)
+
+        for enemy in dead:
+            self._release(enemy)
+
+        if self.awake_enemies is not None:
+            self.buckets.rebucket(awake)
+
+    def _release(self, enemy):
+        self.buckets.discard(enemy)
+        if self.animation_manager:
+            self.animation_manager.cleanup_sprite(enemy)
+        if is_poolable(type(enemy)):
+            get_pool(type(enemy)).release(enemy)
 
     def check_player_interactions(self, player_sprite, physics_engine=None):
+        if self.store is not None:
+            interactions = self.store.check_player_interactions(player_sprite)
+            self.defeated_enemies += sum(1 for interaction in interactions if interaction['enemy_died'])
+            return interactions
+
         interactions = []
-        hit_list = arcade.check_for_collision_with_list(player_sprite, self.enemy_list)
+        if self.awake_enemies is None:
+            hit_list = arcade.check_for_collision_with_list(player_sprite, self.enemy_list, method=self.collision_method)
+        else:
+            hit_list = [enemy for enemy in self.awake_enemies if arcade.check_for_collision(player_sprite, enemy)]
 
         for enemy in hit_list:
             if enemy.state in [EnemyState.DYING, EnemyState.DEAD]:
@@ -340,6 +428,8 @@ class EnemyManager:
 
                 if interaction['enemy_died']:
                     self.defeated_enemies += 1
+                    if self.animation_manager and enemy.animation_set:
+                        self.animation_manager.diverge(enemy, enemy.animation_set, 'die')
 
         return interactions
     
@@ -352,15 +442,35 @@ class EnemyManager:
         }
     
     def reset(self):
+        #Sprite enemies go back to their pools, clear() keeps enemy_list's buffer capacity for the next level
+        if self.store is not None:
+            self.store.clear()
+            enemies = []
+        else:
+            enemies = list(self.enemy_list)
         self.enemy_list.clear()
+        for enemy in enemies:
+            self._release(enemy)
+        self.buckets.clear()
+        self.awake_enemies = None
         self.total_enemies = 0
         self.defeated_enemies = 0
 
-    def draw(self):
+    def draw(self, alpha=1.0):
+        #alpha blends compact enemies between ticks, sprite enemies are blended by the RenderInterpolator
+        if self.store is not None:
+            self.store.sync_sprites(alpha)
         self.enemy_list.draw()
 
     def draw_debug(self):
-        for enemy in self.enemy_list:
+        if self.store is not None:
+            sprites = self.store.sync_sprites()
+            vision_ranges = self.store.vision_ranges()
+        else:
+            sprites = self.enemy_list
+            vision_ranges = [enemy.vision_range for enemy in sprites]
+
+        for enemy, vision_range in zip(sprites, vision_ranges):
             if settings.SHOW_HITBOXES:
                 arcade.draw_rect_outline(
                     enemy.center_x, enemy.center_y,
@@ -371,7 +481,7 @@ class EnemyManager:
             if settings.DEBUG_MODE:
                 arcade.draw_circle_outline(
                     enemy.center_x, enemy.center_y,
-                    enemy.vision_range,
+                    vision_range,
                     arcade.color.YELLOW, 1
                 )
 
@@ -0,0 +1,171 @@
+#Batched enemy physics
+#Integrates gravity & velocity and collides every enemy against the tile grid at once
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import settings
+from physics import PhysicsConstants
+from .enemy_base import EnemyState
+
+class EnemyPhysicsBatch:
+    #Positions, velocities & flags for the whole enemy list live in NumPy arrays
+    #Only the write-back and wall bounce callbacks touch individual sprites
+
+    def __init__(self, gravity=None, terminal_velocity=None):
+        self.gravity = gravity or settings.GRAVITY
+        self.terminal_velocity = terminal_velocity or settings.TERMINAL_VELOCITY
+
+        self.sprites = []
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.change_x = np.zeros(0)
+        self.change_y = np.zeros(0)
+        self.on_ground = np.zeros(0, dtype=bool)
+        self.blocked = np.zeros(0, dtype=bool)
+
+        self._grid = None
+        self._solid = None
+        self._extents = {}  # sprite -> (hit box, scale, (left, bottom, right, top) offsets)
+
+    def _bind_grid(self, grid):
+        #Shares memory with grid.solid, so bricks removed mid-level show up here too
+        if grid is self._grid:
+            return
+
+        self._grid = grid
+        if grid.width * grid.height == 0:
+            self._solid = np.zeros((grid.height, grid.width), dtype=np.uint8)
+        else:
+            self._solid = np.frombuffer(grid.solid, dtype=np.uint8).reshape(grid.height, grid.width)
+
+    def _cell_range(self, low, high, origin):
+        tolerance = PhysicsConstants.COLLISION_TOLERANCE
+        tile_size = self._grid.tile_size
+        first = np.floor((low - origin + tolerance) / tile_size).astype(np.intp)
+        last = np.floor((high - origin - tolerance) / tile_size).astype(np.intp)
+        return first, last
+
+    def _overlaps_solid(self, x0, x1, y0, y1):
+        #True per enemy if any solid cell lies in its inclusive cell range
+        grid = self._grid
+        hits = np.zeros(len(x0), dtype=bool)
+        if len(x0) == 0 or grid.width == 0 or grid.height == 0:
+            return hits
+
+        span_x = int((x1 - x0).max()) + 1
+        span_y = int((y1 - y0).max()) + 1
+
+        for offset_x in range(span_x):
+            cell_x = x0 + offset_x
+            valid_x = (cell_x <= x1) & (cell_x >= 0) & (cell_x < grid.width)
+            cell_x = np.clip(cell_x, 0, grid.width - 1)
+
+            for offset_y in range(span_y):
+                cell_y = y0 + offset_y
+                valid = valid_x & (cell_y <= y1) & (cell_y >= 0) & (cell_y < grid.height)
+                cell_y = np.clip(cell_y, 0, grid.height - 1)
+                hits |= valid & (self._solid[cell_y, cell_x] != 0)
+
+        return hits
+
+    def _hit_box_extents(self, sprites):
+        #Hit box edges relative to the sprite centre, only recomputed when the hit box or scale changes
+        #Reading sprite.left/right/... transforms every hit box point, far too slow per enemy per tick
+        cache = {}
+        rows = []
+
+        for enemy in sprites:
+            hit_box = enemy.hit_box
+            scale = hit_box.scale
+            cached = self._extents.get(enemy)
+
+            if cached is None or cached[0] is not hit_box or cached[1] != scale:
+                xs = [point[0] * scale[0] for point in hit_box.points]
+                ys = [point[1] * scale[1] for point in hit_box.points]
+                cached = (hit_box, scale, (min(xs), min(ys), max(xs), max(ys)))
+
+            cache[enemy] = cached
+            rows.append(cached[2])
+
+        self._extents = cache
+        return np.array(rows, dtype=np.float64)
+
+    def step(self, enemy_list, grid):
+        #One physics tick for every enemy that isn't dead
+        self._bind_grid(grid)
+
+        sprites = [enemy for enemy in enemy_list if enemy.state != EnemyState.DEAD]
+        self.sprites = sprites
+        if not sprites:
+            return
+
+        extents = self._hit_box_extents(sprites)
+        data = np.array([
+            (enemy.center_x, enemy.center_y, enemy.change_x, enemy.change_y, enemy.affected_by_gravity)
+            for enemy in sprites
+        ], dtype=np.float64)
+
+        start_x, start_y = data[:, 0], data[:, 1]
+        change_x, change_y = data[:, 2], data[:, 3]
+        falls = data[:, 4] != 0
+
+        dx, dy, change_y, landing, blocked = self.integrate(start_x, start_y, extents, change_x, change_y, falls, grid)
+
+        self.x = start_x + dx
+        self.y = start_y + dy
+        self.change_x = change_x
+        self.change_y = change_y
+        self.on_ground = landing
+        self.blocked = blocked
+
+        self._write_back(sprites, start_x, start_y, falls)
+
+    def integrate(self, x, y, extents, change_x, change_y, falls, grid):
+        #Array-only tick, returns (dx, dy, change_y, on_ground, blocked) & leaves the inputs untouched
+        #extents holds (left, bottom, right, top) hit box offsets from each centre
+        self._bind_grid(grid)
+        change_y = change_y.copy()
+
+        left, right = x + extents[:, 0], x + extents[:, 2]
+        bottom, top = y + extents[:, 1], y + extents[:, 3]
+
+        # Horizontal move, enemies that would end up inside a wall stay put & bounce
+        x0, x1 = self._cell_range(left + change_x, right + change_x, grid.origin_x)
+        y0, y1 = self._cell_range(bottom, top, grid.origin_y)
+        blocked = self._overlaps_solid(x0, x1, y0, y1)
+        dx = np.where(blocked, 0.0, change_x)
+        left = left + dx
+        right = right + dx
+
+        # Gravity & vertical move
+        change_y[falls] = np.maximum(change_y[falls] - self.gravity, -self.terminal_velocity)
+        dy = np.where(falls, change_y, 0.0)
+        bottom = bottom + dy
+
+        # Land on the row under the enemy's feet
+        x0, x1 = self._cell_range(left, right, grid.origin_x)
+        feet_row = np.floor((bottom - grid.origin_y + PhysicsConstants.COLLISION_TOLERANCE) / grid.tile_size).astype(np.intp)
+        landing = falls & (change_y < 0) & self._overlaps_solid(x0, x1, feet_row, feet_row)
+        row_top = grid.origin_y + (feet_row + 1) * grid.tile_size
+        dy = np.where(landing, dy + (row_top - bottom), dy)
+        change_y[landing] = 0.0
+
+        return dx, dy, change_y, landing, blocked
+
+    def _write_back(self, sprites, start_x, start_y, falls):
+        moved = (self.x != start_x) | (self.y != start_y)
+
+        for index in np.flatnonzero(moved).tolist():
+            sprites[index].position = (float(self.x[index]), float(self.y[index]))
+
+        for index in np.flatnonzero(falls).tolist():
+            enemy = sprites[index]
+            enemy.change_y = float(self.change_y[index])
+            enemy.on_ground = bool(self.on_ground[index])
+
+        for index in np.flatnonzero(self.blocked).tolist():
+            enemy = sprites[index]
+            enemy.handle_wall_collision('left' if enemy.change_x > 0 else 'right')
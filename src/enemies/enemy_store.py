@@ -0,0 +1,504 @@
+#Compact enemy storage
+#Per-variant constants live in a shared archetype table, per-enemy state in contiguous NumPy arrays
+#Sprites are only materialised for drawing
+import arcade
+import numpy as np
+import random
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import settings
+from .enemy_base import EnemyState
+from .enemy_physics import EnemyPhysicsBatch
+
+STATE_CODES = {
+    EnemyState.IDLE: 0,
+    EnemyState.WALKING: 1,
+    EnemyState.CHASING: 2,
+    EnemyState.STUNNED: 3,
+    EnemyState.DYING: 4,
+    EnemyState.DEAD: 5
+}
+STATE_NAMES = {code: name for name, code in STATE_CODES.items()}
+
+IDLE = STATE_CODES[EnemyState.IDLE]
+WALKING = STATE_CODES[EnemyState.WALKING]
+CHASING = STATE_CODES[EnemyState.CHASING]
+STUNNED = STATE_CODES[EnemyState.STUNNED]
+DYING = STATE_CODES[EnemyState.DYING]
+DEAD = STATE_CODES[EnemyState.DEAD]
+
+FALL_OUT_Y = -100  # Same cut-off EnemyManager uses for sprite enemies
+
+class EnemyArchetype:
+    #Everything that is the same for every enemy of one class & variant
+    #Read once off a throwaway prototype so the sprite classes stay the single source of truth
+
+    def __init__(self, index, enemy_class, kwargs):
+        #The prototype's own random draws are rolled back, so spawning draws the same numbers as sprite enemies
+        random_state = random.getstate()
+        prototype = enemy_class(**kwargs)
+        random.setstate(random_state)
+
+        self.index = index
+        self.enemy_class = enemy_class
+        self.kwargs = dict(kwargs)
+
+        self.enemy_type = prototype.enemy_type
+        self.variant = getattr(prototype, 'variant', None)
+
+        self.speed = prototype.speed
+        self.health = prototype.max_health
+        self.score_value = prototype.score_value
+        self.damage_to_player = prototype.damage_to_player
+        self.vision_range = prototype.vision_range
+        self.patrol_distance = prototype.patrol_distance
+        self.death_duration = prototype.death_duration
+        self.bounces_off_walls = prototype.bounces_off_walls
+        self.affected_by_gravity = prototype.affected_by_gravity
+
+        self.randomly_turns = getattr(prototype, 'can_change_direction_randomly', False)
+        self.direction_change_chance = getattr(prototype, 'direction_change_chance', 0.0)
+        self.charges = getattr(prototype, 'movement_pattern', 'walk') == 'charge'
+        self.charge_speed_multiplier = getattr(prototype, 'charge_speed_multiplier', 1.0)
+        self.squish_duration = getattr(prototype, 'squish_duration', 0.0)
+
+        abilities = prototype.get_special_abilities() if hasattr(prototype, 'get_special_abilities') else []
+        self.two_hit_kill = 'two_hit_kill' in abilities
+        self.bounce_height = getattr(enemy_class, 'STOMP_BOUNCE_HEIGHTS', {}).get(self.variant, 8)
+
+        self.scale = prototype.scale_x
+        self.texture = prototype.texture
+
+        # Unscaled hit box offsets from the centre, multiplied by each enemy's own scale
+        xs = [point[0] for point in prototype.hit_box.points]
+        ys = [point[1] for point in prototype.hit_box.points]
+        self.extents = (min(xs), min(ys), max(xs), max(ys))
+
+class ArchetypeTable:
+    #Archetypes by (class, constructor kwargs), plus one NumPy column per constant for array lookups
+
+    COLUMNS = (
+        'speed', 'vision_range', 'patrol_distance', 'death_duration', 'bounces_off_walls',
+        'affected_by_gravity', 'randomly_turns', 'direction_change_chance', 'charges',
+        'charge_speed_multiplier', 'squish_duration', 'extents'
+    )
+
+    def __init__(self):
+        self.archetypes = []
+        self.columns = {}
+        self._by_key = {}
+
+    def get(self, enemy_class, kwargs):
+        key = (enemy_class, tuple(sorted(kwargs.items())))
+        archetype = self._by_key.get(key)
+
+        if archetype is None:
+            archetype = EnemyArchetype(len(self.archetypes), enemy_class, kwargs)
+            self.archetypes.append(archetype)
+            self._by_key[key] = archetype
+            self._rebuild_columns()
+
+        return archetype
+
+    def _rebuild_columns(self):
+        self.columns = {
+            name: np.array([getattr(archetype, name) for archetype in self.archetypes])
+            for name in self.COLUMNS
+        }
+
+    def __getitem__(self, index):
+        return self.archetypes[index]
+
+    def __len__(self):
+        return len(self.archetypes)
+
+class EnemyStore:
+    #Structure-of-arrays enemies, mirrors BaseEnemy/Goomba behaviour one whole-array stage at a time
+    #Slots [0, count) are live, dead enemies are compacted away at the end of each update
+    #With an activation window the awake enemies are moved to the front & only [0, awake) is simulated
+
+    FIELDS = (
+        ('kind', np.int16),
+        ('state', np.int8),
+        ('health', np.int16),
+        ('x', np.float64),
+        ('y', np.float64),
+        ('prev_x', np.float64),
+        ('prev_y', np.float64),
+        ('change_x', np.float64),
+        ('change_y', np.float64),
+        ('direction', np.float64),
+        ('scale', np.float64),
+        ('patrol_start_x', np.float64),
+        ('last_seen_x', np.float64),
+        ('last_seen_y', np.float64),
+        ('state_timer', np.float64),
+        ('death_timer', np.float64),
+        ('invulnerable_timer', np.float64),
+        ('seen_player', np.bool_),
+        ('on_ground', np.bool_),
+        ('squished', np.bool_),
+        ('counted_defeated', np.bool_)
+    )
+
+    def __init__(self, capacity=64, seed=None):
+        self.archetypes = ArchetypeTable()
+        self.physics = EnemyPhysicsBatch()
+        #Directions & random turns come from the random module like BaseEnemy/Goomba, drawn in slot order,
+        #so a seeded run matches the sprite path - seed gives the store its own stream instead
+        self.rng = random.Random(seed) if seed is not None else random
+
+        self.count = 0
+        self.awake = 0
+        self.windowed = False
+        self.capacity = max(1, capacity)
+        for name, dtype in self.FIELDS:
+            setattr(self, name, np.zeros(self.capacity, dtype=dtype))
+
+        self.sprite_list = arcade.SpriteList()  # Draw-only, rebuilt from the arrays by sync_sprites()
+
+    @property
+    def bytes_per_enemy(self):
+        return sum(np.dtype(dtype).itemsize for _, dtype in self.FIELDS)
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def active_count(self):
+        return self.awake if self.windowed else self.count
+
+    def activate(self, awake_mask=None):
+        #Stable-sorts awake enemies to the front, sleeping ones keep their state untouched
+        #None wakes everything
+        if awake_mask is None:
+            self.windowed = False
+            return
+
+        self.windowed = True
+        self.awake = int(awake_mask.sum())
+        if self.awake == self.count or self.awake == 0:
+            return
+
+        order = np.argsort(~awake_mask, kind='stable')
+        for name, _ in self.FIELDS:
+            array = getattr(self, name)
+            array[:self.count] = array[:self.count][order]
+
+    def _grow(self):
+        self.capacity *= 2
+        for name, dtype in self.FIELDS:
+            grown = np.zeros(self.capacity, dtype=dtype)
+            grown[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, grown)
+
+    def spawn(self, enemy_class, x, y, **kwargs):
+        #Same starting state as enemy_class(**kwargs).setup_position(x, y), returns the slot
+        archetype = self.archetypes.get(enemy_class, kwargs)
+
+        if self.count == self.capacity:
+            self._grow()
+
+        index = self.count
+        self.count += 1
+
+        for name, dtype in self.FIELDS:
+            getattr(self, name)[index] = 0
+
+        direction = float(self.rng.choice([-1, 1]))
+        self.kind[index] = archetype.index
+        self.state[index] = WALKING
+        self.health[index] = archetype.health
+        self.x[index] = self.prev_x[index] = x
+        self.y[index] = self.prev_y[index] = y
+        self.patrol_start_x[index] = x
+        self.direction[index] = direction
+        self.change_x[index] = direction * archetype.speed
+        self.scale[index] = archetype.scale
+
+        return index
+
+    def clear(self):
+        self.count = 0
+        self.awake = 0
+        self.sprite_list.clear()
+
+    def _set_state(self, mask, code):
+        #Vectorised BaseEnemy.set_state, only touches enemies actually changing state
+        n = self.active_count
+        changed = mask & (self.state[:n] != code)
+        self.state[:n][changed] = code
+        self.state_timer[:n][changed] = 0
+
+        if code == DYING:
+            self.death_timer[:n][changed] = 0
+            self.change_x[:n][changed] = 0
+            self.change_y[:n][changed] = -5
+
+        return changed
+
+    def _die(self, mask):
+        n = self.active_count
+        self.squished[:n][mask] = True
+        self._set_state(mask, DYING)
+        self.change_x[:n][mask] = 0
+        self.change_y[:n][mask] = 0
+
+    def _charge(self, mask, speed):
+        #Goomba._update_charging: run at the last place the player was seen, walk again on arrival
+        n = self.active_count
+        x = self.x[:n]
+        target_x = self.last_seen_x[:n]
+        multiplier = self.archetypes.columns['charge_speed_multiplier'][self.kind[:n]]
+
+        charging = mask & self.seen_player[:n]
+        far = charging & (np.abs(x - target_x) > 10)
+        self.direction[:n][far] = np.where(x[far] < target_x[far], 1.0, -1.0)
+        self.change_x[:n][far] = self.direction[:n][far] * speed[far] * multiplier[far]
+
+        self._set_state(charging & ~far, WALKING)
+
+    def update(self, delta_time, player_sprite=None):
+        #AI & timers for every enemy, returns how many fell off the map this tick
+        n = self.active_count
+        if n == 0:
+            return 0
+
+        columns = self.archetypes.columns
+        kind = self.kind[:n]
+        state = self.state[:n]
+        x, y = self.x[:n], self.y[:n]
+        direction = self.direction[:n]
+        change_x = self.change_x[:n]
+        squished = self.squished[:n]
+        state_timer = self.state_timer[:n]
+        death_timer = self.death_timer[:n]
+        speed = columns['speed'][kind]
+
+        # Off the bottom of the map
+        fell = (y < FALL_OUT_Y) & (state != DEAD) & (state != DYING)
+        fallen = 0
+        if fell.any():
+            self._die(fell)
+            newly_fallen = fell & ~self.counted_defeated[:n]
+            self.counted_defeated[:n][fell] = True
+            fallen = int(newly_fallen.sum())
+
+        # Player detection, squared distances against each archetype's vision range
+        if player_sprite:
+            player_x, player_y = player_sprite.center_x, player_sprite.center_y
+            distance_sq = (player_x - x) ** 2 + (player_y - y) ** 2
+            detected = (state != DEAD) & ~squished & (distance_sq <= columns['vision_range'][kind] ** 2)
+
+            self.last_seen_x[:n][detected] = player_x
+            self.last_seen_y[:n][detected] = player_y
+            self.seen_player[:n][detected] = True
+            self._set_state(detected & (state == WALKING), CHASING)
+
+        state_timer += delta_time
+        np.maximum(self.invulnerable_timer[:n] - delta_time, 0, out=self.invulnerable_timer[:n])
+
+        # BaseEnemy state handlers
+        walking = state == WALKING
+        chasing = state == CHASING
+        stunned = state == STUNNED
+        dying = state == DYING
+
+        change_x[walking] = direction[walking] * speed[walking]
+        direction[walking & (np.abs(x - self.patrol_start_x[:n]) > columns['patrol_distance'][kind])] *= -1
+
+        self._charge(chasing, speed)
+
+        change_x[stunned] = 0
+        self._set_state(stunned & (state_timer > 1.0), WALKING)
+
+        death_timer[dying] += delta_time
+        duration = columns['death_duration'][kind]
+        shrinking = dying & (death_timer < duration)
+        self.scale[:n][shrinking] = np.maximum(0.1, 1.0 - death_timer[shrinking] / duration[shrinking])
+        self._set_state(dying & ~shrinking, DEAD)
+
+        # Goomba handlers, these see the states the base handlers just set
+        walking = state == WALKING
+        turning = np.flatnonzero(walking & columns['randomly_turns'][kind])
+        if len(turning):
+            draws = np.array([self.rng.random() for _ in range(len(turning))])
+            direction[turning[draws < columns['direction_change_chance'][kind[turning]]]] *= -1
+        change_x[walking] = direction[walking] * speed[walking]
+
+        self._charge((state == CHASING) & columns['charges'][kind], speed)
+
+        change_x[squished] = 0
+        recovered = squished & (state_timer > columns['squish_duration'][kind])
+        squished[recovered] = False
+        # A squished enemy that is dying stays dying, same as Goomba._update_squished
+        self._set_state(recovered & (self.health[:n] > 0) & (state != DYING) & (state != DEAD), WALKING)
+
+        self._remove_dead()
+        return fallen
+
+    def _remove_dead(self):
+        n = self.count
+        alive = self.state[:n] != DEAD
+        if alive.all():
+            return
+
+        # Only awake enemies can die, so the awake prefix stays in front
+        remaining = int(alive.sum())
+        for name, _ in self.FIELDS:
+            array = getattr(self, name)
+            array[:remaining] = array[:n][alive]
+        if self.windowed:
+            self.awake -= n - remaining
+        self.count = remaining
+
+    def extents(self):
+        #(left, bottom, right, top) hit box offsets per live enemy
+        n = self.active_count
+        return self.archetypes.columns['extents'][self.kind[:n]] * self.scale[:n, None]
+
+    def step_physics(self, grid=None):
+        #First stage of a tick, also remembers where everything was for render interpolation
+        n = self.active_count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        if n == 0:
+            return
+
+        columns = self.archetypes.columns
+        kind = self.kind[:n]
+        falls = columns['affected_by_gravity'][kind].astype(bool)
+        change_x = self.change_x[:n]
+        change_y = self.change_y[:n]
+
+        if grid is not None:
+            dx, dy, new_change_y, landing, blocked = self.physics.integrate(
+                self.x[:n], self.y[:n], self.extents(), change_x, change_y, falls, grid
+            )
+        else:
+            new_change_y = change_y.copy()
+            new_change_y[falls] = np.maximum(change_y[falls] - self.physics.gravity, -self.physics.terminal_velocity)
+            dx = change_x.copy()
+            dy = np.where(falls, new_change_y, 0.0)
+            landing = np.zeros(n, dtype=bool)
+            blocked = landing
+
+        self.x[:n] += dx
+        self.y[:n] += dy
+        change_y[:] = new_change_y
+        self.on_ground[:n][falls] = landing[falls]
+
+        bounce = blocked & columns['bounces_off_walls'][kind].astype(bool)
+        self.direction[:n][bounce] *= -1
+        change_x[bounce] = self.direction[:n][bounce] * columns['speed'][kind][bounce]
+
+    def check_player_interactions(self, player_sprite):
+        #Stomps & side hits, same result dicts as Goomba.interact_with_player
+        n = self.active_count
+        if n == 0:
+            return []
+
+        extents = self.extents()
+        x, y = self.x[:n], self.y[:n]
+        state = self.state[:n]
+
+        overlapping = (
+            (x + extents[:, 0] < player_sprite.right) & (x + extents[:, 2] > player_sprite.left) &
+            (y + extents[:, 1] < player_sprite.top) & (y + extents[:, 3] > player_sprite.bottom)
+        )
+        hits = overlapping & (state != DYING) & (state != DEAD) & ~self.squished[:n]
+
+        interactions = []
+        player_falling = player_sprite.change_y < 0
+
+        for index in np.flatnonzero(hits).tolist():
+            archetype = self.archetypes[self.kind[index]]
+
+            if player_falling and player_sprite.bottom > y[index]:
+                died = self._stomp(index, archetype)
+                interactions.append({
+                    'type': 'stomp',
+                    'enemy_type': archetype.enemy_type,
+                    'variant': archetype.variant,
+                    'enemy_died': died,
+                    'score': archetype.score_value if died else archetype.score_value // 2,
+                    'bounce_player': True,
+                    'bounce_height': archetype.bounce_height,
+                    'sound': 'enemy_stomp'
+                })
+            else:
+                interactions.append({
+                    'type': 'damage',
+                    'enemy_type': archetype.enemy_type,
+                    'damage_to_player': archetype.damage_to_player,
+                    'enemy_died': False,
+                    'knockback': True,
+                    'sound': 'player_hurt'
+                })
+
+        return interactions
+
+    def _stomp(self, index, archetype):
+        mask = np.zeros(self.active_count, dtype=bool)
+        mask[index] = True
+
+        if archetype.two_hit_kill and self.health[index] > 1:
+            self.health[index] -= 1
+            self.squished[index] = True
+            self._set_state(mask, STUNNED)
+            self.scale[index] = 1.0
+            return False
+
+        self.health[index] = 0
+        self._die(mask)
+        return True
+
+    def sync_sprites(self, alpha=1.0):
+        #Moves the draw-only sprites to the (interpolated) array positions, sleeping enemies are off screen
+        n = self.active_count
+        sprites = self.sprite_list
+
+        while len(sprites) > n:
+            sprites.pop()
+        while len(sprites) < n:
+            sprites.append(arcade.Sprite())
+
+        prev_x, prev_y = self.prev_x[:n], self.prev_y[:n]
+        x, y = self.x[:n], self.y[:n]
+        dx, dy = x - prev_x, y - prev_y
+
+        # Teleports snap, same as RenderInterpolator
+        snap = (np.abs(dx) > settings.INTERPOLATION_SNAP_DISTANCE) | (np.abs(dy) > settings.INTERPOLATION_SNAP_DISTANCE)
+        draw_x = np.where(snap, x, prev_x + dx * alpha).tolist()
+        draw_y = np.where(snap, y, prev_y + dy * alpha).tolist()
+        scales = self.scale[:n].tolist()
+        kinds = self.kind[:n].tolist()
+
+        for index in range(n):
+            sprite = sprites[index]
+            texture = self.archetypes[kinds[index]].texture
+            if sprite.texture is not texture:
+                sprite.texture = texture
+            if sprite.scale_x != scales[index]:
+                sprite.scale = scales[index]
+            sprite.position = (draw_x[index], draw_y[index])
+
+        return sprites
+
+    def vision_ranges(self):
+        return [self.archetypes[kind].vision_range for kind in self.kind[:self.active_count].tolist()]
+
+    def get_debug_info(self, index):
+        archetype = self.archetypes[self.kind[index]]
+        return {
+            'type': archetype.enemy_type,
+            'variant': archetype.variant,
+            'state': STATE_NAMES[int(self.state[index])],
+            'position': (int(self.x[index]), int(self.y[index])),
+            'health': int(self.health[index]),
+            'on_ground': bool(self.on_ground[index]),
+            'vision_range': archetype.vision_range
+        }
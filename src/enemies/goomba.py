@@ -4,6 +4,8 @@ import math
 import random
 from .enemy_base import BaseEnemy, EnemyState
 from utils.asset_loader import get_asset_loader
+from utils.animation import variant_animation_set
+from utils.object_pool import get_pool
 import sys
 import os
 
@@ -12,10 +14,23 @@ import settings
 
 class Goomba(BaseEnemy):
 
+    STOMP_BOUNCE_HEIGHTS = {'normal': 8, 'fast': 8, 'large': 12, 'elite': 15}
+    _blank_textures = {}  # size -> texture
+
     def __init__(self, scale=1.0, variant='normal'):
         super().__init__("goomba", scale)
+        self._init_goomba(variant)
+
+    def reset(self, scale=1.0, variant='normal'):
+        #Pooled goombas come back as a new goomba of the given variant
+        super().reset(scale)
+        self.__dict__.pop('goomba_color', None)
+        self.__dict__.pop('goomba_size', None)
+        self._init_goomba(variant)
 
+    def _init_goomba(self, variant):
         self.variant = variant
+        self.animation_set = variant_animation_set('goomba', variant)
 
         self._setup_variant_properties()
 
@@ -87,8 +102,12 @@ class Goomba(BaseEnemy):
         self.goomba_color = color
         self.goomba_size = size
         
-        # Create a basic empty texture with just the size
-        self.texture = arcade.Texture.create_empty("goomba", (size, size))
+        # Basic empty texture with just the size, one per size shared by every goomba
+        texture = Goomba._blank_textures.get(size)
+        if texture is None:
+            texture = arcade.Texture.create_empty("goomba", (size, size))
+            Goomba._blank_textures[size] = texture
+        self.texture = texture
 
     def update(self, delta_time=1/60):
         #call parent update function first
@@ -130,7 +149,8 @@ class Goomba(BaseEnemy):
 
         if self.state_timer > self.squish_duration:
             self.squished = False
-            if self.health > 0:
+            #A large goomba that fell off the map still has health, dying has to win over waking up
+            if self.health > 0 and self.state not in [EnemyState.DYING, EnemyState.DEAD]:
                 self.set_state(EnemyState.WALKING)
 
     def take_damage(self, damage=1, damage_type='normal'):
@@ -201,11 +221,7 @@ class Goomba(BaseEnemy):
         if collision_side == 'top':
             died = self.take_damage(1, 'stomp')
 
-            bounce_height = 8
-            if self.variant == 'large':
-                bounce_height = 12
-            elif self.variant == 'elite':
-                bounce_height = 15
+            bounce_height = self.STOMP_BOUNCE_HEIGHTS.get(self.variant, 8)
 
             return {
                 'type': 'stomp',
@@ -265,23 +281,25 @@ class Goomba(BaseEnemy):
         else:
             super().draw()
     
+goomba_pool = get_pool(Goomba)
+
 class GoombaSpawner:
 
     @staticmethod
     def spawn_normal_goomba(x, y):
-        return Goomba(variant='normal').setup_position(x, y)
+        return create_goomba(x, y, 'normal')
     
     @staticmethod
     def spawn_fast_goomba(x, y):
-        return Goomba(variant='fast').setup_position(x, y)
+        return create_goomba(x, y, 'fast')
     
     @staticmethod
     def spawn_large_goomba(x, y):
-        return Goomba(variant='large').setup_position(x, y)
+        return create_goomba(x, y, 'large')
 
     @staticmethod
     def spawn_elite_goomba(x, y):
-        return Goomba(variant='elite').setup_position(x, y)
+        return create_goomba(x, y, 'elite')
     
     @staticmethod
     def spawn_goomba_group(positions, variant_weights=None):
@@ -299,7 +317,7 @@ class GoombaSpawner:
 
         for x, y in positions:
             variant = random.choices(variants, weights=weights)[0]
-            goomba = Goomba(variant=variant)
+            goomba = goomba_pool.acquire(variant=variant)
             goomba.setup_position(x, y)
             goombas.append(goomba)
 
@@ -317,7 +335,7 @@ class GoombaSpawner:
             ]
             for i, (x,y) in enumerate(positions):
                 variant = 'normal' if i != 1 else 'fast'  # Middle one is fast
-                goomba = Goomba(variant=variant)
+                goomba = goomba_pool.acquire(variant=variant)
                 goomba.setup_position(x, y)
                 goombas.append(goomba)
 
@@ -329,7 +347,7 @@ class GoombaSpawner:
             ]
             variants = ['elite', 'normal', 'normal']
             for (x, y), variant in zip(positions, variants):
-                goomba = Goomba(variant=variant)
+                goomba = goomba_pool.acquire(variant=variant)
                 goomba.setup_position(x, y)
                 goombas.append(goomba)
 
@@ -342,14 +360,14 @@ class GoombaSpawner:
             ]
             variants = ['normal', 'fast', 'normal', 'large']
             for (x, y), variant in zip(positions, variants):
-                goomba = Goomba(variant=variant)
+                goomba = goomba_pool.acquire(variant=variant)
                 goomba.setup_position(x, y)
                 goombas.append(goomba)
 
         return goombas
     
 def create_goomba(x, y, variant='normal'):
-    goomba = Goomba(variant=variant)
+    goomba = goomba_pool.acquire(variant=variant)
     goomba.setup_position(x, y)
     return goomba
 
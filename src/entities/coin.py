@@ -1,10 +1,12 @@
 #Coin class
 import arcade
 import math
-import time
 import sys
 import os
 from utils.asset_loader import get_asset_loader
+from utils.activation import ColumnBuckets
+from utils.object_pool import get_pool
+from utils.animation import variant_animation_set
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -12,8 +14,19 @@ import settings
 
 class Coin(arcade.Sprite):
 
+    _blank_texture = None
+
     def __init__(self, coin_type='normal', value=None, scale=1.0):
         super().__init__(scale=scale)
+        self.reset(coin_type, value, scale)
+
+    def reset(self, coin_type='normal', value=None, scale=1.0):
+        #Back to a freshly constructed coin, the pool calls this instead of building a new one
+        self.scale = scale
+        self.change_x = 0
+        self.change_y = 0
+        self.__dict__.pop('_original_y', None)
+        self.__dict__.pop('_collection_start_y', None)
 
         self.coin_type = coin_type
         self.value = value or self._get_default_value()
@@ -59,13 +72,16 @@ class Coin(arcade.Sprite):
         color = colors.get(self.coin_type, colors["normal"])
         
         self.coin_color = color
-        
-        self.texture = arcade.Texture.create_empty("coin", (settings.COIN_SIZE, settings.COIN_SIZE))
+
+        #One blank texture for every coin, add_coin swaps in the real one
+        if Coin._blank_texture is None:
+            Coin._blank_texture = arcade.Texture.create_empty("coin", (settings.COIN_SIZE, settings.COIN_SIZE))
+        self.texture = Coin._blank_texture
 
     def setup_position(self, x, y):
         self.center_x = x
         self.center_y = y
-        self.bounce_offset = time.time() * self.bounce_speed
+        self.bounce_offset = 0.0  # Not the wall clock, so seeded headless runs replay exactly
 
     def update(self, delta_time=1/60):
         if self.is_collected:
@@ -129,20 +145,20 @@ class Coin(arcade.Sprite):
         if self.is_collected:
             return False
         
-        distance = math.sqrt(
-            (target_sprite.center_x - self.center_x)**2 +
-            (target_sprite.center_y - self.center_y)**2
-        )
+        dx = target_sprite.center_x - self.center_x
+        dy = target_sprite.center_y - self.center_y
 
-        return distance <= self.magnetic_range
+        return dx*dx + dy*dy <= self.magnetic_range * self.magnetic_range
     
-    def apply_magnetic_force(self, target_sprite, delta_time):
+    def apply_magnetic_force(self, target_sprite, delta_time, distance=None):
+        #distance can be passed in when the caller already has it
         if self.is_collected:
             return
         
         dx = target_sprite.center_x - self.center_x
         dy = target_sprite.center_y - self.center_y
-        distance = math.sqrt(dx*dx + dy*dy)
+        if distance is None:
+            distance = math.sqrt(dx*dx + dy*dy)
 
         if distance > 0  and distance <= self.magnetic_range:
             force_strength = (self.magnetic_range - distance) / self.magnetic_range
@@ -170,9 +186,11 @@ class Coin(arcade.Sprite):
         else:
             super().draw()
 
+coin_pool = get_pool(Coin)
+
 class CoinManager:
 
-    def __init__(self):
+    def __init__(self, animation_manager=None):
         self.coin_list = arcade.SpriteList(use_spatial_hash=True)
         self.total_coins = 0
         self.collected_coins = 0
@@ -181,8 +199,22 @@ class CoinManager:
         self.magnetic_collection = True
         self.auto_collect_distance = 30
 
+        self.buckets = ColumnBuckets()
+        self.awake_coins = None  # None while every coin is awake
+
+        self.collecting = []  # Collected coins still playing their animation, pooled once it ends
+        self.collections = []  # Collection info of coins picked up since check_player_collection last ran
+        self.swept = False  # update() has looked for pickups since then
+
+        #Bounds for the radius query around the player, grown as coins are added
+        self.max_magnetic_range = 0
+        self.coin_reach = 0  # Half diagonal of the largest coin
+
+        #Coins spin in shared AnimationGroups, a collected one gets its own controller
+        self.animation_manager = animation_manager
+
     def add_coin(self, x, y, coin_type='normal', value=None):
-        coin = Coin(coin_type, value)
+        coin = coin_pool.acquire(coin_type, value)
         coin.setup_position(x, y)
 
         asset_loader = get_asset_loader()
@@ -192,45 +224,107 @@ class CoinManager:
                 coin.texture = texture
 
         self.coin_list.append(coin)
+        self.buckets.add(coin)
+        if self.animation_manager:
+            self.animation_manager.join_group(coin, variant_animation_set('coin', coin_type), 'spin')
         self.total_coins += 1
         self.total_value += coin.value
 
+        self.max_magnetic_range = max(self.max_magnetic_range, coin.magnetic_range)
+        self.coin_reach = max(self.coin_reach, math.hypot(coin.width, coin.height) / 2)
+
         return coin
     
-    def update(self, delta_time, player_sprite=None):
-        self.coin_list.update(delta_time)
-
-        if player_sprite and self.magnetic_collection:
-            for coin in self.coin_list:
-                if not coin.is_collected:
-                    distance = math.sqrt(
-                        (player_sprite.center_x - coin.center_x)**2 +
-                        (player_sprite.center_y - coin.center_y)**2
-                    )
-
-                    if distance <= self.auto_collect_distance:
-                        value = coin.collect(player_sprite)
-                        if value > 0:
-                            self.collected_coins += 1
-                            return coin.get_collection_info()
-                    
-                    elif coin.check_magnetic_attraction(player_sprite):
-                        coin.apply_magnetic_force(player_sprite, delta_time)
-
-        return None
-    
-    def check_player_collection(self, player_sprite):
-        collections = []
-        hit_list = arcade.check_for_collision_with_list(player_sprite, self.coin_list)
+    def activate(self, window=None):
+        #Coins outside the window stop bobbing & can't be pulled in until they wake up
+        self.awake_coins = None if window is None else self.buckets.query(window)
+
+    def get_awake_coins(self):
+        return self.coin_list if self.awake_coins is None else self.awake_coins
 
-        for coin in hit_list:
-            if not coin.is_collected:
+    def update(self, delta_time, player_sprite=None):
+        if self.awake_coins is None:
+            self.coin_list.update(delta_time)
+        else:
+            for coin in self.awake_coins:
+                coin.update(delta_time)
+            self.buckets.rebucket(self.awake_coins)
+
+        self._release_collected()
+
+        if player_sprite:
+            self._sweep(player_sprite, delta_time)
+
+    def query_radius(self, x, y, radius):
+        #(coin, squared distance) for every coin centred within radius of (x, y), nearest first
+        #coin_list's spatial hash narrows it to the cells the circle's bounding box covers
+        radius_sq = radius * radius
+        nearby = []
+        for coin in self.coin_list.spatial_hash.get_sprites_near_rect(arcade.LRBT(x - radius, x + radius, y - radius, y + radius)):
+            dx = coin.center_x - x
+            dy = coin.center_y - y
+            distance_sq = dx*dx + dy*dy
+            if distance_sq <= radius_sq:
+                nearby.append((coin, distance_sq))
+
+        nearby.sort(key=lambda item: item[1])  # The hash hands back a set, keep pickups in a stable order
+        return nearby
+
+    def _sweep(self, player_sprite, delta_time):
+        #One pass over the coins near the player - touched or within auto_collect_distance get collected,
+        #the rest of the ones in magnetic range get pulled in
+        reach = math.hypot(player_sprite.width, player_sprite.height) / 2 + self.coin_reach
+        reach_sq = reach * reach
+        radius = reach
+
+        auto_collect_sq = -1
+        if self.magnetic_collection:
+            auto_collect_sq = self.auto_collect_distance * self.auto_collect_distance
+            radius = max(radius, self.auto_collect_distance, self.max_magnetic_range)
+
+        for coin, distance_sq in self.query_radius(player_sprite.center_x, player_sprite.center_y, radius):
+            if coin.is_collected:
+                continue
+
+            if distance_sq <= auto_collect_sq or (distance_sq <= reach_sq and arcade.check_for_collision(player_sprite, coin)):
                 value = coin.collect(player_sprite)
                 if value > 0:
+                    if self.animation_manager:
+                        self.animation_manager.diverge(coin, variant_animation_set('coin', coin.coin_type), 'collect')
                     self.collected_coins += 1
-                    collections.append(coin.get_collection_info())
+                    self.collecting.append(coin)
+                    self.collections.append(coin.get_collection_info())
+
+            elif self.magnetic_collection and distance_sq <= coin.magnetic_range * coin.magnetic_range:
+                coin.apply_magnetic_force(player_sprite, delta_time, math.sqrt(distance_sq))
 
+        self.swept = True
+    
+    def check_player_collection(self, player_sprite):
+        #Collection info for everything picked up since the last call, update() already did the looking
+        if not self.swept:
+            self._sweep(player_sprite, 0)
+
+        collections = self.collections
+        self.collections = []
+        self.swept = False
         return collections
+
+    def _release_collected(self):
+        #Coins remove themselves from their lists when the collection animation ends
+        if not self.collecting:
+            return
+
+        still_collecting = []
+        for coin in self.collecting:
+            if coin.sprite_lists:
+                still_collecting.append(coin)
+            else:
+                self.buckets.discard(coin)
+                if self.animation_manager:
+                    self.animation_manager.cleanup_sprite(coin)
+                coin_pool.release(coin)
+        self.collecting = still_collecting
     
     def get_stats(self):
         return {
@@ -242,7 +336,22 @@ class CoinManager:
         }
     
     def reset(self):
+        #Every coin goes back to the pool, clear() keeps coin_list's buffer capacity for the next level
+        coins = list(self.coin_list)
+        coins.extend(coin for coin in self.collecting if not coin.sprite_lists)
         self.coin_list.clear()
+        if self.animation_manager:
+            for coin in coins:
+                self.animation_manager.cleanup_sprite(coin)
+        coin_pool.release_all(coins)
+
+        self.buckets.clear()
+        self.awake_coins = None
+        self.collecting = []
+        self.collections = []
+        self.swept = False
+        self.max_magnetic_range = 0
+        self.coin_reach = 0
         self.total_coins = 0
         self.collected_coins = 0
         self.total_value = 0
@@ -267,7 +376,7 @@ def create_coin_line(start_x, start_y, end_x, end_y, spacing=64, coin_type='norm
         x = start_x + dx * progress
         y = start_y + dy * progress
 
-        coin = Coin(coin_type)
+        coin = coin_pool.acquire(coin_type)
         coin.setup_position(x, y)
         coins.append(coin)
 
@@ -281,7 +390,7 @@ def create_coin_circle(center_x, center_y, radius, num_coins=8, coin_type='norma
         x = center_x + math.cos(angle) * radius
         y = center_y + math.sin(angle) * radius
 
-        coin = Coin(coin_type)
+        coin = coin_pool.acquire(coin_type)
         coin.setup_position(x, y)
         coins.append(coin)
 
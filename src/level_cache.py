@@ -0,0 +1,218 @@
+#Compiled level cache
+#TMX/JSON levels are parsed once and written out as a flat binary file next to the source,
+#later loads memory-map that file instead of re-parsing as long as the source is unchanged
+#
+#Layout (little endian):
+#   header      magic, version, bytes per tile, sha256 of the source, width, height, tile size
+#   sections    offset & length of the tiles, enemy spawns, coin spawns & meta blocks
+#   tiles       width * height tile ids, row-major, bottom row first - same as TileMap.tiles
+#   enemies     (x, y, type index, variant index) per spawn
+#   coins       (x, y, coin type index) per spawn
+#   meta        JSON - name, player spawn, level end, properties, background decorations & the string tables for the spawns
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import settings
+from tilemap import TileMap, TileMapLoader
+
+MAGIC = b'BLVL'
+VERSION = 3
+CACHE_DIR = '__levelcache__'
+EXTENSION = '.blvl'
+
+HEADER = struct.Struct('<4sHBx32sIIH2x')
+SECTIONS = struct.Struct('<8I')
+ENEMY_RECORD = struct.Struct('<ffHH')
+COIN_RECORD = struct.Struct('<ffH')
+ALIGNMENT = 8
+
+META_FIELDS = ('background_music', 'time_limit', 'next_level', 'asset_groups', 'decorations')
+
+def cache_path(filename):
+    #levels/level1-1.tmx -> levels/__levelcache__/level1-1.tmx.blvl
+    directory, name = os.path.split(filename)
+    return os.path.join(directory, CACHE_DIR, name + EXTENSION)
+
+def source_hash(filename):
+    #Tile scaling changes every pixel position in the artifact, so it's part of the key
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        digest.update(f.read())
+    digest.update(struct.pack('<Hd', VERSION, settings.TILE_SCALING))
+    return digest.digest()
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def _pad(buffer):
+    buffer.extend(b'\0' * (_align(len(buffer)) - len(buffer)))
+
+def _spawn_dict(spawn):
+    #JSON & test levels store enemy spawns as (x, y) pairs, TMX ones as dicts
+    if isinstance(spawn, dict):
+        return spawn
+    return {'x': spawn[0], 'y': spawn[1]}
+
+def _index(table, value):
+    if value not in table:
+        table.append(value)
+    return table.index(value)
+
+def compile_level(tilemap, digest, out_path):
+    #Writes tilemap's tiles, spawns & properties to out_path
+    tile_bytes = 1 if max((max(row, default=0) for row in tilemap.tiles), default=0) <= 0xFF else 2
+    tile_format = 'B' if tile_bytes == 1 else 'H'
+
+    enemy_types = []
+    enemy_variants = []
+    enemies = bytearray()
+    for spawn in map(_spawn_dict, tilemap.enemy_spawns):
+        enemies += ENEMY_RECORD.pack(
+            spawn['x'], spawn['y'],
+            _index(enemy_types, spawn.get('type', 'goomba')),
+            _index(enemy_variants, spawn.get('variant', 'normal'))
+        )
+
+    coin_types = []
+    coins = bytearray()
+    for spawn in tilemap.coin_spawns:
+        coins += COIN_RECORD.pack(spawn['x'], spawn['y'], _index(coin_types, spawn.get('coin_type', 'normal')))
+
+    meta = {
+        'name': tilemap.name,
+        'player_spawn': list(tilemap.player_spawn),
+        'level_end': list(tilemap.level_end) if tilemap.level_end else None,
+        'background_color': list(tilemap.background_color),
+        'enemy_types': enemy_types,
+        'enemy_variants': enemy_variants,
+        'coin_types': coin_types
+    }
+    for field in META_FIELDS:
+        if hasattr(tilemap, field):
+            meta[field] = getattr(tilemap, field)
+
+    header = HEADER.pack(MAGIC, VERSION, tile_bytes, digest, tilemap.width, tilemap.height, tilemap.tile_size)
+    buffer = bytearray(header)
+    buffer.extend(b'\0' * SECTIONS.size)
+    _pad(buffer)
+
+    sections = []
+    for block in (
+        b''.join(struct.pack(f'<{tilemap.width}{tile_format}', *row) for row in tilemap.tiles),
+        enemies,
+        coins,
+        json.dumps(meta).encode('utf-8')
+    ):
+        sections += [len(buffer), len(block)]
+        buffer.extend(block)
+        _pad(buffer)
+
+    SECTIONS.pack_into(buffer, HEADER.size, *sections)
+
+    #Write-then-rename so a crash mid-write never leaves a half artifact with a valid hash
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    temp_path = out_path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(buffer)
+    os.replace(temp_path, out_path)
+
+def read_header(path):
+    #(version, tile_bytes, digest, width, height, tile_size) or None if path isn't a level artifact
+    try:
+        with open(path, 'rb') as f:
+            data = f.read(HEADER.size)
+    except OSError:
+        return None
+
+    if len(data) < HEADER.size:
+        return None
+    magic, *fields = HEADER.unpack(data)
+    return tuple(fields) if magic == MAGIC else None
+
+def open_compiled_level(path):
+    #TileMap backed by a private (copy-on-write) mapping of the artifact
+    #Tile rows are memoryviews into the mapping, so nothing is parsed or copied up front and
+    #set_tile() edits (broken bricks) stay in this process
+    with open(path, 'rb') as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    magic, version, tile_bytes, digest, width, height, tile_size = HEADER.unpack_from(mapping)
+    tile_offset, _, enemy_offset, enemy_length, coin_offset, coin_length, meta_offset, meta_length = \
+        SECTIONS.unpack_from(mapping, HEADER.size)
+
+    tiles = memoryview(mapping)[tile_offset:tile_offset + width * height * tile_bytes]
+    if tile_bytes == 2:
+        tiles = tiles.cast('H')
+    rows = [tiles[y * width:(y + 1) * width] for y in range(height)]
+
+    tilemap = TileMap(width, height, tile_size, tiles=rows)
+    tilemap.compiled_level = mapping  # Keeps the mapping alive as long as the rows are
+
+    meta = json.loads(bytes(mapping[meta_offset:meta_offset + meta_length]))
+    tilemap.name = meta['name']
+    tilemap.player_spawn = tuple(meta['player_spawn'])
+    tilemap.level_end = tuple(meta['level_end']) if meta['level_end'] else None
+    tilemap.background_color = tuple(meta['background_color'])
+    for field in META_FIELDS:
+        if field in meta:
+            setattr(tilemap, field, meta[field])
+
+    enemy_types = meta['enemy_types']
+    enemy_variants = meta['enemy_variants']
+    tilemap.enemy_spawns = [
+        {'x': x, 'y': y, 'type': enemy_types[type_index], 'variant': enemy_variants[variant_index]}
+        for x, y, type_index, variant_index
+        in ENEMY_RECORD.iter_unpack(mapping[enemy_offset:enemy_offset + enemy_length])
+    ]
+
+    coin_types = meta['coin_types']
+    tilemap.coin_spawns = [
+        {'x': x, 'y': y, 'coin_type': coin_types[type_index]}
+        for x, y, type_index in COIN_RECORD.iter_unpack(mapping[coin_offset:coin_offset + coin_length])
+    ]
+
+    return tilemap
+
+def _parse_source(filename):
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == '.json':
+        return TileMapLoader.load_from_json(filename, build_sprites=False)
+    if ext == '.tmx':
+        return TileMapLoader.read_tiled_tmx(filename)
+    return None
+
+def load_compiled_level(filename, rebuild=False):
+    #TileMap for filename w/o sprites, from the artifact when its hash matches the source
+    #The source is parsed & the artifact rewritten when it's missing, stale or from another VERSION
+    #Returns None if the source can't be parsed
+    digest = source_hash(filename)
+    path = cache_path(filename)
+
+    header = read_header(path)
+    if not rebuild and header and header[0] == VERSION and header[2] == digest:
+        return open_compiled_level(path)
+
+    tilemap = _parse_source(filename)
+    if tilemap is None:
+        return None
+
+    try:
+        compile_level(tilemap, digest, path)
+    except OSError as e:
+        #Read-only install, the parsed level is still good for this run
+        print(f"Could not write level cache {path}: {e}")
+        return tilemap
+
+    return open_compiled_level(path)
+
+if __name__ == "__main__":
+    #Precompile levels: python src/level_cache.py levels/*.tmx
+    for filename in sys.argv[1:]:
+        tilemap = load_compiled_level(filename, rebuild=True)
+        if tilemap is None:
+            print(f"Skipped {filename}")
+        else:
+            print(f"{filename} -> {cache_path(filename)} ({tilemap.width}x{tilemap.height})")
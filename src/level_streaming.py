@@ -0,0 +1,174 @@
+#Chunked level streaming
+#Long levels are split into fixed-width column chunks, only the chunks around the camera have sprites
+import arcade
+import math
+import settings
+from physics import CollisionGrid
+from tilemap import TileType
+
+class LevelChunk:
+    #One column strip of a level - its own sprite lists & collision cells
+
+    def __init__(self, index, first_column, last_column):
+        self.index = index
+        self.first_column = first_column
+        self.last_column = last_column  # Exclusive
+
+        self.wall_list = arcade.SpriteList(use_spatial_hash=True)
+        self.background_list = arcade.SpriteList()
+        self.interactive_list = arcade.SpriteList()
+
+        self.collision = None
+        self.cells = []  # (grid_x, grid_y, sprite) for writing tile changes back on unload
+
+    @property
+    def width(self):
+        return self.last_column - self.first_column
+
+    def build(self, tilemap):
+        #Sprites & solidity for this chunk's columns, from the level's tile grid
+        tiles = tilemap.tiles
+        columns = slice(self.first_column, self.last_column)
+
+        self.collision = CollisionGrid.from_tiles(
+            [row[columns] for row in tiles], TileType.SOLID_TYPES, tilemap.tile_size
+        )
+        self.collision.origin_x = self.first_column * tilemap.tile_size
+
+        for grid_y, row in enumerate(tiles):
+            for grid_x in range(self.first_column, self.last_column):
+                tile_type = row[grid_x]
+                if tile_type == TileType.EMPTY or tile_type in TileType.MARKER_TYPES:
+                    continue  # Markers were read into the TileMap's spawns by scan_markers()
+
+                tile = tilemap.create_tile_sprite(grid_x, grid_y, tile_type)
+                getattr(self, tilemap.tile_layer(tile)).append(tile)
+                self.cells.append((grid_x, grid_y, tile))
+
+        for grid_x, grid_y, tile_type in tilemap.decorations:
+            if self.first_column <= grid_x < self.last_column:
+                self.background_list.append(tilemap.create_tile_sprite(grid_x, grid_y, tile_type))
+
+        for sprite in self.wall_list:
+            if hasattr(sprite, 'on_collision'):
+                self.collision.add_sprite(sprite)
+
+    def write_back(self, tilemap):
+        #Broken bricks & used question blocks stay that way when the chunk is rebuilt later
+        for grid_x, grid_y, sprite in self.cells:
+            if not sprite.sprite_lists:
+                tilemap.set_tile(grid_x, grid_y, TileType.EMPTY)
+            else:
+                tilemap.set_tile(grid_x, grid_y, sprite.tile_type)
+
+    def draw(self):
+        self.background_list.draw()
+        self.wall_list.draw()
+        self.interactive_list.draw()
+
+class ChunkedLevel:
+    #Loads & unloads LevelChunks as the visible range scrolls, so sprite count, spatial hashes
+    #and the physics grid stay bounded no matter how wide the level is
+    #The TileMap keeps the tile ids for the whole level and is the source every chunk is built from
+
+    def __init__(self, tilemap, chunk_columns=None):
+        self.tilemap = tilemap
+        self.chunk_columns = chunk_columns or settings.LEVEL_CHUNK_COLUMNS
+        self.chunk_width = self.chunk_columns * tilemap.tile_size
+        self.chunk_count = math.ceil(tilemap.width / self.chunk_columns)
+
+        self.chunks = {}  # index -> LevelChunk, loaded chunks only
+        self.interactive_list = arcade.SpriteList(use_spatial_hash=True)  # Loaded interactive tiles, for the physics engine
+        self.collision_grid = CollisionGrid(0, tilemap.height, tilemap.tile_size)
+
+        self.chunks_loaded = 0
+        self.chunks_unloaded = 0
+
+    def chunk_range(self, left, right):
+        #Inclusive chunk indices covering pixels left..right
+        first = max(0, int(left // self.chunk_width))
+        last = min(self.chunk_count - 1, int(right // self.chunk_width))
+        return first, last
+
+    def update(self, left, right):
+        #Makes sure left..right is loaded, returns True if collision_grid was replaced
+        first, last = self.chunk_range(left, right)
+
+        # One chunk of slack on each side so standing on a chunk border doesn't thrash
+        stale = [index for index in self.chunks if index < first - 1 or index > last + 1]
+        missing = [index for index in range(first, last + 1) if index not in self.chunks]
+        if not stale and not missing:
+            return False
+
+        self._store_collision()
+
+        for index in stale:
+            self._unload_chunk(index)
+        for index in missing:
+            self._load_chunk(index)
+
+        self._stitch_collision()
+        return True
+
+    def _load_chunk(self, index):
+        first_column = index * self.chunk_columns
+        last_column = min(first_column + self.chunk_columns, self.tilemap.width)
+
+        chunk = LevelChunk(index, first_column, last_column)
+        chunk.build(self.tilemap)
+        self.interactive_list.extend(chunk.interactive_list)
+
+        self.chunks[index] = chunk
+        self.chunks_loaded += 1
+
+    def _unload_chunk(self, index):
+        chunk = self.chunks.pop(index)
+        chunk.write_back(self.tilemap)
+
+        for sprite in chunk.interactive_list:
+            self.interactive_list.remove(sprite)
+
+        self.chunks_unloaded += 1
+
+    def _store_collision(self):
+        #Copies cells cleared through collision_grid (broken bricks) back into each chunk's grid
+        grid = self.collision_grid
+        for chunk in self.chunks.values():
+            offset = int(round((chunk.collision.origin_x - grid.origin_x) / grid.tile_size))
+            if offset < 0 or offset + chunk.width > grid.width:
+                continue  # Loaded after the last stitch
+
+            for row in range(grid.height):
+                start = row * grid.width + offset
+                chunk.collision.solid[row * chunk.width:(row + 1) * chunk.width] = grid.solid[start:start + chunk.width]
+
+            chunk.collision.cell_sprites = {
+                index: sprite for index, sprite in chunk.collision.cell_sprites.items()
+                if chunk.collision.solid[index]
+            }
+
+    def _stitch_collision(self):
+        #Loaded chunks are always one contiguous run, the physics grid spans exactly that run
+        ordered = [self.chunks[index] for index in sorted(self.chunks)]
+        self.collision_grid = CollisionGrid.stitch([chunk.collision for chunk in ordered])
+        if not ordered:
+            self.collision_grid = CollisionGrid(0, self.tilemap.height, self.tilemap.tile_size)
+
+    def unload_all(self):
+        self._store_collision()
+        for index in list(self.chunks):
+            self._unload_chunk(index)
+        self._stitch_collision()
+
+    def draw(self):
+        for index in sorted(self.chunks):
+            self.chunks[index].draw()
+
+    def get_stats(self):
+        return {
+            'chunk_count': self.chunk_count,
+            'loaded_chunks': len(self.chunks),
+            'loaded_sprites': sum(len(chunk.cells) for chunk in self.chunks.values()),
+            'chunks_loaded': self.chunks_loaded,
+            'chunks_unloaded': self.chunks_unloaded
+        }
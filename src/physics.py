@@ -76,8 +76,9 @@ class PhysicsBody:
         self.previous_x = self.sprite.center_x
         self.previous_y = self.sprite.center_y
 
-        self.sprite.center_x += self.velocity_x * delta_time * 60  # assuming 60 fps
-        self.sprite.center_y += self.velocity_y * delta_time * 60
+        ticks = delta_time / settings.FIXED_TIMESTEP  # velocities are in px per tick
+        self.sprite.center_x += self.velocity_x * ticks
+        self.sprite.center_y += self.velocity_y * ticks
 
 class CollisionDetector:
 
@@ -141,10 +142,241 @@ class CollisionDetector:
                 if moving_sprite.change_y > 0:
                     moving_sprite.change_y = 0
 
+class CollisionGrid:
+    #Solidity bitmap for static terrain, one byte per tile cell, rows from the bottom up
+    #Queries only read the cells a body's AABB covers, so cost doesn't grow with level size
+
+    def __init__(self, width, height, tile_size=None, origin_x=0, origin_y=0):
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size or settings.TILE_SIZE
+        self.origin_x = origin_x
+        self.origin_y = origin_y
+
+        self.solid = bytearray(width * height)
+        self.cell_sprites = {}  # cell index -> tile sprite, for on_collision callbacks
+
+    @classmethod
+    def from_tiles(cls, tiles, solid_types, tile_size=None):
+        #Builds from a TileMap style grid, tiles[y][x] with y = 0 at the bottom
+        height = len(tiles)
+        width = len(tiles[0]) if height else 0
+        grid = cls(width, height, tile_size)
+
+        for y, row in enumerate(tiles):
+            for x, tile_type in enumerate(row):
+                if tile_type in solid_types:
+                    grid.solid[y * width + x] = 1
+
+        return grid
+
+    @classmethod
+    def from_sprite_list(cls, sprite_list, tile_size=None):
+        #Rasterizes wall sprites onto a grid anchored at their bottom-left corner
+        tile_size = tile_size or settings.TILE_SIZE
+        if len(sprite_list) == 0:
+            return cls(0, 0, tile_size)
+
+        origin_x = min(sprite.left for sprite in sprite_list)
+        origin_y = min(sprite.bottom for sprite in sprite_list)
+        width = math.ceil((max(sprite.right for sprite in sprite_list) - origin_x) / tile_size)
+        height = math.ceil((max(sprite.top for sprite in sprite_list) - origin_y) / tile_size)
+
+        grid = cls(width, height, tile_size, origin_x, origin_y)
+        for sprite in sprite_list:
+            grid.add_sprite(sprite)
+
+        return grid
+
+    @classmethod
+    def stitch(cls, grids):
+        #Joins side-by-side grids of equal height (level chunks, left to right) into one
+        if not grids:
+            return cls(0, 0)
+
+        first = grids[0]
+        width = sum(grid.width for grid in grids)
+        stitched = cls(width, first.height, first.tile_size, first.origin_x, first.origin_y)
+
+        offset = 0
+        for grid in grids:
+            for row in range(grid.height):
+                start = row * width + offset
+                stitched.solid[start:start + grid.width] = grid.solid[row * grid.width:(row + 1) * grid.width]
+
+            for index, sprite in grid.cell_sprites.items():
+                row, column = divmod(index, grid.width)
+                stitched.cell_sprites[row * width + offset + column] = sprite
+
+            offset += grid.width
+
+        return stitched
+
+    def _cell_range(self, left, bottom, right, top):
+        #Inclusive cell bounds overlapping a rect, touching edges don't count
+        tolerance = PhysicsConstants.COLLISION_TOLERANCE
+        tile_size = self.tile_size
+
+        x0 = max(0, int((left - self.origin_x + tolerance) // tile_size))
+        x1 = min(self.width - 1, int((right - self.origin_x - tolerance) // tile_size))
+        y0 = max(0, int((bottom - self.origin_y + tolerance) // tile_size))
+        y1 = min(self.height - 1, int((top - self.origin_y - tolerance) // tile_size))
+
+        return x0, y0, x1, y1
+
+    def add_sprite(self, sprite):
+        x0, y0, x1, y1 = self._cell_range(sprite.left, sprite.bottom, sprite.right, sprite.top)
+        for cell_y in range(y0, y1 + 1):
+            for cell_x in range(x0, x1 + 1):
+                index = cell_y * self.width + cell_x
+                self.solid[index] = 1
+                if hasattr(sprite, 'on_collision'):
+                    self.cell_sprites[index] = sprite
+
+    def remove_sprite(self, sprite):
+        x0, y0, x1, y1 = self._cell_range(sprite.left, sprite.bottom, sprite.right, sprite.top)
+        for cell_y in range(y0, y1 + 1):
+            for cell_x in range(x0, x1 + 1):
+                index = cell_y * self.width + cell_x
+                self.solid[index] = 0
+                self.cell_sprites.pop(index, None)
+
+    def solid_cells_in_rect(self, left, bottom, right, top):
+        #(cell_x, cell_y) for every solid cell overlapping the rect
+        x0, y0, x1, y1 = self._cell_range(left, bottom, right, top)
+        solid = self.solid
+        width = self.width
+
+        hits = []
+        for cell_y in range(y0, y1 + 1):
+            row = cell_y * width
+            for cell_x in range(x0, x1 + 1):
+                if solid[row + cell_x]:
+                    hits.append((cell_x, cell_y))
+
+        return hits
+
+    def depenetrate(self, left, bottom, right, top, max_steps=4):
+        #(dx, dy) that moves an AABB already overlapping solid cells out of them, (0, 0) when it's clear
+        #Pushes along the axis of least overlap first, falls back to the next one if that lands in terrain too
+        #The sweeps only test cells past the leading edge, so a body has to be out before they run
+        total_dx = total_dy = 0.0
+        for _ in range(max_steps):
+            hits = self.solid_cells_in_rect(left, bottom, right, top)
+            if not hits:
+                break
+
+            columns = [cell_x for cell_x, _ in hits]
+            rows = [cell_y for _, cell_y in hits]
+            pushes = sorted((
+                (self.cell_left(min(columns)) - right, 0.0),
+                (self.cell_right(max(columns)) - left, 0.0),
+                (0.0, self.cell_bottom(min(rows)) - top),
+                (0.0, self.cell_top(max(rows)) - bottom)
+            ), key=lambda push: abs(push[0]) + abs(push[1]))
+
+            dx, dy = next(
+                (push for push in pushes
+                 if not self.solid_cells_in_rect(left + push[0], bottom + push[1], right + push[0], top + push[1])),
+                pushes[0]
+            )
+            left += dx
+            right += dx
+            bottom += dy
+            top += dy
+            total_dx += dx
+            total_dy += dy
+
+        return total_dx, total_dy
+
+    def sweep_x(self, left, bottom, right, top, dx):
+        #Sweeps an AABB along x in one pass
+        #Returns (allowed dx, solid cells of the first blocking column) - no tunnelling at any speed
+        tolerance = PhysicsConstants.COLLISION_TOLERANCE
+        tile_size = self.tile_size
+
+        y0 = max(0, int((bottom - self.origin_y + tolerance) // tile_size))
+        y1 = min(self.height - 1, int((top - self.origin_y - tolerance) // tile_size))
+        if dx == 0 or y0 > y1:
+            return dx, []
+
+        if dx > 0:
+            first = int((right - self.origin_x - tolerance) // tile_size) + 1
+            last = int((right + dx - self.origin_x - tolerance) // tile_size)
+            columns = range(max(first, 0), min(last, self.width - 1) + 1)
+        else:
+            first = int((left - self.origin_x + tolerance) // tile_size) - 1
+            last = int((left + dx - self.origin_x + tolerance) // tile_size)
+            columns = range(min(first, self.width - 1), max(last, 0) - 1, -1)
+
+        for cell_x in columns:
+            hits = [(cell_x, cell_y) for cell_y in range(y0, y1 + 1) if self.solid[cell_y * self.width + cell_x]]
+            if hits:
+                if dx > 0:
+                    return self.cell_left(cell_x) - right, hits
+                return self.cell_right(cell_x) - left, hits
+
+        return dx, []
+
+    def sweep_y(self, left, bottom, right, top, dy):
+        #Same as sweep_x along y, returns (allowed dy, solid cells of the first blocking row)
+        tolerance = PhysicsConstants.COLLISION_TOLERANCE
+        tile_size = self.tile_size
+
+        x0 = max(0, int((left - self.origin_x + tolerance) // tile_size))
+        x1 = min(self.width - 1, int((right - self.origin_x - tolerance) // tile_size))
+        if dy == 0 or x0 > x1:
+            return dy, []
+
+        if dy > 0:
+            first = int((top - self.origin_y - tolerance) // tile_size) + 1
+            last = int((top + dy - self.origin_y - tolerance) // tile_size)
+            rows = range(max(first, 0), min(last, self.height - 1) + 1)
+        else:
+            first = int((bottom - self.origin_y + tolerance) // tile_size) - 1
+            last = int((bottom + dy - self.origin_y + tolerance) // tile_size)
+            rows = range(min(first, self.height - 1), max(last, 0) - 1, -1)
+
+        for cell_y in rows:
+            row = cell_y * self.width
+            hits = [(cell_x, cell_y) for cell_x in range(x0, x1 + 1) if self.solid[row + cell_x]]
+            if hits:
+                if dy > 0:
+                    return self.cell_bottom(cell_y) - top, hits
+                return self.cell_top(cell_y) - bottom, hits
+
+        return dy, []
+
+    def is_solid(self, cell_x, cell_y):
+        if 0 <= cell_x < self.width and 0 <= cell_y < self.height:
+            return self.solid[cell_y * self.width + cell_x] == 1
+        return False
+
+    def is_solid_at(self, x, y):
+        cell_x = int((x - self.origin_x) // self.tile_size)
+        cell_y = int((y - self.origin_y) // self.tile_size)
+        return self.is_solid(cell_x, cell_y)
+
+    def sprite_at(self, cell_x, cell_y):
+        return self.cell_sprites.get(cell_y * self.width + cell_x)
+
+    def cell_left(self, cell_x):
+        return self.origin_x + cell_x * self.tile_size
+
+    def cell_right(self, cell_x):
+        return self.origin_x + (cell_x + 1) * self.tile_size
+
+    def cell_bottom(self, cell_y):
+        return self.origin_y + cell_y * self.tile_size
+
+    def cell_top(self, cell_y):
+        return self.origin_y + (cell_y + 1) * self.tile_size
+
 class PlatformPhysicsEngine:
-    def __init__(self, player_sprite, platforms, gravity=None, interactive_tiles=None):
+    def __init__(self, player_sprite, platforms, gravity=None, interactive_tiles=None, collision_grid=None):
         self.player_sprite = player_sprite
         self.platforms = platforms
+        self.collision_grid = collision_grid  # When set, static terrain is resolved against the grid
         self.interactive_tiles = interactive_tiles or arcade.SpriteList()
         self.gravity = gravity or PhysicsConstants.GRAVITY
 
@@ -162,7 +394,7 @@ class PlatformPhysicsEngine:
         return self.player_on_ground
     
     def update(self):
-        #Updated phsyics updating    
+        #Advances one fixed tick - velocities & gravity are per tick, see FixedTimestep
         if not hasattr(self.player_sprite, 'center_x'):
             print(f"ERROR: player_sprite corrupted! Type: {type(self.player_sprite)}, Value: {self.player_sprite}")
             return
@@ -177,13 +409,19 @@ class PlatformPhysicsEngine:
         if self.player_sprite.change_y < -PhysicsConstants.TERMINAL_VELOCITY:
             self.player_sprite.change_y = -PhysicsConstants.TERMINAL_VELOCITY
 
-        self.player_sprite.center_x += self.player_sprite.change_x
+        if self.collision_grid is not None:
+            # Swept against the grid, one resolve per axis, after getting out of anything already overlapped
+            self.depenetrate()
+            self.sweep_horizontal()
+            self.sweep_vertical()
+        else:
+            self.player_sprite.center_x += self.player_sprite.change_x
 
-        self.check_horizontal_collisions()
+            self.check_horizontal_collisions()
 
-        self.player_sprite.center_y += self.player_sprite.change_y
+            self.player_sprite.center_y += self.player_sprite.change_y
 
-        self.check_vertical_collisions()
+            self.check_vertical_collisions()
 
         self.check_interactive_tile_collisions()
 
@@ -239,6 +477,89 @@ class PlatformPhysicsEngine:
                 if hasattr(platform, 'on_collision'):
                     platform.on_collision(self.player_sprite, side)
 
+    def depenetrate(self):
+        #Respawns, spawn points inside terrain & knockback can leave the player overlapping walls,
+        #push it out the short way & drop any velocity still heading back in
+        sprite = self.player_sprite
+        dx, dy = self.collision_grid.depenetrate(sprite.left, sprite.bottom, sprite.right, sprite.top)
+
+        if dx:
+            sprite.center_x += dx
+            if sprite.change_x * dx < 0:
+                sprite.change_x = 0
+        if dy:
+            sprite.center_y += dy
+            if sprite.change_y * dy < 0:
+                sprite.change_y = 0
+
+    def sweep_horizontal(self):
+        #Moves the player by change_x, stopping at the first solid column in the way
+        self.player_on_wall = False
+
+        sprite = self.player_sprite
+        dx = sprite.change_x
+        allowed, hits = self.collision_grid.sweep_x(sprite.left, sprite.bottom, sprite.right, sprite.top, dx)
+
+        if not hits:
+            sprite.center_x += allowed
+            return
+
+        cell_x = hits[0][0]
+        if dx > 0:
+            sprite.right = self.collision_grid.cell_left(cell_x)
+            self.wall_direction = -1
+            side = 'left'
+        else:
+            sprite.left = self.collision_grid.cell_right(cell_x)
+            self.wall_direction = 1
+            side = 'right'
+
+        sprite.change_x = 0
+        self.player_on_wall = True
+
+        self._notify_grid_tiles(hits, side)
+
+    def sweep_vertical(self):
+        #Moves the player by change_y, landing on or bumping the first solid row in the way
+        self.player_on_ground = False
+
+        sprite = self.player_sprite
+        dy = sprite.change_y
+        allowed, hits = self.collision_grid.sweep_y(sprite.left, sprite.bottom, sprite.right, sprite.top, dy)
+
+        if not hits:
+            sprite.center_y += allowed
+            return
+
+        cell_y = hits[0][1]
+        if dy < 0:
+            sprite.bottom = self.collision_grid.cell_top(cell_y)
+            self.player_on_ground = True
+            side = 'top'
+        else:
+            sprite.top = self.collision_grid.cell_bottom(cell_y)
+            side = 'bottom'
+
+        sprite.change_y = 0
+
+        self._notify_grid_tiles(hits, side)
+
+    def _notify_grid_tiles(self, cells, side):
+        #Fires on_collision for tile sprites behind the hit cells, once per sprite
+        notified = set()
+
+        for cell_x, cell_y in cells:
+            tile = self.collision_grid.sprite_at(cell_x, cell_y)
+            if tile is None or id(tile) in notified:
+                continue
+
+            notified.add(id(tile))
+            tile.on_collision(self.player_sprite, side)
+
+            # Broken bricks remove themselves from their sprite lists
+            if not tile.sprite_lists:
+                self.collision_grid.remove_sprite(tile)
+
     def check_interactive_tile_collisions(self):
         hit_list = arcade.check_for_collision_with_list(self.player_sprite, self.interactive_tiles)
         current_collision_tiles = set()
@@ -270,8 +591,12 @@ class PlatformPhysicsEngine:
 
     def add_platform(self, platform):
         self.platforms.append(platform)
+        if self.collision_grid is not None:
+            self.collision_grid.add_sprite(platform)
 
     def remove_platform(self, platform):
+        if self.collision_grid is not None:
+            self.collision_grid.remove_sprite(platform)
         if platform in self.platforms:
             self.platforms.remove(platform)
 
@@ -350,8 +675,8 @@ class PhysicUtils:
         sprite.change_x += norm_x * force
         sprite.change_y += norm_y * force
 
-def create_physics_engine(player_sprite, platforms, interactive_tiles=None):
-    return PlatformPhysicsEngine(player_sprite, platforms, interactive_tiles=interactive_tiles)
+def create_physics_engine(player_sprite, platforms, interactive_tiles=None, collision_grid=None):
+    return PlatformPhysicsEngine(player_sprite, platforms, interactive_tiles=interactive_tiles, collision_grid=collision_grid)
 
 class TilePhysicsHelper:
 
@@ -5,6 +5,15 @@ SCREEN_WIDTH = 1024
 SCREEN_HEIGHT = 768
 SCREEN_TITLE = "Blob Platformer"
 FPS = 60
+FIXED_TIMESTEP = 1 / FPS   # Gameplay always steps in ticks of this size
+MAX_CATCH_UP_STEPS = 5     # Ticks allowed per rendered frame before time is dropped
+INTERPOLATION_SNAP_DISTANCE = 64  # Moves bigger than this per tick are drawn w/o blending
+ACTIVATION_WINDOW = True         # Sleep enemies & coins outside the camera view + margin
+ACTIVATION_MARGIN = 256          # Pixels past each side of the view that stay awake
+ACTIVATION_BUCKET_WIDTH = 256    # Column width used to find awake sprites
+LEVEL_STREAMING = False          # Load levels in column chunks around the camera (level_streaming.py)
+LEVEL_CHUNK_COLUMNS = 16         # Tile columns per streamed chunk
+LEVEL_CACHE = True               # Reuse compiled levels from levels/__levelcache__ (level_cache.py)
 
 GRAVITY = 0.8
 PLAYER_JUMP_SPEED = 16
@@ -21,6 +30,11 @@ PLAYER_SIZE = 32
 
 ENEMY_SPEED = 1
 ENEMY_BOUNCE_BACK = True
+COMPACT_ENEMY_STORAGE = False  # Enemies as NumPy arrays w/ draw-only sprites (enemies/enemy_store.py)
+#Gameplay matches the sprite path frame for frame (python src/simulation.py --check), random turns are
+#drawn in slot order though, so with ACTIVATION_WINDOW on a crowd can turn differently once enemies sleep
+OBJECT_POOLING = True  # Removed coins & goombas are reset & reused instead of rebuilt (utils/object_pool.py)
+POOL_MAX_FREE = 16384  # Spare instances each pool keeps, the rest are left to the GC
 
 COIN_VALUE = 100
 COIN_SIZE = 24
@@ -37,6 +51,14 @@ ASSETS_PATH = "\assets"
 SPRITES_PATH = f"{ASSETS_PATH}/sprites"
 SOUNDS_PATH = f"{ASSETS_PATH}/sounds"
 LEVELS_PATH = "\levels"
+ASSET_DECODE_WORKERS = 4   # Threads decoding images & sounds at startup, 1 loads everything on the main thread
+TEXTURE_CACHE = True       # Keep resized & placeholder textures in assets/__texturecache__ between runs
+TEXTURE_ATLAS = True       # Pack tile, sprite & UI textures into the GPU atlas at startup
+LAZY_ASSETS = True         # Only load the groups ASSET_MANIFEST lists for the current context, the rest on first use
+ASSET_MANIFEST = {
+    'menu': ['backgrounds', 'buttons', 'menu_sfx'],
+    'level': ['player', 'goombas', 'tiles', 'coins', 'hud', 'sfx']
+}  # Levels add their own with the map property asset_groups ("koopas, castle")
 
 PLAYER_SPRITES = {
     'small': f"{SPRITES_PATH}/player/mario_small.png",
@@ -92,6 +114,9 @@ DEBUG_MODE = False
 SHOW_HITBOXES = False
 SHOW_ENEMIES = True
 SHOW_FPS = True
+PROFILER_ENABLED = False          # Per-subsystem frame timings, F3 toggles the overlay in game
+PROFILER_HISTORY = 240            # Frames kept for the graph & percentiles
+PROFILER_REFRESH_FRAMES = 30      # Frames between percentile table refreshes
 INVINCIBLE_MODE = False #For testing
 
 DEFAULT_LEVEL_WIDTH = 100
@@ -99,6 +124,7 @@ DEFAULT_LEVEL_HEIGHT = 20
 GROUND_HEIGHT = 3
 
 ANIMATION_SPEED = 0.1
+ANIMATION_GROUP_PHASES = 4  # Clocks each shared animation is split over, so crowds don't animate in lockstep; 0 turns groups off
 COIN_SPIN_SPEED = 0.15
 ENEMY_WALK_SPEED = 0.2
 
@@ -123,4 +149,8 @@ GAME_STATES = {
 ENABLE_SOUND = True
 MASTER_VOLUME = 0.7    # Volume control (0.0 to 1.0)
 SFX_VOLUME = 0.8        
-MUSIC_VOLUME = 0.4
\ No newline at end of file
+MUSIC_VOLUME = 0.4
+SOUND_VOICES = 16       # Players shared by all sound effects, more requests steal the least important
+SOUND_MAX_INSTANCES = 4 # Copies of one effect playing at once unless its config says otherwise
+AUDIO_THREAD = True     # Open music streams on a worker thread; players are only touched on the game thread
+MUSIC_CROSSFADE = 1.0   # Seconds the old track fades out under the new one, 0 cuts straight over
\ No newline at end of file
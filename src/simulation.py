@@ -0,0 +1,610 @@
+#Gameplay simulation core
+#Shared by the windowed game & headless runs (soak tests, CI, benchmarks)
+import sys
+import time
+import random
+import arcade
+import settings
+from user import Player, PlayerInputHandler
+from physics import PlatformPhysicsEngine, CollisionGrid
+from entities.coin import CoinManager
+from enemies.enemy_base import EnemyManager
+from enemies.enemy_physics import EnemyPhysicsBatch
+from enemies.goomba import Goomba
+from utils.activation import ActivationWindow
+from utils.profiler import FrameProfiler
+from level_streaming import ChunkedLevel
+
+class GameSimulation:
+    #Owns the game world & runs the per-frame gameplay pipeline
+    #Nothing in here touches a window, GL context or the audio device directly
+
+    def _init_gameplay_state(self):
+        self.current_state = settings.GAME_STATES["PLAYING"]
+
+        self.player_list = None
+        self.wall_list = None
+        self.current_level = None
+        self.level_stream = None  # ChunkedLevel when the current level is streamed
+        self.enemy_manager  = None
+        self.coin_manager = None
+
+        self.hud_manager = None
+        self.menu_manager = None
+
+        self.asset_loader = None
+        self.sound_manager = None
+        self.animation_manager = None
+
+        self.level_start_time = 0
+        self.level_time = 0
+
+        self.player_sprite = None
+        self.player_input = None
+
+        self.physics_engine = None # For Collisions & Movement
+        self.enemy_physics = EnemyPhysicsBatch()
+
+        #Camera for scrolling
+        self.camera = None
+        self.activation = ActivationWindow()
+
+        self.profiler = FrameProfiler()
+
+        self.score = 0
+        self.lives = settings.PLAYER_LIVES
+        self.level_complete = False
+
+        self.frame_count = 0
+
+        self.show_debug = settings.DEBUG_MODE
+
+    def setup_world(self):
+        #Builds sprite lists, player & test level
+        self.player_list = arcade.SpriteList()
+        self.wall_list = arcade.SpriteList(use_spatial_hash=True)
+        self.coin_manager = CoinManager(self.animation_manager)
+        self.enemy_manager = EnemyManager(animation_manager=self.animation_manager)
+
+        self.player_sprite = Player()
+        self.player_sprite.setup(settings.PLAYER_START_X, settings.PLAYER_START_Y)
+        self.player_list.append(self.player_sprite)
+
+        self.player_input = PlayerInputHandler(self.player_sprite)
+
+        self.create_test_level()
+        self.physics_engine = self._create_physics_engine()
+
+    def reset_world(self):
+        #Fresh run of the current level - score, lives, coins & enemies
+        #A level loaded with use_level() is replayed through it, otherwise the test level is rebuilt
+        self.score = 0
+        self.lives = settings.PLAYER_LIVES
+        self.level_time = 0
+        self.level_start_time = 0
+        self.level_complete = False
+
+        self.respawn_player()
+
+        if self.current_level:
+            if not self.level_stream:
+                self.current_level.create_sprites()  # Bricks & question blocks back as they were
+            self.use_level(self.current_level, streaming=self.level_stream is not None)
+        else:
+            self.coin_manager.reset()
+            self.enemy_manager.reset()
+            self.wall_list = arcade.SpriteList(use_spatial_hash=True)
+            self.create_test_level()
+            self.physics_engine = self._create_physics_engine()
+
+        self.current_state = settings.GAME_STATES['PLAYING']
+
+    def _create_physics_engine(self):
+        return PlatformPhysicsEngine(
+            self.player_sprite,
+            self.wall_list,
+            gravity=settings.GRAVITY,
+            interactive_tiles=self.coin_manager.coin_list,
+            collision_grid=CollisionGrid.from_sprite_list(self.wall_list)
+        )
+
+    def use_level(self, tilemap, streaming=None):
+        #Swaps the test level for a loaded TileMap - walls, enemies, coins, spawn & physics
+        if streaming is None:
+            streaming = settings.LEVEL_STREAMING
+
+        self.current_level = tilemap
+        self.coin_manager.reset()
+        self.enemy_manager.reset()
+
+        if streaming:
+            # Chunks get loaded around the camera on the first tick
+            self.level_stream = ChunkedLevel(tilemap)
+            self.wall_list = arcade.SpriteList(use_spatial_hash=True)
+            interactive_tiles = self.level_stream.interactive_list
+            collision_grid = self.level_stream.collision_grid
+        else:
+            self.level_stream = None
+            self.wall_list = tilemap.wall_list
+            interactive_tiles = tilemap.interactive_list
+            collision_grid = tilemap.build_collision_grid()
+
+        tilemap.spawn_enemies(self.enemy_manager)
+        tilemap.spawn_coins(self.coin_manager)
+
+        if tilemap.player_spawn:
+            self.player_sprite.center_x = tilemap.player_spawn[0]
+            self.player_sprite.center_y = tilemap.player_spawn[1]
+
+        self.physics_engine = PlatformPhysicsEngine(
+            self.player_sprite,
+            self.wall_list,
+            gravity=settings.GRAVITY,
+            interactive_tiles=interactive_tiles,
+            collision_grid=collision_grid
+        )
+
+    def _play_sound(self, sound_name):
+        if self.sound_manager:
+            self.sound_manager.play_sound(sound_name)
+
+    def _create_wall(self, grid_x, grid_y):
+        #One TILE_SIZE ground tile centred in grid cell (grid_x, grid_y)
+        ground_texture = None
+        if self.asset_loader:
+            ground_texture = self.asset_loader.get_tile_texture('ground')
+
+        if ground_texture:
+            wall = arcade.Sprite(ground_texture)
+        else:
+            wall = arcade.SpriteSolidColor(settings.TILE_SIZE, settings.TILE_SIZE, color=settings.GREEN)
+
+        wall.center_x = grid_x * settings.TILE_SIZE + settings.TILE_SIZE // 2
+        wall.center_y = grid_y * settings.TILE_SIZE + settings.TILE_SIZE // 2
+        return wall
+
+    def create_test_level(self):
+        #Simple test level with platforms & coins, will be replaced
+        #Walls sit on the tile grid so the collision grid matches them exactly
+
+        for grid_x in range(800 // settings.TILE_SIZE):  # Ground Platforms
+            self.wall_list.append(self._create_wall(grid_x, 0))
+
+        platform_data = [  # (grid x, grid y, width in tiles)
+            (9, 4, 3),
+            (15, 6, 3),
+            (21, 7, 3),
+        ]
+
+        for grid_x, grid_y, width in platform_data:
+            for offset in range(width):
+                self.wall_list.append(self._create_wall(grid_x + offset, grid_y))
+
+        coin_positions = [
+            (200, 50, 'normal'),
+            (400, 80, 'silver'),
+            (600, 100, 'gold'),
+            (350, 70, 'normal'),
+            (500, 90, 'special')
+        ]
+
+        for x, y, coin_type in coin_positions:
+            self.coin_manager.add_coin(x, y, coin_type)
+
+        enemy_positions = [
+            (250, 50, 'normal'),
+            (450, 80, 'fast'),
+            (650, 80, 'large'),
+            (750, 50, 'normal'),
+            (550, 80, 'elite')
+        ]
+
+        for x, y, variant in enemy_positions:
+            self.enemy_manager.add_enemy(Goomba, x, y, variant=variant)
+
+        for enemy in self.enemy_manager.enemy_list:
+            enemy.change_y = 0
+
+    def _update_gameplay(self, delta_time):
+        self.frame_count += 1
+        self.level_time += delta_time
+
+        if self.player_input:
+            self.player_input.update()
+        else:
+            print("Warning: player_input is None")
+            return  # Exit early w/o essential components
+
+        #Stage timings for the profiler, mark() is a no-op while it's off
+        profile = self.profiler.mark
+        self.profiler.start()
+
+        self.update_activation()
+        self.update_level_stream()
+        profile('activation')
+
+        self.update_enemy_physics()
+        self.enemy_manager.update(delta_time, self.player_sprite)
+        profile('enemies')
+
+        self.physics_engine.update()
+        self.player_sprite.set_ground_state(self.physics_engine.can_jump())
+        self.player_list.update(delta_time)
+        profile('physics')
+
+        if self.animation_manager:
+            self.animation_manager.update_all(delta_time)
+        profile('animation')
+
+        self.coin_manager.update(delta_time, self.player_sprite)
+        self.check_coin_collections()
+        profile('coins')
+
+        self.check_enemy_interactions()
+        profile('interactions')
+
+        self.update_camera()
+        self.check_game_state()
+        profile('camera')
+
+        if self.hud_manager:
+            hud_data = {
+                'score': self.score,
+                'lives': self.lives,
+                'level_time': self.level_time,
+                'level_name': '1-1',
+                'coins_collected': self.coin_manager.collected_coins,
+                'total_coins': self.coin_manager.total_coins,
+                'enemies_defeated': self.enemy_manager.defeated_enemies,
+                'total_enemies': self.enemy_manager.total_enemies
+            }
+            self.hud_manager.update(delta_time, hud_data)
+        profile('hud')
+
+
+    def update_activation(self):
+        #Wakes what's near the camera for this tick, with the window off everything stays awake
+        #Streamed levels always use the window, anything awake outside the loaded chunks would fall
+        window = None
+        if self.camera:
+            self.activation.update(self.camera)
+            if settings.ACTIVATION_WINDOW or self.level_stream:
+                window = self.activation
+
+        self.enemy_manager.activate(window)
+        self.coin_manager.activate(window)
+
+    def update_level_stream(self):
+        #Keeps chunks loaded under the activation window & the player
+        if not self.level_stream:
+            return
+
+        half_view = settings.SCREEN_WIDTH / 2
+        left = min(self.activation.left, self.player_sprite.center_x - half_view)
+        right = max(self.activation.right, self.player_sprite.center_x + half_view)
+
+        if self.level_stream.update(left, right):
+            self.physics_engine.collision_grid = self.level_stream.collision_grid
+
+    def update_enemy_physics(self):
+        #Whole enemy list in one batched step when the level has a collision grid
+        grid = self.physics_engine.collision_grid if self.physics_engine else None
+        if self.enemy_manager.store is not None:
+            self.enemy_manager.store.step_physics(grid)
+            return
+
+        if grid is not None:
+            self.enemy_physics.step(self.enemy_manager.get_awake_enemies(), grid)
+            return
+
+        for enemy in self.enemy_manager.get_awake_enemies():
+            if enemy.state != 'dead':
+                old_x = enemy.center_x
+                enemy.center_x += enemy.change_x
+
+                wall_hits = arcade.check_for_collision_with_list(enemy, self.wall_list)
+                for wall in wall_hits:
+                    enemy.center_x = old_x
+                    enemy.handle_wall_collision('left' if enemy.change_x > 0  else 'right')
+                    break
+
+                if enemy.affected_by_gravity:
+                    enemy.change_y -= settings.GRAVITY
+
+                    if enemy.change_y < -settings.TERMINAL_VELOCITY:
+                        enemy.change_y = -settings.TERMINAL_VELOCITY
+
+                    enemy.center_y += enemy.change_y
+
+                    ground_hits = arcade.check_for_collision_with_list(enemy, self.wall_list)
+                    enemy.on_ground = False
+                    for wall in ground_hits:
+                        if enemy.change_y < 0 and enemy.bottom <= wall.top + 5:
+                            enemy.bottom = wall.top
+                            enemy.change_y = 0
+                            enemy.on_ground = True
+                            break
+
+    def check_coin_collections(self):
+        collections = self.coin_manager.check_player_collection(self.player_sprite)
+        for collection_info in collections:
+            self.score += collection_info['value']
+            print(f"Collected {collection_info['coin_type']} coin! +{collection_info['value']} points. Score: {self.score}")
+
+            self._play_sound('coin')
+
+    def check_enemy_interactions(self):
+        interactions = self.enemy_manager.check_player_interactions(self.player_sprite, self.physics_engine)
+
+        for interaction in interactions:
+            if interaction['type'] == 'stomp':
+                self.score += interaction['score']
+                print(f"Stomped {interaction['enemy_type']} {interaction['variant']} +{interaction['score']} points. Score: {self.score}")
+
+                if interaction['bounce_player']:
+                    bounce_height = interaction.get('bounce_height', 8)
+                    self.player_sprite.change_y = bounce_height
+
+                self._play_sound('stomp')
+
+            elif interaction['type'] == 'damage':
+                if not settings.INVINCIBLE_MODE:
+                    print(f"Player should take damage from {interaction['enemy_type']}")
+                    damage = interaction['damage_to_player']
+
+                    if hasattr(self.player_sprite, 'take_damage'):
+                        player_died = self.player_sprite.take_damage() if hasattr(self.player_sprite, 'take_damage') else False
+                    else:
+                        self.lives -= 1
+                        player_died = self.lives <= 0
+
+
+                    if player_died:
+                        self.player_die()
+                    else:
+                        print(f"Player hurt by {interaction['enemy_type']}")
+
+                        if interaction.get('knockback'):
+                            self.player_sprite.change_x = 3 if self.player_sprite.change_x >= 0 else -3
+
+                    self._play_sound('death')
+
+    def update_camera(self):
+        #update camera to follow player
+        target_x = self.player_sprite.center_x - 400
+        target_y = self.player_sprite.center_y - 300
+
+        # Don't scroll past the left edge
+        if target_x < 0:
+            target_x = 0
+
+        # Don't scroll below ground level
+        if target_y < 0:
+            target_y = 0
+
+        # Get current camera position
+        current_x, current_y = self.camera.position
+
+        # Smoothly interpolate toward target position
+        # The closer to 1.0, the faster the camera follows
+        follow_speed = 0.1  # Adjust this for different feel (0.05 = slow, 0.2 = fast)
+
+        new_x = current_x + (target_x - current_x) * follow_speed
+        new_y = current_y + (target_y - current_y) * follow_speed
+
+        # Set the new camera position
+        self.camera.position = (new_x, new_y)
+
+
+    def check_game_state(self):
+        #Checks for level or game over
+
+        if self.player_sprite.center_y < -100:
+            self.player_die()
+
+        if self.player_sprite.center_x > settings.LEVEL_END_X:
+            self.level_complete = True
+            #Maybe add something here after completion? - come back later
+
+        if self.enemy_manager.defeated_enemies >= self.enemy_manager.total_enemies:
+            print("All enemies defeated! Victory!")
+            print(f"Changing state to: {settings.GAME_STATES['LEVEL_COMPLETE']}")
+            self.current_state = settings.GAME_STATES["LEVEL_COMPLETE"]
+
+            # Set level complete stats
+            if self.menu_manager:
+                self.menu_manager.set_level_complete_stats(
+                    '1-1',
+                    self.score,
+                    self.coin_manager.collected_coins,
+                    self.enemy_manager.defeated_enemies
+                )
+                self.menu_manager.show_menu('level_complete', push_current=False)
+                print("Level complete menu should now be active")
+
+    def player_die(self):
+        self.lives -= 1
+
+        if self.lives <= 0:
+            self.current_state = settings.GAME_STATES["GAME_OVER"]
+            if self.menu_manager:
+                self.menu_manager.set_game_over_stats(
+                    self.score, '1-1',
+                    self.coin_manager.collected_coins,
+                    self.enemy_manager.defeated_enemies
+                )
+                self.menu_manager.show_menu('game_over', push_current=False)
+            print("Game Over!")
+        else:
+            self.respawn_player()
+
+    def respawn_player(self):
+        #Respawn at starting position
+        self.player_sprite.center_x = settings.PLAYER_START_X
+        self.player_sprite.center_y = settings.PLAYER_START_Y
+        self.player_sprite.change_x = 0
+        self.player_sprite.change_y = 0
+
+class HeadlessCamera:
+    #Stand-in for arcade.camera.Camera2D, which needs a window - only tracks position
+
+    def __init__(self):
+        self.position = (0.0, 0.0)
+
+class HeadlessSimulation(GameSimulation):
+    #Runs gameplay with no window, no uploaded textures & no audio
+    #Steps as fast as the CPU allows, one fixed tick per frame
+
+    def __init__(self, delta_time=None):
+        self._init_gameplay_state()
+        self.delta_time = delta_time or settings.FIXED_TIMESTEP
+        self.camera = HeadlessCamera()
+
+    def setup(self):
+        self.setup_world()
+
+        #GPU collision path needs a GL context, stay on the CPU
+        self.enemy_manager.collision_method = 3
+        self.current_state = settings.GAME_STATES['PLAYING']
+
+    def reset(self):
+        self.reset_world()
+        self.camera.position = (0.0, 0.0)
+
+    def press_key(self, key, modifiers=0):
+        self.player_input.on_key_press(key, modifiers)
+
+    def release_key(self, key, modifiers=0):
+        self.player_input.on_key_release(key, modifiers)
+
+    def step(self, frames=1):
+        #Advances up to `frames` frames, stops early once the level ends
+        for _ in range(frames):
+            if self.current_state != settings.GAME_STATES['PLAYING']:
+                break
+            self._update_gameplay(self.delta_time)
+            self.profiler.end_frame()
+
+        return self.frame_count
+
+    def run(self, frames):
+        start_frame = self.frame_count
+        start_time = time.perf_counter()
+
+        self.step(frames)
+
+        elapsed = time.perf_counter() - start_time
+        frames_run = self.frame_count - start_frame
+
+        return {
+            'frames': frames_run,
+            'elapsed': elapsed,
+            'fps': frames_run / elapsed if elapsed > 0 else 0.0,
+            'state': self.current_state,
+            'score': self.score,
+            'lives': self.lives
+        }
+
+def run_headless(frames=600, delta_time=None):
+    simulation = HeadlessSimulation(delta_time)
+    simulation.setup()
+    return simulation.run(frames)
+
+def check_wall_depenetration():
+    #Player dropped half inside a platform of the test level, one tick has to leave it clear of terrain
+    #Returns a list of failures, empty when everything passed
+    simulation = HeadlessSimulation()
+    simulation.setup()
+    grid = simulation.physics_engine.collision_grid
+    player = simulation.player_sprite
+    tile = settings.TILE_SIZE
+
+    failures = []
+    cases = {
+        'side of platform': (9 * tile, 4 * tile + tile / 2),    # Left edge of the (9, 4) platform
+        'top of platform': (10 * tile + tile / 2, 5 * tile),    # Sunk half way into it from above
+        'in the ground': (3 * tile, tile / 2)                   # Spawned inside the floor
+    }
+    for name, (x, y) in cases.items():
+        simulation.respawn_player()
+        player.center_x, player.center_y = x, y
+        simulation.physics_engine.update()
+
+        overlapping = grid.solid_cells_in_rect(player.left, player.bottom, player.right, player.top)
+        if overlapping:
+            failures.append(f"{name}: player at ({player.center_x:.1f}, {player.center_y:.1f}) still overlaps {overlapping}")
+
+    return failures
+
+def _enemy_snapshot(simulation):
+    #(x, y, state) of every live enemy in spawn order, from either storage
+    manager = simulation.enemy_manager
+    if manager.store is not None:
+        from enemies.enemy_store import STATE_NAMES
+        store = manager.store
+        return [
+            (round(float(store.x[index]), 4), round(float(store.y[index]), 4), STATE_NAMES[int(store.state[index])])
+            for index in range(store.count)
+        ]
+    return [
+        (round(enemy.center_x, 4), round(enemy.center_y, 4), enemy.state)
+        for enemy in manager.enemy_list if enemy.state != 'dead'
+    ]
+
+def check_enemy_storage_parity(frames=900, seed=1234):
+    #Same seeded test level & scripted input with COMPACT_ENEMY_STORAGE off and on - score, defeated count
+    #& enemy positions have to match every frame
+    #Returns a list of failures, empty when everything passed
+    runs = []
+    compact_setting = settings.COMPACT_ENEMY_STORAGE
+    try:
+        for compact in (False, True):
+            settings.COMPACT_ENEMY_STORAGE = compact
+            random.seed(seed)
+            simulation = HeadlessSimulation()
+            simulation.setup()
+
+            trace = []
+            for frame in range(frames):
+                if frame % 40 == 0:
+                    simulation.press_key(arcade.key.RIGHT)
+                if frame % 60 == 0:
+                    simulation.press_key(arcade.key.UP)
+                elif frame % 60 == 20:
+                    simulation.release_key(arcade.key.UP)
+                simulation.step(1)
+                trace.append((simulation.score, simulation.enemy_manager.defeated_enemies, _enemy_snapshot(simulation)))
+            runs.append(trace)
+    finally:
+        settings.COMPACT_ENEMY_STORAGE = compact_setting
+
+    for frame, (sprites, compact) in enumerate(zip(*runs)):
+        if sprites != compact:
+            return [f"frame {frame}: sprites {sprites} != compact {compact}"]
+    return []
+
+if __name__ == "__main__":
+    #python src/simulation.py [frames] [--profile] [--check]
+    if '--check' in sys.argv:
+        from checks import CHECKS
+        failed = False
+        for name, check in (('Wall depenetration', check_wall_depenetration), ('Enemy storage parity', check_enemy_storage_parity)) + CHECKS:
+            failures = check()
+            for failure in failures:
+                print(f"FAIL {failure}")
+            print(f"{name} check " + ("failed" if failures else "passed"))
+            failed = failed or bool(failures)
+        sys.exit(1 if failed else 0)
+
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    frames = int(args[0]) if args else 600
+
+    simulation = HeadlessSimulation()
+    simulation.setup()
+    if '--profile' in sys.argv:
+        simulation.profiler.set_enabled(True)
+
+    results = simulation.run(frames)
+    print(f"Simulated {results['frames']} frames in {results['elapsed']:.3f}s ({results['fps']:.0f} fps), state: {results['state']}")
+    if simulation.profiler.enabled:
+        print(simulation.profiler.summary())
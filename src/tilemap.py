@@ -2,7 +2,10 @@
 import arcade
 import os
 import json
+import pytiled_parser
+from pathlib import Path
 import settings
+from physics import CollisionGrid
 
 class TileType:
     #Constants for different tiles
@@ -16,6 +19,24 @@ class TileType:
     PLAYER_SPAWN = 7
     LEVEL_END = 8
 
+    SOLID_TYPES = (GROUND, BRICK, PIPE)
+    MARKER_TYPES = (ENEMY_SPAWN, PLAYER_SPAWN, LEVEL_END)  # Level data, never drawn as sprites
+
+    #Tiled tileset tile type/class -> TileType id
+    NAMES = {
+        'empty': EMPTY,
+        'ground': GROUND,
+        'brick': BRICK,
+        'question_block': QUESTION_BLOCK,
+        'pipe': PIPE,
+        'coin': COIN,
+        'enemy_spawn': ENEMY_SPAWN,
+        'player_spawn': PLAYER_SPAWN,
+        'level_end': LEVEL_END
+    }
+
+TILED_GID_MASK = 0x0FFFFFFF  # The top bits of a Tiled gid are its flip flags
+
 class Tile(arcade.Sprite):
     #Individual sprite tiles & properties
 
@@ -24,7 +45,7 @@ class Tile(arcade.Sprite):
         super().__init__(filename, scale)
 
         self.tile_type = tile_type
-        self.is_solid = tile_type in [TileType.GROUND, TileType.BRICK, TileType.PIPE]
+        self.is_solid = tile_type in TileType.SOLID_TYPES
         self.is_collectible = tile_type == TileType.COIN
         self.is_interactive = tile_type == TileType.QUESTION_BLOCK
 
@@ -77,7 +98,8 @@ class Tile(arcade.Sprite):
 class TileMap:
     #Level with multiple layers
 
-    def __init__(self, width, height, tile_size=None):
+    def __init__(self, width, height, tile_size=None, tiles=None):
+        #tiles - prebuilt rows (e.g. views into a compiled level), a blank grid is made otherwise
         self.width = width
         self.height = height
         self.tile_size = tile_size or settings.TILE_SIZE
@@ -86,10 +108,12 @@ class TileMap:
         self.background_list = arcade.SpriteList(use_spatial_hash=True)
         self.interactive_list = arcade.SpriteList()
 
-        self.tiles = [[TileType.EMPTY for _ in range(width)] for _ in range(height)]
+        self.tiles = tiles if tiles is not None else [[TileType.EMPTY for _ in range(width)] for _ in range(height)]
+        self.decorations = []  # (grid_x, grid_y, tile_type) from a Background layer - drawn, never collided with
 
         self.player_spawn = (100, 200) #def spawn point
         self.enemy_spawns = []
+        self.coin_spawns = []
         self.level_end = None
 
         self.name = "Untitled Level"
@@ -116,34 +140,30 @@ class TileMap:
         grid_y = int(pixel_y // self.tile_size)
         return grid_x, grid_y
     
-    def draw_with_layers(self):
-        # If we have an arcade tilemap, use its draw method
-        if hasattr(self, 'arcade_tilemap') and self.arcade_tilemap:
-            self.arcade_tilemap.draw()
-        else:
-            # Fall back to our standard drawing
-            self.draw()
-
-    def get_sprite_at_position(self, x, y, layer_name="Terrain"):
-        if hasattr(self, 'arcade_tilemap') and self.arcade_tilemap:
-            if layer_name in self.arcade_tilemap.sprite_lists:
-                sprite_list = self.arcade_tilemap.sprite_lists[layer_name]
-                # Check for collision at point
-                sprites = arcade.get_sprites_at_point((x, y), sprite_list)
-                return sprites[0] if sprites else None
-        return None
-
-    def get_tile_properties(self, x, y):
-        sprite = self.get_sprite_at_position(
-            x * self.tile_size + self.tile_size // 2,
-            y * self.tile_size + self.tile_size // 2
-        )
-        if sprite and hasattr(sprite, 'properties'):
-            return sprite.properties
-        return {}
+    def create_tile_sprite(self, grid_x, grid_y, tile_type):
+        tile = Tile(tile_type)
+        tile.center_x, tile.center_y = self.grid_to_pixel(grid_x, grid_y)
+        return tile
+
+    @staticmethod
+    def tile_layer(tile):
+        #Name of the sprite list a tile belongs in
+        if tile.is_solid:
+            return 'wall_list'
+        elif tile.is_interactive:
+            return 'interactive_list'
+        return 'background_list'
+
+    def build_collision_grid(self):
+        #Solidity bitmap from self.tiles, wall sprites are attached for on_collision callbacks
+        grid = CollisionGrid.from_tiles(self.tiles, TileType.SOLID_TYPES, self.tile_size)
+        for sprite in self.wall_list:
+            if hasattr(sprite, 'on_collision'):
+                grid.add_sprite(sprite)
+        return grid
 
     def spawn_enemies(self, enemy_manager):
-        from enemies.goomba import create_goomba
+        from enemies.goomba import Goomba
         
         for spawn_data in self.enemy_spawns:
             x = spawn_data['x']
@@ -153,45 +173,14 @@ class TileMap:
             
             # Create the appropriate enemy type
             if enemy_type == 'goomba':
-                enemy = create_goomba(x, y, variant)
-                enemy_manager.enemy_list.append(enemy)
-                enemy_manager.total_enemies += 1
+                enemy_manager.add_enemy(Goomba, x, y, variant=variant)
             # Add more enemy types as needed
             
     def spawn_coins(self, coin_manager):
-        if hasattr(self, 'arcade_tilemap') and self.arcade_tilemap:
-            if "Collectibles" in self.arcade_tilemap.sprite_lists:
-                # Remove the arcade sprites and replace with our Coin objects
-                collectibles = self.arcade_tilemap.sprite_lists["Collectibles"]
-                for sprite in collectibles:
-                    if hasattr(sprite, 'properties') and sprite.properties.get('type') == 'coin':
-                        # Determine coin type from properties or default
-                        coin_type = sprite.properties.get('coin_type', 'normal')
-                        coin_manager.add_coin(sprite.center_x, sprite.center_y, coin_type)
-                
-                # Clear the arcade sprite list since we're using our own coins
-                collectibles.clear()
-
-    def process_interactive_blocks(self):
-        if hasattr(self, 'arcade_tilemap') and self.arcade_tilemap:
-            for layer_name, sprite_list in self.arcade_tilemap.sprite_lists.items():
-                for sprite in sprite_list:
-                    if hasattr(sprite, 'properties'):
-                        # Check if it's a question block
-                        if sprite.properties.get('type') == 'question_block':
-                            # Add our custom collision handling
-                            sprite.contents = sprite.properties.get('contents', 'coin')
-                            sprite.activated = False
-                        
-                        # Check if it's a brick block
-                        elif sprite.properties.get('type') == 'brick':
-                            sprite.breakable = sprite.properties.get('breakable', True)
+        for spawn_data in self.coin_spawns:
+            coin_manager.add_coin(spawn_data['x'], spawn_data['y'], spawn_data.get('coin_type', 'normal'))
 
     def create_sprites(self):
-        if hasattr(self, 'arcade_tilemap') and self.arcade_tilemap:
-            print("Skipping sprite creation - using TMX sprite data")
-            return
-
         self.wall_list.clear()
         self.background_list.clear()
         self.interactive_list.clear()
@@ -200,43 +189,49 @@ class TileMap:
             for x in range(self.width):
                 tile_type = self.tiles[y][x]
 
-                if tile_type == TileType.EMPTY:
+                if tile_type == TileType.EMPTY or tile_type in TileType.MARKER_TYPES:
+                    continue
+
+                tile = self.create_tile_sprite(x, y, tile_type)
+                getattr(self, self.tile_layer(tile)).append(tile)
+
+        for x, y, tile_type in self.decorations:
+            self.background_list.append(self.create_tile_sprite(x, y, tile_type))
+
+    def scan_markers(self):
+        #Spawn points & the goal placed as tiles, read straight off the grid so every load path
+        #(sprites, streamed chunks, compiled cache) gets them - enemy spawns already known aren't added twice
+        known = {
+            (spawn['x'], spawn['y']) if isinstance(spawn, dict) else tuple(spawn)
+            for spawn in self.enemy_spawns
+        }
+
+        for y, row in enumerate(self.tiles):
+            for x, tile_type in enumerate(row):
+                if tile_type not in TileType.MARKER_TYPES:
                     continue
 
-                tile = Tile(tile_type)
                 pixel_x, pixel_y = self.grid_to_pixel(x, y)
-                tile.center_x = pixel_x
-                tile.center_y = pixel_y
-
-                if tile.is_solid:
-                    self.wall_list.append(tile)
-                elif tile.is_interactive:
-                    self.interactive_list.append(tile)
-                else:
-                    self.background_list.append(tile)
-            
                 if tile_type == TileType.PLAYER_SPAWN:
                     self.player_spawn = (pixel_x, pixel_y)
                 elif tile_type == TileType.ENEMY_SPAWN:
-                    self.enemy_spawns.append((pixel_x, pixel_y))
+                    if (pixel_x, pixel_y) not in known:
+                        self.enemy_spawns.append({'x': pixel_x, 'y': pixel_y})
+                        known.add((pixel_x, pixel_y))
                 elif tile_type == TileType.LEVEL_END:
                     self.level_end = (pixel_x, pixel_y)
+
     def draw(self):
-        if hasattr(self, 'arcade_tilemap') and self.arcade_tilemap:
-            # Use arcade's optimized drawing
-            self.arcade_tilemap.draw()
-        else:
-            # Use original drawing method
-            self.background_list.draw()
-            self.wall_list.draw()
-            self.interactive_list.draw()
+        self.background_list.draw()
+        self.wall_list.draw()
+        self.interactive_list.draw()
 
     
 
 class TileMapLoader:
     
     @staticmethod
-    def load_from_json(filename):
+    def load_from_json(filename, build_sprites=True):
         try:
             with open(filename, 'r') as f:
                 data = json.load(f)
@@ -259,9 +254,11 @@ class TileMapLoader:
                 tilemap.player_spawn = (spawn['x'], spawn['y'])
 
             if 'enemy_spawns' in data:
-                tilemap.enemy_spawns = [(spawn['x'], spawn['y']) for spawn in data['enemy_spawns']]
+                tilemap.enemy_spawns = [dict(spawn) for spawn in data['enemy_spawns']]
 
-            tilemap.create_sprites()
+            tilemap.scan_markers()
+            if build_sprites:
+                tilemap.create_sprites()
             return tilemap
 
         except Exception as e:
@@ -269,118 +266,94 @@ class TileMapLoader:
             return None
         
     @staticmethod
-    def load_from_tiled_tmx(filename):
+    def read_tiled_tmx(filename):
+        #Tile types, spawns & map properties straight from the TMX, no textures are loaded
+        #Every gid used in a tile layer must be a tileset tile whose type (class) is one of TileType.NAMES,
+        #maps that use undeclared tiles are rejected rather than guessed at
         try:
-            # Use arcade's built-in TMX loader
-            # scaling factor for the tiles
-            scaling = settings.TILE_SCALING
-            
-            # Load the tile map using arcade
-            arcade_tilemap = arcade.load_tilemap(
-                filename, 
-                scaling=scaling,
-                use_spatial_hash=True  # Optimize collision detection
-            )
-            
-            # Get map dimensions from the arcade tilemap
-            # Note: arcade_tilemap.width/height are in pixels, we need tile count
-            map_width_pixels = arcade_tilemap.map_size.width
-            map_height_pixels = arcade_tilemap.map_size.height
-            tile_width = arcade_tilemap.tile_size.width * scaling
-            tile_height = arcade_tilemap.tile_size.height * scaling
-            
-            # Calculate grid dimensions
-            width = int(map_width_pixels / tile_width)
-            height = int(map_height_pixels / tile_height)
-            
-            # Create our TileMap object
-            tilemap = TileMap(width, height, int(tile_width))
-            tilemap.name = os.path.basename(filename).replace('.tmx', '')
-            
-            # Clear default sprite lists
-            tilemap.wall_list.clear()
-            tilemap.background_list.clear()
-            tilemap.interactive_list.clear()
-            
-            # Process sprite lists from arcade's tilemap
-            # Arcade creates sprite lists based on layer names
-            for layer_name, sprite_list in arcade_tilemap.sprite_lists.items():
-                if layer_name.lower() == "terrain":
-                    # Add all terrain sprites to wall list
-                    for sprite in sprite_list:
-                        tilemap.wall_list.append(sprite)
-                        
-                elif layer_name.lower() == "collectibles":
-                    # Process collectibles - they go to interactive list
-                    for sprite in sprite_list:
-                        # Check if it's a coin based on properties or texture
-                        if hasattr(sprite, 'properties'):
-                            if sprite.properties.get('type') == 'coin' or sprite.properties.get('collectible'):
-                                tilemap.interactive_list.append(sprite)
-                                
-                elif layer_name.lower() == "background":
-                    # Add background decorations
-                    for sprite in sprite_list:
-                        tilemap.background_list.append(sprite)
-            
-            # Process object layers for spawn points and special objects
-            if hasattr(arcade_tilemap, 'object_lists'):
-                for object_layer in arcade_tilemap.object_lists:
-                    for tmx_object in object_layer:
-                        # Get object position
-                        obj_x = tmx_object.location.x * scaling
-                        obj_y = tmx_object.location.y * scaling
-                        
-                        # Handle different object types
-                        if tmx_object.name == "player_spawn":
-                            tilemap.player_spawn = (obj_x, obj_y)
-                            
-                        elif "spawn" in tmx_object.name and tmx_object.properties.get('spawn_type') == 'enemy':
-                            # Create enemy spawn data
-                            enemy_spawn = {
-                                'x': obj_x,
-                                'y': obj_y,
-                                'type': tmx_object.properties.get('enemy_type', 'goomba'),
-                                'variant': tmx_object.properties.get('variant', 'normal')
-                            }
-                            tilemap.enemy_spawns.append(enemy_spawn)
-                            
-                        elif tmx_object.name == "level_end":
-                            tilemap.level_end = (obj_x, obj_y)
-                            # Store next level info if available
-                            if 'next_level' in tmx_object.properties:
-                                tilemap.next_level = tmx_object.properties['next_level']
-            
-            # Process map properties
-            if hasattr(arcade_tilemap, 'properties') and arcade_tilemap.properties:
-                # Background color
-                if 'background_color' in arcade_tilemap.properties:
-                    hex_color = arcade_tilemap.properties['background_color'].lstrip('#')
-                    tilemap.background_color = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-                
-                # Music track
-                if 'music' in arcade_tilemap.properties:
-                    tilemap.background_music = arcade_tilemap.properties['music']
-                
-                # Time limit
-                if 'time_limit' in arcade_tilemap.properties:
-                    tilemap.time_limit = int(arcade_tilemap.properties['time_limit'])
-            
-            # Store the arcade tilemap reference for additional features
-            tilemap.arcade_tilemap = arcade_tilemap
-            
-            print(f"Successfully loaded TMX level: {tilemap.name}")
-            print(f"Map size: {width}x{height} tiles")
-            print(f"Found {len(tilemap.wall_list)} wall sprites")
-            print(f"Found {len(tilemap.interactive_list)} interactive sprites")
-            print(f"Found {len(tilemap.enemy_spawns)} enemy spawns")
-            
-            return tilemap
-            
+            tiled_map = pytiled_parser.parse_map(Path(filename))
         except Exception as e:
-            print(f"Error loading TMX file {filename}: {e}")
-            import traceback
-        
+            print(f"Error reading TMX file {filename}: {e}")
+            return None
+
+        tile_types = {}
+        for first_gid, tileset in tiled_map.tilesets.items():
+            for tile_id, tile in (tileset.tiles or {}).items():
+                name = (tile.class_ or '').lower()
+                if name in TileType.NAMES:
+                    tile_types[first_gid + tile_id] = TileType.NAMES[name]
+
+        scaling = settings.TILE_SCALING
+        width = tiled_map.map_size.width
+        height = tiled_map.map_size.height
+        tile_size = int(tiled_map.tile_size.width * scaling)
+
+        tilemap = TileMap(width, height, tile_size)
+        tilemap.name = os.path.basename(filename).replace('.tmx', '')
+        map_height_pixels = height * tile_size
+
+        for layer in tiled_map.layers:
+            layer_name = layer.name.lower()
+
+            if isinstance(layer, pytiled_parser.TileLayer):
+                for row_index, row in enumerate(layer.data):
+                    grid_y = height - 1 - row_index  # Tiled rows run top-down
+                    for grid_x, gid in enumerate(row):
+                        gid &= TILED_GID_MASK
+                        if gid == 0:
+                            continue
+
+                        tile_type = tile_types.get(gid)
+                        if tile_type is None:
+                            print(f"Error reading TMX file {filename}: tile {gid} on layer '{layer.name}' "
+                                  f"has no tile type")
+                            return None
+                        if tile_type == TileType.EMPTY:
+                            continue
+
+                        if layer_name == "terrain":
+                            tilemap.set_tile(grid_x, grid_y, tile_type)
+                        elif layer_name == "collectibles" and tile_type == TileType.COIN:
+                            pixel_x, pixel_y = tilemap.grid_to_pixel(grid_x, grid_y)
+                            tilemap.coin_spawns.append({'x': pixel_x, 'y': pixel_y, 'coin_type': 'normal'})
+                        elif layer_name == "background" and tile_type not in TileType.MARKER_TYPES:
+                            tilemap.decorations.append((grid_x, grid_y, tile_type))
+
+            elif isinstance(layer, pytiled_parser.ObjectLayer):
+                for tmx_object in layer.tiled_objects:
+                    obj_x = tmx_object.coordinates.x * scaling
+                    obj_y = map_height_pixels - tmx_object.coordinates.y * scaling
+                    properties = tmx_object.properties or {}
+
+                    if tmx_object.name == "player_spawn":
+                        tilemap.player_spawn = (obj_x, obj_y)
+
+                    elif "spawn" in tmx_object.name and properties.get('spawn_type') == 'enemy':
+                        tilemap.enemy_spawns.append({
+                            'x': obj_x,
+                            'y': obj_y,
+                            'type': properties.get('enemy_type', 'goomba'),
+                            'variant': properties.get('variant', 'normal')
+                        })
+
+                    elif tmx_object.name == "level_end":
+                        tilemap.level_end = (obj_x, obj_y)
+                        if 'next_level' in properties:
+                            tilemap.next_level = properties['next_level']
+
+        properties = tiled_map.properties or {}
+        if 'background_color' in properties:
+            hex_color = str(properties['background_color']).lstrip('#')
+            tilemap.background_color = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+        if 'music' in properties:
+            tilemap.background_music = properties['music']
+        if 'time_limit' in properties:
+            tilemap.time_limit = int(properties['time_limit'])
+        if 'asset_groups' in properties:
+            tilemap.asset_groups = parse_asset_groups(properties['asset_groups'])
+
+        return tilemap
+
     @staticmethod
     def create_test_level():
         #level to text functionality
@@ -417,27 +390,32 @@ class TileMapLoader:
         enemy_positions = [(18, 6), (28, 9), (38, 7)]
         for x, y in enemy_positions:
             tilemap.set_tile(x, y, TileType.ENEMY_SPAWN)
-            tilemap.enemy_spawns.append(tilemap.grid_to_pixel(x, y))
 
         tilemap.set_tile(48, 5, TileType.LEVEL_END)
-        tilemap.level_end = tilemap.grid_to_pixel(48, 5)
 
+        #Enemy spawns & level_end come from the marker tiles
+        tilemap.scan_markers()
         tilemap.create_sprites()
         return tilemap
     
+def parse_asset_groups(value):
+    #Map property 'asset_groups' - comma separated asset loader groups, e.g. "koopas, castle"
+    return [group.strip() for group in str(value).split(',') if group.strip()]
+
 def save_tilemap_to_json(tilemap, filename):
     data = {
         'name': tilemap.name,
         'width': tilemap.width,
         'height': tilemap.height,
         'tile_size': tilemap.tile_size,
-        'tiles': tilemap.tiles,
+        'tiles': [list(row) for row in tilemap.tiles],
         'player_spawn': {
             'x': tilemap.player_spawn[0],
             'y': tilemap.player_spawn[1]
         },
         'enemy_spawns': [
-            {'x': x, 'y': y} for x, y in tilemap.enemy_spawns
+            dict(spawn) if isinstance(spawn, dict) else {'x': spawn[0], 'y': spawn[1]}
+            for spawn in tilemap.enemy_spawns
         ]
     }
 
@@ -454,18 +432,34 @@ def save_tilemap_to_json(tilemap, filename):
     except Exception as e:
         print(f"Error saving tilemap to {filename}: {e}")
 
-def load_level(filename):
+def load_level(filename, streaming=False):
+    #streaming=True skips sprite creation, a ChunkedLevel builds sprites per chunk instead
     if not os.path.exists(filename):
         print(f"Level file not found: {filename}")
         return TileMapLoader.create_test_level()
     
     ext = os.path.splitext(filename)[1].lower()
 
-    if ext == 'json':
-        return TileMapLoader.load_from_json(filename)
+    if settings.LEVEL_CACHE and ext in ('.json', '.tmx'):
+        from level_cache import load_compiled_level
+        tilemap = load_compiled_level(filename)
+        if tilemap is None:
+            return TileMapLoader.create_test_level()
+        tilemap.scan_markers()
+        if not streaming:
+            tilemap.create_sprites()
+        return tilemap
+
+    if ext == '.json':
+        return TileMapLoader.load_from_json(filename, build_sprites=not streaming)
     elif ext == '.tmx':
-        print(f"For TMX files, use arcade.load_tilemap() in your game code")
-        return TileMapLoader.create_test_level()
+        tilemap = TileMapLoader.read_tiled_tmx(filename)
+        if tilemap is None:
+            return TileMapLoader.create_test_level()
+        tilemap.scan_markers()
+        if not streaming:
+            tilemap.create_sprites()
+        return tilemap
     else:
         print(f"Unsupported file format: {ext}")
         return TileMapLoader.create_test_level()
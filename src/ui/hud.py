@@ -7,6 +7,7 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import settings
+from ui.text_layer import TextLayer
 
 class HUD:
     def __init__(self, screen_width, screen_height):
@@ -43,6 +44,7 @@ class HUD:
         self.time_warning = False
 
         self.use_fast_text = not settings.SHOW_FPS
+        self.text_layer = TextLayer()
 
         self.layout = {}
         self.update_layout()
@@ -126,10 +128,12 @@ class HUD:
         if settings.DEBUG_MODE:
             self._draw_debug_info()
 
+        self.text_layer.draw()
+
     def _draw_main_info(self):
         score_color = self.score_color if not self.score_flash else self.warning_color
         self._draw_text(
-            f"SCORE: {self.score:06d}",
+            'score', f"SCORE: {self.score:06d}",
             self.layout['score_pos'][0], self.layout['score_pos'][1],
             score_color, self.font_size_large
         )
@@ -140,7 +144,7 @@ class HUD:
             lives_text += " ⚠"
 
         self._draw_text(
-            lives_text,
+            'lives', lives_text,
             self.layout['lives_pos'][0], self.layout['lives_pos'][1],
             lives_color, self.font_size_large
         )
@@ -149,7 +153,7 @@ class HUD:
         time_color = self.time_color if not self.time_warning else self.warning_color
 
         self._draw_text(
-            f"TIME: {int(remaining_time):03d}",
+            'time', f"TIME: {int(remaining_time):03d}",
             self.layout['time_pos'][0], self.layout['time_pos'][1],
             time_color, self.font_size_large
         )
@@ -159,7 +163,7 @@ class HUD:
         centered_x = self.layout['level_pos'][0] - (text_width // 2)
         
         self._draw_text(
-            level_text,
+            'level', level_text,
             centered_x, self.layout['level_pos'][1],
             self.text_color, self.font_size_medium
         )
@@ -169,7 +173,7 @@ class HUD:
         coin_text = f"COINS: {self.coins_collected}/{self.total_coins} ({coin_percentage:.0f})"
 
         self._draw_text(
-            coin_text,
+            'coins', coin_text,
             self.layout['coins_pos'][0], self.layout['coins_pos'][1],
             (255, 215, 0), self.font_size_medium
         )
@@ -183,7 +187,7 @@ class HUD:
         enemy_text = f"ENEMIES: {self.enemies_defeated}/{self.total_enemies} ({enemy_percentage:.0f}%)"
 
         self._draw_text(
-            enemy_text,
+            'enemies', enemy_text,
             self.layout['enemies_pos'][0], self.layout['enemies_pos'][1],
             (255, 100, 100), self.font_size_medium
         )
@@ -209,7 +213,7 @@ class HUD:
     def _draw_performance_info(self):
         fps = f"FPS: {arcade.get_fps():.0f}"
         self._draw_text(
-            fps,
+            'fps', fps,
             self.layout['fps_pos'][0], self.layout['fps_pos'][1],
             self.text_color, self.font_size_small
         )
@@ -225,13 +229,14 @@ class HUD:
 
         for i, line in enumerate(debug_lines):
             self._draw_text(
-                line,
+                f'debug_{i}', line,
                 self.layout['debug_pos'][0],
                 self.layout['debug_pos'][1] - (i * 20),
                 (200, 200, 200), self.font_size_small
             )
 
-    def _draw_text(self, text, x, y, color, font_size, anchor_x='left', anchor_y='bottom'):
+    def _draw_text(self, key, text, x, y, color, font_size, anchor_x='left', anchor_y='bottom'):
+        #key names the retained text field, it's only laid out again when text, place or color change
         if anchor_x == "center":
             text_width = len(text) * font_size // 2  
             x = x - (text_width // 2)
@@ -244,7 +249,7 @@ class HUD:
         elif anchor_y == "top":
             y = y - font_size  
         
-        arcade.draw_text(text, x, y, color, font_size)
+        self.text_layer.text(key, text, x, y, color, font_size)
 
     def show_message(self, message, duration=3.0, color=None):
         self.temp_message = message
@@ -255,6 +260,7 @@ class HUD:
         self.screen_width = width
         self.screen_height = height
         self.update_layout()
+        self.text_layer.clear()
 
     def reset_for_new_level(self, level_data=None):
         self.level_time = 0
@@ -293,6 +299,7 @@ class HUDManager:
         self.game_over_overlay = None
 
         self.current_state = 'playing'
+        self.text_layer = TextLayer()  # Overlay text, drawn above the overlay's dimming
 
     def update(self, delta_time, game_data, game_state='playing'):
         self.current_state = game_state
@@ -309,6 +316,7 @@ class HUDManager:
         elif self.current_state == 'game_over':
             self.main_hud.draw()
             self._draw_game_over_overlay()
+        self.text_layer.draw()
 
     def _draw_pause_overlay(self):
         arcade.draw_lbwh_rectangle_filled(
@@ -324,7 +332,7 @@ class HUDManager:
         text_height = font_size
         x = self.main_hud.screen_width // 2 - text_width // 2
         y = self.main_hud.screen_height // 2 - text_height // 2
-        arcade.draw_text(text, x, y, settings.WHITE, font_size)
+        self.text_layer.text('pause_title', text, x, y, settings.WHITE, font_size)
 
         text = "Press P to Resume"
         font_size = 24
@@ -332,7 +340,7 @@ class HUDManager:
         text_height = font_size
         x = self.main_hud.screen_width // 2 - text_width // 2
         y = self.main_hud.screen_height // 2 - 60 - text_height // 2
-        arcade.draw_text(text, x, y, settings.WHITE, font_size)
+        self.text_layer.text('pause_hint', text, x, y, settings.WHITE, font_size)
 
     def _draw_game_over_overlay(self):
         arcade.draw_lbwh_rectangle_filled(
@@ -348,7 +356,7 @@ class HUDManager:
         text_height = font_size
         x = self.main_hud.screen_width // 2 - text_width // 2
         y = self.main_hud.screen_height // 2 - text_height // 2
-        arcade.draw_text(text, x, y, (255, 100, 100), font_size)
+        self.text_layer.text('game_over_title', text, x, y, (255, 100, 100), font_size)
 
         text = "Press R to Restart"
         font_size = 18
@@ -356,4 +364,4 @@ class HUDManager:
         text_height = font_size
         x = self.main_hud.screen_width // 2 - text_width // 2
         y = self.main_hud.screen_height // 2 - 100 - text_height // 2
-        arcade.draw_text(text, x, y, settings.WHITE, font_size)
\ No newline at end of file
+        self.text_layer.text('game_over_hint', text, x, y, settings.WHITE, font_size)
\ No newline at end of file
@@ -4,10 +4,12 @@ import math
 import random
 import sys
 import os
+from PIL import Image
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import settings
+from ui.text_layer import TextLayer
 
 class MenuItem:
     
@@ -48,6 +50,9 @@ class BaseMenu:
         self.input_cooldown = 0
         self.input_delay = 0.05
 
+        #draw() only sets the menu's text fields, MenuManager.draw sends them in one batch afterwards
+        self.text_layer = TextLayer()
+
     def add_item(self, text, action=None, enabled=True, submenu=None):
         item = MenuItem(text, action, enabled, submenu)
         self.items.append(item)
@@ -117,8 +122,8 @@ class BaseMenu:
 
         title_y = self.screen_height - self.title_y_offset
         title_x = self.screen_width // 2 - len(self.title) * self.title_size // 4
-        arcade.draw_text(
-            self.title,
+        self.text_layer.text(
+            'title', self.title,
             title_x, title_y,
             self.title_color, self.title_size,
         )
@@ -158,21 +163,21 @@ class BaseMenu:
             text_width = len(item.text) * self.item_size * 0.6
             text_x = (self.screen_width // 2) - (text_width // 2) + offset
 
-            arcade.draw_text(
-                item.text,
+            self.text_layer.text(
+                f'item_{i}', item.text,
                 text_x, y_position,
                 color, self.item_size,
             )
 
             if item.selected:
-                arcade.draw_text(
-                    "►",
+                self.text_layer.text(
+                    'cursor_left', "►",
                     text_x - 50, y_position,
                     self.selected_color, self.item_size,
                 )
 
-                arcade.draw_text(
-                    "◄",
+                self.text_layer.text(
+                    'cursor_right', "◄",
                     text_x + text_width + 30, y_position,
                     self.selected_color, self.item_size
                 )
@@ -191,44 +196,57 @@ class MainMenu(BaseMenu):
         self.background_color = (25, 25, 112)
         self.title_color = (255, 215, 0)
 
-        self.star_positions = []
+        self.gradient_texture = None
+        self.star_list = arcade.SpriteList()
         self.generate_background_stars()
 
     def generate_background_stars(self):
+        #Also (re)bakes the gradient, both depend on the screen size
+        self.gradient_texture = self._bake_gradient()
+
+        self.star_list.clear()
         for _  in range(50):
             x = random.randint(0, self.screen_width)
             y = random.randint(0, self.screen_height)
             size = random.randint(1, 3)
-            speed = random.uniform(10, 30)
-            self.star_positions.append([x, y, size, speed])
+            star = arcade.SpriteCircle(size, settings.WHITE)  # Circle textures are shared per size
+            star.position = (x, y)
+            star.speed = random.uniform(10, 30)
+            self.star_list.append(star)
+
+    def _bake_gradient(self):
+        #The gradient never changes - one pixel wide & drawn stretched, so it's one quad instead of a rect per 4 px band
+        pixels = []
+        for row in range(self.screen_height):
+            y = self.screen_height - 1 - row  # Image rows run top-down
+            intensity = (y - y % 4) / self.screen_height
+            pixels.append((
+                int(25 + intensity * 50),
+                int(25 + intensity * 50),
+                int(112 + intensity * 50),
+                255
+            ))
+
+        image = Image.new('RGBA', (1, self.screen_height))
+        image.putdata(pixels)
+        return arcade.Texture(image, hash=f"menu-gradient-{self.screen_height}")
 
     def update(self, delta_time):
         super().update(delta_time)
 
-        for star in self.star_positions:
-            star[1] -= star[3] * delta_time   # Move star down
-            if star[1] < 0:   # Reset if leaves screen
-                star[1] = self.screen_height
-                star[0] = __import__('random').randint(0, self.screen_width)
+        #Positions are written straight into the sprite list's buffer
+        for star in self.star_list:
+            star.center_y -= star.speed * delta_time   # Move star down
+            if star.center_y < 0:   # Reset if leaves screen
+                star.center_y = self.screen_height
+                star.center_x = random.randint(0, self.screen_width)
 
     def draw(self):
-        #Gradient
-        for y in range(0, self.screen_height, 4):
-            intensity = y / self.screen_height
-            color = (
-                int(25 + intensity * 50),
-                int(25 + intensity * 50),
-                int(112 + intensity * 50)
-            )
-
-            arcade.draw_lbwh_rectangle_filled(
-                0, y,
-                self.screen_width, 4,
-                color
-            )
-
-        for star in self.star_positions:
-            arcade.draw_circle_filled(star[0], star[1], star[2], settings.WHITE)
+        arcade.draw_texture_rect(
+            self.gradient_texture,
+            arcade.LBWH(0, 0, self.screen_width, self.screen_height)
+        )
+        self.star_list.draw()
 
         shadow_offset = 3
         
@@ -238,16 +256,16 @@ class MainMenu(BaseMenu):
         title_y = self.screen_height - self.title_y_offset
         
         # Draw title shadow
-        arcade.draw_text(
-            self.title,
+        self.text_layer.text(
+            'title_shadow', self.title,
             title_x + shadow_offset,
             title_y - shadow_offset,
             (50, 50, 50), self.title_size
         )
 
         # Draw main title
-        arcade.draw_text(
-            self.title,
+        self.text_layer.text(
+            'title', self.title,
             title_x, title_y,
             self.title_color, self.title_size
         )
@@ -258,8 +276,8 @@ class MainMenu(BaseMenu):
         subtitle = "Use ↑↓ to navigate, ENTER to select"
         subtitle_width = len(subtitle) * 16 // 2  # Rough text width estimation
         subtitle_x = (self.screen_width // 2) - (subtitle_width // 2)
-        arcade.draw_text(
-            subtitle,
+        self.text_layer.text(
+            'subtitle', subtitle,
             subtitle_x, 50,
             settings.WHITE, 16
         )
@@ -324,8 +342,8 @@ class GameOverMenu(BaseMenu):
         for i, stat in enumerate(stats):
             stat_width = len(stat) * 18 // 2  # Rough text width
             stat_x = (self.screen_width // 2) - (stat_width // 2)
-            arcade.draw_text(
-                stat,
+            self.text_layer.text(
+                f'stat_{i}', stat,
                 stat_x, stats_y - (i * 30),
                 settings.WHITE, 18
             )
@@ -401,8 +419,8 @@ class LevelCompleteMenu(BaseMenu):
         congrats_text = f"CONGRATULATIONS! YOU BEAT {self.level_name}!"
         text_width = len(congrats_text) * 20 // 2
         congrats_x = (self.screen_width // 2) - (text_width // 2)
-        arcade.draw_text(
-            congrats_text,
+        self.text_layer.text(
+            'congrats', congrats_text,
             congrats_x, self.screen_height - 200,
             self.title_color, 20
         )
@@ -417,8 +435,8 @@ class LevelCompleteMenu(BaseMenu):
         for i, stat in enumerate(stats):
             stat_width = len(stat) * 16 // 2
             stat_x = (self.screen_width // 2) - (stat_width // 2)
-            arcade.draw_text(
-                stat,
+            self.text_layer.text(
+                f'stat_{i}', stat,
                 stat_x, stats_y - (i*25),
                 settings.WHITE, 16
             )
@@ -498,6 +516,7 @@ class MenuManager:
     def draw(self):
         if self.current_menu:
             self.current_menu.draw()
+            self.current_menu.text_layer.draw()
 
     def set_game_over_stats(self, score, level, coins, enemies):
         self.game_over_menu.set_game_stats(score, level, coins, enemies)
@@ -509,5 +528,6 @@ class MenuManager:
         for menu in [self.main_menu, self.pause_menu, self.game_over_menu, self.settings_menu]:
             menu.screen_width = width
             menu.screen_height = height
+            menu.text_layer.clear()
             if hasattr(menu, 'generate_background_stars'):
                 menu.generate_background_stars()
@@ -0,0 +1,97 @@
+#Frame-time overlay - stacked per-stage graph & percentile table for a FrameProfiler
+import arcade
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import settings
+from ui.text_layer import TextLayer
+
+STAGE_COLORS = [
+    (230, 80, 80), (240, 160, 60), (240, 220, 80), (120, 210, 90),
+    (70, 190, 200), (90, 130, 230), (170, 100, 220), (220, 110, 180),
+    (160, 160, 160), (200, 140, 100)
+]
+
+class ProfilerOverlay:
+    #One bar per stored frame, split into stage colours, with the frame budget as a line
+
+    def __init__(self, profiler, x=10, y=10, width=360, height=120):
+        self.profiler = profiler
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+        self.budget_ms = settings.FIXED_TIMESTEP * 1000.0
+        self.scale_ms = self.budget_ms * 2  # Graph height in ms
+
+        self.refresh_frames = settings.PROFILER_REFRESH_FRAMES
+        self.table = []  # (colour, text) lines, rebuilt every refresh_frames
+        self.table_frame = -1
+        self.text_layer = TextLayer()  # Table lines, only re-laid out when a refresh changes them
+
+    def draw(self):
+        if not self.profiler.enabled:
+            return
+
+        samples = self.profiler.recent()
+        arcade.draw_lrbt_rectangle_filled(
+            self.x, self.x + self.width, self.y, self.y + self.height, (0, 0, 0, 170)
+        )
+
+        if len(samples):
+            self._draw_graph(samples)
+
+        budget_y = self.y + self.height * min(1.0, self.budget_ms / self.scale_ms)
+        arcade.draw_line(self.x, budget_y, self.x + self.width, budget_y, (255, 255, 255, 120), 1)
+
+        self._draw_table()
+
+    def _draw_graph(self, samples):
+        #One draw_lines batch per stage - each frame is a vertical segment from its stack base
+        bar_width = self.width / self.profiler.history
+        start_x = self.x + self.width - len(samples) * bar_width + bar_width / 2
+        pixels_per_ms = self.height / self.scale_ms
+        top = self.y + self.height
+
+        base = [self.y] * len(samples)
+        for column in range(samples.shape[1]):
+            points = []
+            for index, value in enumerate(samples[:, column]):
+                bottom = base[index]
+                height = value * pixels_per_ms
+                if height <= 0 or bottom >= top:
+                    continue
+
+                x = start_x + index * bar_width
+                base[index] = min(top, bottom + height)
+                points.append((x, bottom))
+                points.append((x, base[index]))
+
+            if points:
+                color = STAGE_COLORS[column % len(STAGE_COLORS)]
+                arcade.draw_lines(points, color, max(1.0, bar_width))
+
+    def _draw_table(self):
+        frames = self.profiler.frames
+        if frames - self.table_frame >= self.refresh_frames or not self.table:
+            self.table_frame = frames
+            self.table = []
+            stage_names = list(self.profiler.stages)
+
+            for name, (p50, p95, p99) in self.profiler.percentiles().items():
+                if name in stage_names:
+                    color = STAGE_COLORS[stage_names.index(name) % len(STAGE_COLORS)]
+                else:
+                    color = settings.WHITE
+                self.table.append((color, f"{name:<12} {p50:6.2f} {p95:6.2f} {p99:6.2f}"))
+
+        line_y = self.y + self.height + 8
+        for index, (color, text) in enumerate(reversed(self.table)):
+            self.text_layer.text(f'line_{index}', text, self.x, line_y, color, 10, font_name="Courier New")
+            line_y += 14
+
+        self.text_layer.text('header', "stage          p50    p95    p99 ms", self.x, line_y, settings.WHITE, 10, font_name="Courier New")
+        self.text_layer.draw()
@@ -0,0 +1,57 @@
+#Retained text - one arcade.Text per field, kept between frames & drawn together in one batch
+#arcade.draw_text lays a string out again whenever its arguments change, a field here only
+#re-lays out when its own text, position or color actually changes
+import arcade
+import pyglet
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import settings
+
+class TextLayer:
+
+    def __init__(self):
+        self.batch = pyglet.graphics.Batch()
+        self.fields = {}   # key -> arcade.Text
+        self.colors = {}   # key -> color it was last given, so unchanged colors skip the label update
+        self._shown = set()  # Keys set this frame
+        self._drawn = set()  # Keys drawn last frame
+
+    def text(self, key, text, x, y, color=settings.WHITE, font_size=12, **style):
+        #Shows the field for this frame - anything not set again before the next draw() is hidden
+        field = self.fields.get(key)
+        if field is None:
+            field = arcade.Text(text, x, y, color, font_size, batch=self.batch, **style)
+            self.fields[key] = field
+            self.colors[key] = color
+        else:
+            field.text = text
+            field.x = x
+            field.y = y
+            if self.colors[key] != color:
+                field.color = color
+                self.colors[key] = color
+            field.label.visible = True
+
+        self._shown.add(key)
+        return field
+
+    def draw(self):
+        for key in self._drawn - self._shown:
+            self.fields[key].label.visible = False
+        self._drawn, self._shown = self._shown, set()
+
+        if self._drawn:
+            self.batch.draw()
+
+    def clear(self):
+        #Drops every field, e.g. when the screen size changes
+        for field in self.fields.values():
+            field.label.visible = False
+        self.batch = pyglet.graphics.Batch()
+        self.fields.clear()
+        self.colors.clear()
+        self._shown.clear()
+        self._drawn.clear()
@@ -46,9 +46,9 @@ class Player(arcade.Sprite):
         self.change_x = 0
         self.change_y = 0
 
-    def update(self, delta_time=1/60):
+    def update(self, delta_time=settings.FIXED_TIMESTEP):
         #Update state animations & timers
-        self.update_timers()
+        self.update_timers(delta_time)
         self.was_on_ground = self.is_on_ground
 
         if self.is_on_ground and not self.is_moving:
@@ -65,21 +65,21 @@ class Player(arcade.Sprite):
         self.update_animation_state()
 
         if self.invulnerable:
-            self.invulnerable_timer -= 1/60  #Assuming 60 fps, change this with fps
+            self.invulnerable_timer -= delta_time
             if self.invulnerable_timer <= 0:
                 self.invulnerable = False
 
-    def update_timers(self):
+    def update_timers(self, delta_time=settings.FIXED_TIMESTEP):
         #jump buffer & coyote time timers
         if self.jump_buffer_timer > 0:
-            self.jump_buffer_timer -= 1/60  #Assuming 60 fps
+            self.jump_buffer_timer -= delta_time
 
         if self.was_on_ground and not self.is_on_ground:
             self.coyote_timer = settings.COYOTE_TIME
         elif self.is_on_ground:
             self.coyote_timer = 0
         elif self.coyote_timer > 0:
-            self.coyote_timer -= 1/60
+            self.coyote_timer -= delta_time
 
     def update_animation_state(self):
         #Finds right animation
@@ -0,0 +1,102 @@
+#Activation window - only entities near the camera get updated
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import settings
+
+class ActivationWindow:
+    #Band of world columns around the camera view, widened by margin on both sides
+    #Side-scroller, so the band covers the full level height - enemies falling out
+    #of the view keep updating until they drop past the fall-out line
+
+    def __init__(self, margin=None, view_width=None):
+        self.margin = settings.ACTIVATION_MARGIN if margin is None else margin
+        self.view_width = view_width or settings.SCREEN_WIDTH
+
+        self.left = float('-inf')
+        self.right = float('inf')
+
+    def update(self, camera):
+        #camera.position is the centre of the view, same as arcade's Camera2D
+        center_x = camera.position[0]
+        half_width = self.view_width / 2 / getattr(camera, 'zoom', 1.0)
+
+        self.left = center_x - half_width - self.margin
+        self.right = center_x + half_width + self.margin
+
+    def contains(self, x):
+        return self.left <= x <= self.right
+
+    def mask(self, xs):
+        #NumPy bool mask for an array of x positions
+        return (xs >= self.left) & (xs <= self.right)
+
+class ColumnBuckets:
+    #Sprites bucketed by x so the awake set can be found w/o touching sleeping sprites
+    #Sleeping sprites don't move, only the awake ones need rebucket() after each tick
+
+    def __init__(self, bucket_width=None):
+        self.bucket_width = bucket_width or settings.ACTIVATION_BUCKET_WIDTH
+        self.buckets = {}  # column -> {sprite: None}, dicts keep insertion order deterministic
+        self.columns = {}  # sprite -> column
+
+    def __len__(self):
+        return len(self.columns)
+
+    def _column(self, sprite):
+        return int(sprite.center_x // self.bucket_width)
+
+    def add(self, sprite):
+        column = self._column(sprite)
+        self.buckets.setdefault(column, {})[sprite] = None
+        self.columns[sprite] = column
+
+    def discard(self, sprite):
+        column = self.columns.pop(sprite, None)
+        if column is None:
+            return
+
+        bucket = self.buckets[column]
+        del bucket[sprite]
+        if not bucket:
+            del self.buckets[column]
+
+    def rebucket(self, sprites):
+        for sprite in sprites:
+            old_column = self.columns.get(sprite)
+            if old_column is None:
+                continue
+
+            column = self._column(sprite)
+            if column != old_column:
+                self.discard(sprite)
+                self.add(sprite)
+
+    def query(self, window):
+        #Sprites inside the window, ones that left their sprite lists are dropped on the way
+        awake = []
+        removed = []
+        first = int(window.left // self.bucket_width)
+        last = int(window.right // self.bucket_width)
+
+        for column in range(first, last + 1):
+            bucket = self.buckets.get(column)
+            if not bucket:
+                continue
+
+            for sprite in bucket:
+                if not sprite.sprite_lists:
+                    removed.append(sprite)
+                elif window.contains(sprite.center_x):
+                    awake.append(sprite)
+
+        for sprite in removed:
+            self.discard(sprite)
+
+        return awake
+
+    def clear(self):
+        self.buckets.clear()
+        self.columns.clear()
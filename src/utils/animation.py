@@ -1,6 +1,7 @@
 #Animations
 import arcade
 import time
+import weakref
 from typing import Dict, List, Optional, Tuple, Any, Callable
 from enum import Enum
 from pathlib import Path
@@ -41,11 +42,21 @@ class AnimationPlayback(Enum):
     PING_PONG = 'ping_pong'
     HOLD_LAST = 'hold_last'
 
+def variant_animation_set(base: str, variant: str) -> str:
+    #'goomba', 'fast' -> 'goomba_fast', the normal variant uses the base set
+    return base if variant == 'normal' else f'{base}_{variant}'
+
+def mirror_frames(frames: List[arcade.Texture]) -> List[arcade.Texture]:
+    #Left-facing copies - same image data, so the atlas keeps one entry per frame either way
+    return [frame.flip_left_right() for frame in frames]
+
 class Animation:
 
-    def __init__(self, name: str, frames: List[arcade.Texture], frame_duration: float = 0.1, playback_mode: AnimationPlayback = AnimationPlayback.LOOP):
+    def __init__(self, name: str, frames: List[arcade.Texture], frame_duration: float = 0.1, playback_mode: AnimationPlayback = AnimationPlayback.LOOP, mirrored_frames: Optional[List[arcade.Texture]] = None):
+        #frames face right, mirrored_frames left - pass lists shared between animations, or the mirror is made on first use
         self.name = name
         self.frames = frames
+        self.mirrored_frames = mirrored_frames
         self.frame_duration = frame_duration
         self.playback_mode = playback_mode
 
@@ -116,9 +127,13 @@ class Animation:
             except Exception as e:
                 print(f"Animation completion callback error: {e}")
 
-    def get_current_texture(self) -> Optional[arcade.Texture]:
+    def get_current_texture(self, mirrored: bool = False) -> Optional[arcade.Texture]:
         if not self.frames or self.current_frame >= len(self.frames):
             return None
+        if mirrored:
+            if self.mirrored_frames is None:
+                self.mirrored_frames = mirror_frames(self.frames)
+            return self.mirrored_frames[self.current_frame]
         return self.frames[self.current_frame]
     
     def restart(self):
@@ -150,7 +165,8 @@ class Animation:
 class AnimationController:
 
     def __init__(self, sprite: arcade.Sprite):
-        self.sprite = sprite
+        self._sprite = weakref.ref(sprite)  # The manager's registry holds controllers, they mustn't keep sprites alive
+        self.listed = False  # Seen in a sprite list - leaving all of them retires the controller
         self.animations: Dict[str, Animation] = {}
         self.current_animation_name = None
         self.current_animation = None
@@ -197,36 +213,41 @@ class AnimationController:
         self._update_sprite_texture()
 
         return True
+
+    @property
+    def sprite(self) -> Optional[arcade.Sprite]:
+        return self._sprite()
     
-    def update(self, delta_time: float):
-        if not self.current_animation:
+    def update(self, delta_time: float, sprite: Optional[arcade.Sprite] = None):
+        #The registry passes the sprite it already dereferenced
+        if sprite is None:
+            sprite = self._sprite()
+        if not self.current_animation or sprite is None:
             return
         
-        if self.auto_mirror and hasattr(self.sprite, 'change_x'):
-            if self.sprite.change_x > 0:
-                self.mirrored = False
-            elif self.sprite.change_x < 0:
-                self.mirrored = True
+        mirrored = self.mirrored
+        if self.auto_mirror and hasattr(sprite, 'change_x'):
+            if sprite.change_x > 0:
+                mirrored = False
+            elif sprite.change_x < 0:
+                mirrored = True
 
         frame_changed = self.current_animation.update(delta_time)
 
-        if frame_changed:
-            self._update_sprite_texture()
+        if frame_changed or mirrored != self.mirrored:
+            self.mirrored = mirrored
+            self._update_sprite_texture(sprite)
 
-    def _update_sprite_texture(self):
-        if not self.current_animation:
+    def _update_sprite_texture(self, sprite: Optional[arcade.Sprite] = None):
+        #Both facings are prebuilt, so this is a list lookup
+        if sprite is None:
+            sprite = self._sprite()
+        if not self.current_animation or sprite is None:
             return
         
-        texture = self.current_animation.get_current_texture()
-        if texture:
-            if self.mirrored:
-                try:
-                    flipped_texture = texture.flip_horizontally()
-                    self.sprite.texture = flipped_texture
-                except AttributeError:
-                    self.sprite.texture = texture
-        else:
-            self.sprite.texture = texture
+        texture = self.current_animation.get_current_texture(self.mirrored)
+        if texture and sprite.texture is not texture:
+            sprite.texture = texture
 
     def get_current_animation_name(self) -> Optional[str]:
         return self.current_animation_name
@@ -247,18 +268,218 @@ class AnimationController:
             self.mirrored = mirrored
             self._update_sprite_texture()
 
+class AnimationGroup:
+    #Sprites playing the same animation in step - one clock & frame index for all of them
+    #Ticking is O(1), sprites are only touched when the shared frame changes
+
+    def __init__(self, animation: Animation):
+        self.animation = animation
+        #sprite -> [facing left, seen in a sprite list], held weakly like the controller registry
+        self.members = weakref.WeakKeyDictionary()
+
+    def add(self, sprite: arcade.Sprite, mirrored: bool = False):
+        self.members[sprite] = [mirrored, bool(sprite.sprite_lists)]
+        texture = self.animation.get_current_texture(mirrored)
+        if texture:
+            sprite.texture = texture
+
+    def remove(self, sprite: arcade.Sprite):
+        self.members.pop(sprite, None)
+
+    def is_mirrored(self, sprite: arcade.Sprite) -> bool:
+        state = self.members.get(sprite)
+        return state[0] if state else False
+
+    def set_facing(self, sprite: arcade.Sprite, mirrored: bool):
+        #For turns that shouldn't wait for the next frame change
+        state = self.members.get(sprite)
+        if state and state[0] != mirrored:
+            state[0] = mirrored
+            sprite.texture = self.animation.get_current_texture(mirrored)
+
+    def update(self, delta_time: float) -> int:
+        #Returns how many members were dropped for having left their sprite lists
+        if not self.members or not self.animation.update(delta_time):
+            return 0
+
+        right = self.animation.get_current_texture(False)
+        left = self.animation.get_current_texture(True)
+        removed = None
+        for sprite, state in self.members.items():
+            if sprite.sprite_lists:
+                state[1] = True
+            elif state[1]:
+                if removed is None:
+                    removed = []
+                removed.append(sprite)
+                continue
+
+            #Facing follows movement like AnimationController.auto_mirror, checked when the frame changes
+            change_x = sprite.change_x
+            if change_x:
+                state[0] = change_x < 0
+            sprite.texture = left if state[0] else right
+
+        if removed:
+            for sprite in removed:
+                del self.members[sprite]
+            return len(removed)
+        return 0
+
+class ControllerRegistry:
+    #sprite -> AnimationController without keeping sprites alive - an entry goes when its sprite is
+    #garbage collected, or on the next update once a sprite that was in sprite lists has left them all
+    #Entries are keyed by id(sprite), each holds a weak ref whose callback drops the entry
+
+    def __init__(self):
+        self._entries = {}  # id(sprite) -> (weak ref to the sprite, controller)
+        self.removed = 0  # Retired for leaving their sprite lists
+
+    def _drop(self, ref):
+        #Weak ref callback, runs before the dead sprite's id can be reused
+        entry = self._entries.get(ref.key)
+        if entry is not None and entry[0] is ref:
+            del self._entries[ref.key]
+
+    def __setitem__(self, sprite: arcade.Sprite, controller: AnimationController):
+        key = id(sprite)
+        self._entries[key] = (weakref.KeyedRef(sprite, self._drop, key), controller)
+
+    def __getitem__(self, sprite: arcade.Sprite) -> AnimationController:
+        return self._entries[id(sprite)][1]
+
+    def __delitem__(self, sprite: arcade.Sprite):
+        del self._entries[id(sprite)]
+
+    def __contains__(self, sprite) -> bool:
+        return id(sprite) in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self):
+        for sprite, _ in self.items():
+            yield sprite
+
+    def get(self, sprite: arcade.Sprite, default=None) -> Optional[AnimationController]:
+        entry = self._entries.get(id(sprite))
+        return entry[1] if entry is not None else default
+
+    def values(self):
+        return [controller for _, controller in self._entries.values()]
+
+    def items(self):
+        items = []
+        for ref, controller in list(self._entries.values()):
+            sprite = ref()
+            if sprite is not None:
+                items.append((sprite, controller))
+        return items
+
+    def update(self, delta_time: float):
+        #Updates every live controller & retires the ones whose sprites were removed, in one pass
+        #Walks a snapshot, a sprite collected mid-update drops its entry without disturbing the loop
+        removed = None
+        for _, controller in list(self._entries.values()):
+            sprite = controller.sprite
+            if sprite is None:
+                continue  # Collected, _drop removes the entry
+            if sprite.sprite_lists:
+                controller.listed = True
+            elif controller.listed:
+                if removed is None:
+                    removed = []
+                removed.append(sprite)
+                continue
+            controller.update(delta_time, sprite)
+
+        if removed:
+            for sprite in removed:
+                del self[sprite]
+            self.removed += len(removed)
+
 class AnimationManager:
 
     def __init__(self, asset_loader=None):
         self.asset_loader = asset_loader
-        self.controllers: Dict[arcade.Sprite, AnimationController] = {}
+        self.controllers = ControllerRegistry()
+
+        #Crowds share clocks: (animation set, animation, phase) -> group, sprite -> its group (weak)
+        self.groups: Dict[Tuple[str, str, int], AnimationGroup] = {}
+        self.sprite_groups = weakref.WeakKeyDictionary()
+        self.removed_from_groups = 0
+        self._next_phase = 0
 
         self.animation_definitions = self._create_animation_definitions()
+        #(animation set, animation) -> (frames, mirrored frames), shared by every controller using them
+        self.frame_sets: Dict[Tuple[str, str], Tuple[List[arcade.Texture], List[arcade.Texture]]] = {}
 
         self.global_effects: List[Callable] = []
 
     def set_asset_loader(self, asset_loader):
         self.asset_loader = asset_loader
+        self.frame_sets.clear()
+
+    def join_group(self, sprite: arcade.Sprite, animation_set: str, animation_name: str, phase: Optional[int] = None) -> Optional[AnimationGroup]:
+        #Plays animation_name on sprite from a clock shared with every sprite in the same phase
+        #Phases (settings.ANIMATION_GROUP_PHASES, handed out in turn by default) start the loop at
+        #different points, so a crowd doesn't step in lockstep
+        #Returns None when grouping is off (0 phases) or the animation has no frames
+        phases = settings.ANIMATION_GROUP_PHASES
+        if not phases:
+            return None
+        if phase is None:
+            phase = self._next_phase
+            self._next_phase = (self._next_phase + 1) % phases
+        key = (animation_set, animation_name, phase % phases)
+
+        group = self.groups.get(key)
+        if group is None:
+            anim_data = self.animation_definitions.get(animation_set, {}).get(animation_name)
+            frame_set = self._get_frame_set(animation_set, animation_name, anim_data) if anim_data else None
+            if not frame_set:
+                return None
+
+            animation = Animation(
+                animation_name, frame_set[0],
+                frame_duration=anim_data.get('duration', 0.1),
+                playback_mode=anim_data.get('mode', AnimationPlayback.LOOP),
+                mirrored_frames=frame_set[1]
+            )
+            offset = (phase % phases) / phases * animation.frame_duration * len(animation.frames)
+            animation.set_frame(int(offset // animation.frame_duration))
+            animation.frame_time = offset % animation.frame_duration
+
+            group = AnimationGroup(animation)
+            self.groups[key] = group
+
+        self.leave_group(sprite)
+        group.add(sprite, getattr(sprite, 'change_x', 0) < 0)
+        self.sprite_groups[sprite] = group
+        return group
+
+    def leave_group(self, sprite: arcade.Sprite):
+        group = self.sprite_groups.pop(sprite, None)
+        if group:
+            group.remove(sprite)
+
+    def diverge(self, sprite: arcade.Sprite, animation_set: str, animation_name: Optional[str] = None) -> AnimationController:
+        #Moves sprite from its group onto its own controller (a stomped goomba, a collected coin),
+        #picking up where the group was
+        group = self.sprite_groups.get(sprite)
+        mirrored = group.is_mirrored(sprite) if group else False
+        self.leave_group(sprite)
+
+        controller = self.create_controller(sprite, animation_set)
+        controller.mirrored = mirrored
+        if group and group.animation.name in controller.animations and not animation_name:
+            controller.set_animation(group.animation.name)
+            controller.current_animation.set_frame(group.animation.current_frame)
+            controller.current_animation.frame_time = group.animation.frame_time
+        if animation_name:
+            controller.set_animation(animation_name, force_restart=True)
+        controller._update_sprite_texture()
+        return controller
 
     def create_controller(self, sprite: arcade.Sprite, animation_set: str = None) -> AnimationController:
         controller = AnimationController(sprite)
@@ -273,19 +494,23 @@ class AnimationManager:
         return self.controllers.get(sprite)
     
     def update_all(self, delta_time: float):
-        sprites_to_remove = []
-        for sprite in self.controllers:
-            if not hasattr(sprite, 'center_x'):
-                sprites_to_remove.append(sprite)
+        for group in self.groups.values():
+            self.removed_from_groups += group.update(delta_time)
 
-        for sprite in sprites_to_remove:
-            del self.controllers[sprite]
+        self.controllers.update(delta_time)
 
-        for controller in self.controllers.values():
-            controller.update(delta_time)
+    def get_stats(self) -> Dict[str, int]:
+        #Live counts - these should stay flat over a long session
+        return {
+            'controllers': len(self.controllers),
+            'groups': len(self.groups),
+            'grouped_sprites': sum(len(group.members) for group in self.groups.values()),
+            'controllers_removed': self.controllers.removed,
+            'group_removals': self.removed_from_groups
+        }
 
     def _create_animation_definitions(self) -> Dict[str, Dict]:
-        return {
+        definitions = {
             'player': {
                 'idle': {
                     'frames': ['player_idle'],
@@ -350,37 +575,63 @@ class AnimationManager:
                 }
             }
         }
+
+        #Variant sets (see variant_animation_set) - the base set's timings with the variant's own frames
+        for variant in ('fast', 'large', 'elite'):
+            definitions[variant_animation_set('goomba', variant)] = {
+                'walk': dict(definitions['goomba']['walk'], frames=[f'goomba_{variant}']),
+                'die': definitions['goomba']['die']
+            }
+        for coin_type in ('silver', 'gold', 'special'):
+            definitions[variant_animation_set('coin', coin_type)] = {
+                name: dict(anim_data, frames=[f'coin_{coin_type}'])
+                for name, anim_data in definitions['coin'].items()
+            }
+        return definitions
     
     def _load_animations_set(self, controller: AnimationController, animation_set: str):
-        if not self.asset_loader:
-            print("Warning: No asset loader available for animations")
-            return
-        
         animation_def = self.animation_definitions.get(animation_set, {})
 
         for anim_name, anim_data in animation_def.items():
-            frames  = []
-
-            for frame_name in anim_data['frames']:
-                texture = self.asset_loader.get_texture(frame_name)
-                if texture:
-                    frames.append(texture)
-                else:
-                    if hasattr(self.asset_loader, '_create_colored_texture'):
-                        fallback_texture = self.asset_loader._create_colored_texture(
-                            frame_name, (32, 32), (255, 0, 255)
-                        )
-                        frames.append(fallback_texture)
-
-            if frames:
+            frame_set = self._get_frame_set(animation_set, anim_name, anim_data)
+
+            if frame_set:
                 animation = Animation(
                     name=anim_name,
-                    frames=frames,
+                    frames=frame_set[0],
                     frame_duration=anim_data.get('duration', 0.1),
-                    playback_mode=anim_data.get('mode', AnimationPlayback.LOOP)
+                    playback_mode=anim_data.get('mode', AnimationPlayback.LOOP),
+                    mirrored_frames=frame_set[1]
                 )
                 controller.add_anmiation(animation)
 
+    def _get_frame_set(self, animation_set: str, anim_name: str, anim_data: Dict):
+        #Loads & mirrors an animation's frames the first time any controller needs them
+        key = (animation_set, anim_name)
+        if key in self.frame_sets:
+            return self.frame_sets[key]
+        if not self.asset_loader:
+            print("Warning: No asset loader available for animations")
+            return None
+
+        frames  = []
+        for frame_name in anim_data['frames']:
+            texture = self.asset_loader.get_texture(frame_name)
+            if texture:
+                frames.append(texture)
+            else:
+                if hasattr(self.asset_loader, '_create_colored_texture'):
+                    fallback_texture = self.asset_loader._create_colored_texture(
+                        frame_name, (32, 32), (255, 0, 255)
+                    )
+                    frames.append(fallback_texture)
+
+        if not frames:
+            return None
+
+        self.frame_sets[key] = (frames, mirror_frames(frames))
+        return self.frame_sets[key]
+
     def create_custom_animation(self, name: str, texture_names: List[str], 
                               duration: float = 0.1, 
                               playback_mode: AnimationPlayback = AnimationPlayback.LOOP) -> Optional[Animation]:
@@ -400,6 +651,7 @@ class AnimationManager:
     def cleanup_sprite(self, sprite: arcade.Sprite):
         if sprite in self.controllers:
             del self.controllers[sprite]
+        self.leave_group(sprite)
 
 def create_animation_from_spritesheet(name: str, spritesheet_path: str, frame_width: int, frame_height: int, frame_count: int, duration: float = 0.1) -> Optional[Animation]:
     print(f"Spritesheet animation creation not yet implemented: {name}")
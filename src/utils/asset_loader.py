@@ -1,4 +1,5 @@
 import arcade
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple, Any
 from PIL import Image
 from pathlib import Path
@@ -11,6 +12,9 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import settings
+from utils.texture_cache import TextureCache
+
+ATLAS_EXCLUDED_GROUPS = ('backgrounds',)  # Screen-sized, drawn on their own - everything else is a small sprite
 
 class AssetLoader:
 
@@ -20,8 +24,16 @@ class AssetLoader:
 
         self.textures: Dict[str, arcade.Texture] = {}
         self.sounds: Dict[str, arcade.Sound] = {}
+        self.music_tracks: Dict[str, Path] = {}  # track name -> file, streamed by the SoundManager when played
         self.sprite_sheets: Dict[str, List[arcade.Texture]] = {}
         self.tile_textures: Dict[str, arcade.Texture] = {}
+        self.texture_groups: Dict[str, str] = {}  # texture name -> group ('player', 'tiles', 'backgrounds'...)
+        self.atlas = None  # SpriteAtlas once build_atlas() has run
+
+        #Every known asset, loaded or not: name -> (store, group, load function, args)
+        #Groups named in settings.ASSET_MANIFEST are loaded together, anything else on first get_*()
+        self.asset_specs: Dict[str, Tuple] = {}
+        self.asset_groups: Dict[str, List[str]] = {}
 
         self.paths = {
             'sprites': self.assets_path / 'sprites',
@@ -34,9 +46,14 @@ class AssetLoader:
 
         self._create_asset_directories()
 
+        #Resized & placeholder textures from earlier runs, keyed by source hash + target size
+        self.texture_cache = TextureCache(str(self.assets_path / '__texturecache__')) if settings.TEXTURE_CACHE else None
+
         self.loaded = False
         self.loading_errors: List[str] = []
 
+        self._pending: List[Tuple] = []  # (store, name, decode function, args) waiting for _decode_pending
+
     def _create_asset_directories(self):
         for path in self.paths.values():
             path.mkdir(parents=True, exist_ok=True)
@@ -45,23 +62,23 @@ class AssetLoader:
         print("Loading game assets...")
 
         try:
-            print("Loading player assets...")
             self._load_player_assets()
-            print("Creating player animations...")
-            self._create_player_animations()
-            print("Loading enemy assets...")
             self._load_enemy_assets()
-            print("Loading tile assets...")
             self._load_tile_assets()
-            print("Loading UI assets...")
             self._load_ui_assets()
-            print("Loading sound assets...")
             self._load_sound_assets()
-            print("Loading background assets...")
             self._load_background_assets()
 
+            if settings.LAZY_ASSETS:
+                print("Loading menu assets...")
+                self.load_context('menu')
+            else:
+                print("Loading all assets...")
+                self.load_groups(list(self.asset_groups))
+
             self.loaded = True
-            print(f"Successfully loaded {len(self.textures)} textures and {len(self.sounds)} sounds")
+            deferred = len(self.asset_specs) - len(self.textures) - len(self.tile_textures) - len(self.sounds)
+            print(f"Successfully loaded {len(self.textures) + len(self.tile_textures)} textures and {len(self.sounds)} sounds, {deferred} more load on first use")
 
             if self.loading_errors:
                 print(f"Warning: {len(self.loading_errors)} assets failed to load:")
@@ -90,18 +107,12 @@ class AssetLoader:
         }
 
         for name, filename in player_assets.items():
-            texture = self._load_texture_with_fallback(
-                player_path / filename,
-                name,
-                size=(48, 48),
-                color=(255, 0, 0)
-            )
-            self.textures[name] = texture
+            self._declare_texture(self.textures, name, player_path / filename, (48, 48), (255, 0, 0), 'player')
 
     def _create_player_animations(self):
         walk_frames = [
-            self.textures.get('player_walk_1', self.textures['player_idle']),
-            self.textures.get('player_walk_2', self.textures['player_idle'])
+            self.get_texture('player_walk_1') or self.get_texture('player_idle'),
+            self.get_texture('player_walk_2') or self.get_texture('player_idle')
         ]
         self.sprite_sheets['player_walk'] = walk_frames
 
@@ -120,13 +131,7 @@ class AssetLoader:
 
         for name, (filename, fallback_color) in goomba_assets.items():
             size = (36, 36) if 'large' not in name else (48, 48)
-            texture = self._load_texture_with_fallback(
-                enemy_path / filename,
-                name,
-                size=size,
-                color=fallback_color
-            )
-            self.textures[name] = texture
+            self._declare_texture(self.textures, name, enemy_path / filename, size, fallback_color, 'goombas')
 
         koopa_assets = {
             'koopa_grey': ('koopa_grey.png', (0, 255, 0)),
@@ -135,13 +140,7 @@ class AssetLoader:
         }
 
         for name, (filename, fallback_color) in koopa_assets.items():
-            texture = self._load_texture_with_fallback(
-                enemy_path / filename,
-                name,
-                size=(24, 32),
-                color=fallback_color
-            )
-            self.textures[name] = texture
+            self._declare_texture(self.textures, name, enemy_path / filename, (24, 32), fallback_color, 'koopas')
 
     def _load_tile_assets(self):
         tiles_path = self.paths['tiles']
@@ -159,13 +158,8 @@ class AssetLoader:
         }
 
         for name, (filename, fallback_color) in tile_assets.items():
-            texture = self._load_texture_with_fallback(
-                tiles_path / filename,
-                name,
-                size=(settings.TILE_SIZE, settings.TILE_SIZE),
-                color=fallback_color
-            )
-            self.tile_textures[name] = texture
+            group = 'castle' if name in ('castle', 'flag_pole', 'flag') else 'tiles'
+            self._declare_texture(self.tile_textures, name, tiles_path / filename, (settings.TILE_SIZE, settings.TILE_SIZE), fallback_color, group)
 
     def _load_ui_assets(self):
         ui_path = self.paths['ui']
@@ -183,13 +177,13 @@ class AssetLoader:
 
         for name, (filename, fallback_color) in ui_assets.items():
             size = (16, 16) if 'coin' in name else (32, 32)
-            texture = self._load_texture_with_fallback(
-                ui_path / filename,
-                name,
-                size=size,
-                color=fallback_color
-            )
-            self.textures[name] = texture
+            if 'coin' in name:
+                group = 'coins'
+            elif name.startswith('button'):
+                group = 'buttons'
+            else:
+                group = 'hud'
+            self._declare_texture(self.textures, name, ui_path / filename, size, fallback_color, group)
 
     def _load_background_assets(self):
         bg_path = self.paths['backgrounds']
@@ -202,13 +196,7 @@ class AssetLoader:
         }
 
         for name, (filename, fallback_color) in bg_assets.items():
-            texture = self._load_texture_with_fallback(
-                bg_path / filename,
-                name,
-                size=(settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT),
-                color=fallback_color
-            )
-            self.textures[name] = texture
+            self._declare_texture(self.textures, name, bg_path / filename, (settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT), fallback_color, 'backgrounds')
 
     def _load_sound_assets(self):
         if not settings.ENABLE_SOUND:
@@ -226,89 +214,155 @@ class AssetLoader:
 
         for sound_file in sound_effects:
             sound_name = sound_file.replace('.ogg', '')
-            try:
-                if (sound_path / sound_file).exists():
-                    self.sounds[sound_name] = arcade.load_sound(sound_path / sound_file)
-                else:
-                    self.sounds[sound_name] = None
-                    self.loading_errors.append(f"Sound not found: {sound_file}")
-            except Exception as e:
-                self.loading_errors.append(f"Failed to load sound {sound_file}: {e}")
-                self.sounds[sound_name] = None
+            group = 'menu_sfx' if sound_name.startswith('menu') else 'sfx'
+            self._declare_sound(self.sounds, sound_name, sound_path / sound_file, 'sound', group)
 
         music_files = [
             'overworld.ogg', 'underground.ogg', 'castle.ogg',
             'game_over.ogg', 'victory.ogg'
         ]
 
+        #Music isn't decoded here, SoundManager.play_music streams the file
         for music_file in music_files:
-            music_name = music_file.replace('.ogg', '')
-            try:
-                if (music_path / music_file).exists():
-                    self.sounds[f"music_{music_name}"] = arcade.load_sound(music_path / music_file)
-                else:
-                    self.sounds[f"music_{music_name}"] = None
-                    self.loading_errors.append(f"Music not found: {music_file}")
-            except Exception as e:
-                self.loading_errors.append(f"Failed to load music {music_file}: {e}")
-                self.sounds[f"music_{music_name}"] = None
+            filepath = music_path / music_file
+            if filepath.exists():
+                self.music_tracks[music_file.replace('.ogg', '')] = filepath
+            else:
+                self.loading_errors.append(f"Music not found: {music_file}")
+
+    def _declare_texture(self, store: Dict, name: str, filepath: Path, size: Tuple[int, int], color: Tuple[int, int, int], group: str):
+        self.texture_groups[name] = group
+        self._declare(name, store, group, self._load_texture_with_fallback, (filepath, name, size, color))
+
+    def _declare_sound(self, store: Dict, name: str, filepath: Path, kind: str, group: str):
+        self._declare(name, store, group, self._load_sound_file, (filepath, kind))
+
+    def _declare(self, name: str, store: Dict, group: str, load, args: Tuple):
+        self.asset_specs[name] = (store, group, load, args)
+        self.asset_groups.setdefault(group, []).append(name)
+
+    def load_groups(self, groups: List[str]) -> int:
+        #Loads every not yet loaded asset in groups on the decode pool, returns how many were loaded
+        for group in groups:
+            for name in self.asset_groups.get(group, []):
+                store, _, load, args = self.asset_specs[name]
+                if name not in store:
+                    self._pending.append((store, name, load, args))
+
+        count = len(self._pending)
+        loaded = [name for _, name, _, _ in self._pending]
+        self._decode_pending()
+
+        if self.atlas:
+            self.atlas.add(self._atlas_textures(loaded))
+        return count
+
+    def load_context(self, context: str, extra_groups: Optional[List[str]] = None) -> int:
+        #Preloads the groups settings.ASSET_MANIFEST lists for context ('menu', 'level') plus any the level declares
+        groups = list(settings.ASSET_MANIFEST.get(context, []))
+        groups += [group for group in (extra_groups or []) if group not in groups]
+        return self.load_groups(groups)
+
+    def _load_on_demand(self, store: Dict, name: str):
+        #Declared assets that nothing preloaded are loaded the first time they're asked for
+        spec = self.asset_specs.get(name)
+        if spec is None or spec[0] is not store or name in store:
+            return store.get(name)
+
+        _, group, load, args = spec
+        if settings.DEBUG_MODE:
+            print(f"Loading {name} ({group}) on first use")
+
+        asset, error = load(*args)
+        store[name] = asset
+        if error:
+            self.loading_errors.append(error)
+        if self.atlas and asset is not None and name in self.texture_groups:
+            self.atlas.add(self._atlas_textures([name]))
+        return asset
+
+    def _decode_pending(self):
+        #Runs the queued loads on a thread pool, PIL decode/resample & the audio decoders release the GIL
+        #Workers only build CPU-side objects (pixels, hit boxes, PCM) - a texture is uploaded to the
+        #GPU atlas by the main thread the first time it's drawn
+        #Results are stored & errors reported in queue order, so the outcome doesn't depend on scheduling
+        pending, self._pending = self._pending, []
+        workers = min(settings.ASSET_DECODE_WORKERS, len(pending))
+
+        if workers <= 1:
+            results = [load(*args) for _, _, load, args in pending]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='asset-decode') as pool:
+                futures = [pool.submit(load, *args) for _, _, load, args in pending]
+                results = [future.result() for future in futures]
 
-    def _load_texture_with_fallback(self, filepath: Path, name: str, size: Tuple[int, int], color: Tuple[int, int, int]) -> arcade.Texture:
-        try:
-            #DEBUGGING
-            print(f"Attempting to load: {filepath}")
-            print(f"File exists: {filepath.exists()}")
+        for (store, name, _, _), (asset, error) in zip(pending, results):
+            store[name] = asset
+            if error:
+                self.loading_errors.append(error)
 
+    def _load_sound_file(self, filepath: Path, kind: str) -> Tuple[Optional[arcade.Sound], Optional[str]]:
+        #(sound, error) - safe to call from a decode worker
+        try:
             if filepath.exists():
-                #DEBUGGING
-                print(f"Loading real asset: {filepath}")
-                original_texture = arcade.load_texture(str(filepath))
-                #DEBUGGING
-                print(f"Successfully loaded {filepath}, size: {original_texture.width}x{original_texture.height}")
+                return arcade.load_sound(filepath), None
+            return None, f"{kind.capitalize()} not found: {filepath.name}"
+        except Exception as e:
+            return None, f"Failed to load {kind} {filepath.name}: {e}"
 
-                if (original_texture.width, original_texture.height) != size:
+    def _load_texture_with_fallback(self, filepath: Path, name: str, size: Tuple[int, int], color: Tuple[int, int, int]) -> Tuple[arcade.Texture, Optional[str]]:
+        #(texture, error) - safe to call from a decode worker, missing or broken files give a placeholder
+        try:
+            if filepath.exists():
+                source = filepath.read_bytes()
+                cache_key = TextureCache.file_key(source, size) if self.texture_cache else None
+                texture = self.texture_cache.load(cache_key) if self.texture_cache else None
+                if texture:
+                    texture.file_path = filepath
+                    return texture, None
+
+                image = Image.open(io.BytesIO(source))
+                if image.mode != 'RGBA':
+                    image = image.convert('RGBA')
+
+                if image.size != size:
                     if settings.DEBUG_MODE:
-                        print(f"Resizing {filepath.name}: {original_texture.width}x{original_texture.height} -> {size[0]}x{size[1]}")
-
-                    resized_texture = self._resize_texture(original_texture, size, name)
-                    return resized_texture
-                else:
-                    return original_texture
+                        print(f"Resizing {filepath.name}: {image.width}x{image.height} -> {size[0]}x{size[1]}")
+                    image = self._resize_image(image, size)
+
+                texture = arcade.Texture(image)
+                texture.file_path = filepath
+                if self.texture_cache:
+                    self.texture_cache.store(cache_key, texture)
+                return texture, None
             else:
-                #DEBUGGING
                 print(f"File not found, creating placeholder: {filepath}")
-                return self._create_colored_texture(name, size, color)
+                return self._create_colored_texture(name, size, color), None
         except Exception as e:
-            #DEBUGGING
             print(f"Error loading {filepath}: {e}")
-            self.loading_errors.append(f'Failed to load {filepath}: {e}')
-            return self._create_colored_texture(name, size, color)
-        
-    def _resize_texture(self, original_texture: arcade.Texture, target_size: Tuple[int, int], name: str) -> arcade.Texture:
-        try:
-            pil_image = original_texture.image
+            return self._create_colored_texture(name, size, color), f'Failed to load {filepath}: {e}'
 
-            #Resize with LANCZOS if downsizing, with BICUPIC if largening
-            if target_size[0] < pil_image.width or target_size[1] < pil_image.height:
-                resample_method = Image.Resampling.LANCZOS
-            else:
-                resample_method = Image.Resampling.BICUBIC
-
-            resized_image = pil_image.resize(target_size, resample_method)
-
-            resized_texture = arcade.Texture(resized_image)
-            return resized_texture
+    def _resize_image(self, image: Image.Image, target_size: Tuple[int, int]) -> Image.Image:
+        #Resize with LANCZOS if downsizing, with BICUPIC if largening
+        if target_size[0] < image.width or target_size[1] < image.height:
+            resample_method = Image.Resampling.LANCZOS
+        else:
+            resample_method = Image.Resampling.BICUBIC
 
-        except Exception as e:
-            print(f"Failed to resize texture {name}: {e}")
-            #falls back to og texture
-            return original_texture
+        return image.resize(target_size, resample_method)
 
     def _create_colored_texture(self, name: str, size: Tuple[int, int], color: Tuple[int, int, int]) -> arcade.Texture:
         try:
-            image = Image.new('RGBA', size, color + (255,))
+            cache_key = TextureCache.placeholder_key(size, color) if self.texture_cache else None
+            texture = self.texture_cache.load(cache_key) if self.texture_cache else None
+            if texture:
+                return texture
+
+            image = Image.new('RGBA', size, tuple(color) + (255,))
 
             texture = arcade.Texture(image)
+            if self.texture_cache:
+                self.texture_cache.store(cache_key, texture)
             return texture
 
         except Exception as e:
@@ -320,13 +374,13 @@ class AssetLoader:
             return self.get_goomba_texture(variant)
         elif enemy_type == 'koopa':
             texture_name = f"koopa_{variant}"
-            return self.textures.get(texture_name)
+            return self.get_texture(texture_name)
         else:
-            return self.textures.get(f"{enemy_type}_{variant}")
+            return self.get_texture(f"{enemy_type}_{variant}")
 
     def get_coin_texture(self, coin_type: str) -> Optional[arcade.Texture]:
         texture_name = f"coin_{coin_type}"
-        return self.textures.get(texture_name)
+        return self.get_texture(texture_name)
     
     def get_coin_color(self, coin_type: str) -> Tuple[int, int, int]:
         coin_colors = {
@@ -339,7 +393,7 @@ class AssetLoader:
 
     def get_goomba_texture(self, variant: str) -> Optional[arcade.Texture]:
         texture_name = f"goomba_{variant}"
-        return self.textures.get(texture_name)
+        return self.get_texture(texture_name)
     
     def get_goomba_color(self, variant: str) -> Tuple[int, int, int]:
         goomba_colors = {
@@ -361,23 +415,54 @@ class AssetLoader:
         }
         return goomba_sizes.get(variant, (24, 24))
 
+    def build_atlas(self, atlas=None):
+        #Packs every loaded tile, sprite & UI texture into the GPU atlas in one go - needs a GL context,
+        #so the windowed game calls this on the main thread once loading is done
+        #Groups loaded later are packed as they arrive
+        from utils.texture_atlas import SpriteAtlas
+
+        self.atlas = SpriteAtlas(self._atlas_textures(self.texture_groups), atlas)
+        return self.atlas
+
+    def _atlas_textures(self, names) -> Dict[str, arcade.Texture]:
+        textures = {}
+        for name in names:
+            group = self.texture_groups.get(name)
+            if group is None or group in ATLAS_EXCLUDED_GROUPS:
+                continue
+            store = self.asset_specs[name][0]
+            if store.get(name):
+                textures[name] = store[name]
+        return textures
+
+    def get_atlas_region(self, name: str):
+        return self.atlas.region(name) if self.atlas else None
+
+    def get_texture_uv(self, name: str) -> Optional[Tuple[float, float, float, float]]:
+        return self.atlas.uv(name) if self.atlas else None
+
     def get_texture(self, name: str) -> Optional[arcade.Texture]:
-        return self.textures.get(name)
+        return self._load_on_demand(self.textures, name)
     
     def get_tile_texture(self, name: str) -> Optional[arcade.Texture]:
-        return self.tile_textures.get(name)
+        return self._load_on_demand(self.tile_textures, name)
     
     def get_sound(self, name: str) -> Optional[arcade.Sound]:
-        return self.sounds.get(name)
+        return self._load_on_demand(self.sounds, name)
+    
+    def get_music_path(self, name: str) -> Optional[Path]:
+        return self.music_tracks.get(name)
     
     def get_animation(self, name: str) -> List[arcade.Texture]:
+        if not self.sprite_sheets and 'player_idle' in self.asset_specs:
+            self._create_player_animations()
         return self.sprite_sheets.get(name, [])
     
     def play_sound(self, name: str, volume: float = 1.0) -> bool:
         if not settings.ENABLE_SOUND:
             return False
         
-        sound = self.sounds.get(name)
+        sound = self.get_sound(name)
         if sound:
             try:
                 arcade.play_sound(sound, volume)
@@ -392,8 +477,12 @@ class AssetLoader:
             'textures_loaded': len(self.textures),
             'tile_textures_loaded': len(self.tile_textures),
             'sounds_loaded': len(self.sounds),
+            'music_tracks': len(self.music_tracks),
             'animations_loaded': len(self.sprite_sheets),
+            'assets_declared': len(self.asset_specs),
             'loading_errors': len(self.loading_errors),
+            'texture_cache_hits': self.texture_cache.hits if self.texture_cache else 0,
+            'texture_cache_misses': self.texture_cache.misses if self.texture_cache else 0,
             'fully_loaded': self.loaded
         }
     
@@ -402,8 +491,13 @@ class AssetLoader:
 
         self.textures.clear()
         self.sounds.clear()
+        self.music_tracks.clear()
         self.sprite_sheets.clear()
         self.tile_textures.clear()
+        self.texture_groups.clear()
+        self.asset_specs.clear()
+        self.asset_groups.clear()
+        self.atlas = None
         self.loading_errors.clear()
         self.loaded = False
 
@@ -415,13 +509,14 @@ class AssetLoader:
         }
         critical_tile_assets = {'ground'}
 
+        #Loads them if nothing has yet
         missing = []
         for asset in critical_assets:
-            if asset not in self.textures:
+            if self.get_texture(asset) is None:
                 missing.append(asset)
 
         for asset in critical_tile_assets:
-            if asset not in self.tile_textures:
+            if self.get_tile_texture(asset) is None:
                 missing.append(asset)
 
         if missing:
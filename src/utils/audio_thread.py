@@ -0,0 +1,104 @@
+#Audio worker - keeps audio file IO (opening & probing music streams) off the game thread
+#pyglet Players aren't thread safe & pyglet dispatches their end-of-stream handling on the main
+#event loop, so every Player call stays on the game thread: commands queue here & run in tick(),
+#once a frame, and only the loads run on the worker thread, handing their results back to tick()
+import threading
+import time
+from collections import deque
+
+class AudioWorker:
+
+    def __init__(self, on_tick=None, threaded=True):
+        #on_tick(delta_time) runs on the game thread at the end of every tick - the sound manager steps its fades there
+        self.commands = deque()  # (function, args) for the game thread - append & popleft are atomic, no lock needed
+        self.loads = deque()     # (load, args, done) for the worker thread
+        self.finished = deque()  # (done, result) of loads, back to the game thread
+        self.on_tick = on_tick
+        self.threaded = threaded
+        self.executed = 0
+        self.errors = 0
+
+        self._wake = threading.Event()
+        self._loading = False
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if not self.threaded or self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='audio-worker', daemon=True)
+        self._thread.start()
+
+    def post(self, function, *args):
+        #Queues function(*args) for the next tick() on the game thread - anything touching a Player goes here
+        self.commands.append((function, args))
+
+    def load(self, load, *args, done=None):
+        #Runs load(*args) on the worker thread, then done(result) on the game thread in a later tick()
+        #Loads must not touch Players or anything the game thread writes
+        if not self._running:
+            result = self._execute(load, args)
+            if done:
+                self.finished.append((done, result))
+            return
+        self.loads.append((load, args, done))
+        self._wake.set()
+
+    def tick(self, delta_time):
+        #Game thread, once a frame - finished loads, then queued commands, then on_tick
+        finished = self.finished
+        while finished:
+            done, result = finished.popleft()
+            self._execute(done, (result,))
+
+        commands = self.commands
+        while commands:
+            function, args = commands.popleft()
+            self._execute(function, args)
+
+        if self.on_tick:
+            self._execute(self.on_tick, (delta_time,))
+
+    def _execute(self, function, args):
+        try:
+            result = function(*args)
+            self.executed += 1
+            return result
+        except Exception as e:
+            self.errors += 1
+            print(f"Audio command {getattr(function, '__name__', function)} failed: {e}")
+            return None
+
+    def _run(self):
+        while self._running:
+            self._wake.wait()
+            self._wake.clear()
+
+            loads = self.loads
+            while loads:
+                self._loading = True
+                load, args, done = loads.popleft()
+                result = self._execute(load, args)
+                if done:
+                    self.finished.append((done, result))
+                self._loading = False
+
+    def flush(self, timeout=1.0):
+        #Waits (up to timeout) for pending loads, then runs everything queued - game thread only,
+        #for shutdown & tests, never per frame
+        deadline = time.perf_counter() + timeout
+        while (self.loads or self._loading) and time.perf_counter() < deadline:
+            self._wake.set()
+            time.sleep(0.001)
+        self.tick(0.0)
+        return not self.loads
+
+    def stop(self, timeout=1.0):
+        if not self._running:
+            return
+        self.flush(timeout)
+        self._running = False
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
@@ -0,0 +1,91 @@
+#Streamed music - tracks are decoded from disk a buffer at a time while they play,
+#so a track costs the player's small audio buffer instead of its whole length as PCM
+import arcade  # Before pyglet.media, arcade sets pyglet's options (headless etc.)
+from pyglet import media
+
+class LoopingStream(media.StreamingSource):
+    #Wraps a streamed track & rewinds it inside the same decode call when it runs out, so the
+    #player's buffer never drains between loops - Player.loop stops & requeues the source instead
+
+    def __init__(self, source):
+        self.source = source
+        self.audio_format = source.audio_format
+        self.video_format = None
+        self.info = source.info
+        self._duration = None  # Never ends
+        self.loops = 0
+
+    def get_audio_data(self, num_bytes, compensation_time=0.0):
+        data = self.source.get_audio_data(num_bytes)
+        if data is None:
+            self.source.seek(0)
+            self.loops += 1
+            data = self.source.get_audio_data(num_bytes)
+        return data
+
+    def seek(self, timestamp):
+        self.source.seek(timestamp)
+
+    def delete(self):
+        self.source.delete()
+
+def open_stream(path, loop=False):
+    #Opens & probes the file - IO, safe on the audio worker thread, unlike anything touching a Player
+    source = media.load(str(path), streaming=True)
+    return LoopingStream(source) if loop else source
+
+class MusicChannel:
+    #One playing track: its stream, player & the volume it's fading between
+    #Takes a stream from open_stream(), the player is made here so it belongs to the game thread
+
+    def __init__(self, name, stream, volume, fade_in=0.0):
+        self.name = name
+        self.target_volume = volume
+        self.stream = stream
+        self.player = media.Player()
+        self.player.volume = 0.0 if fade_in > 0 else volume
+        self.player.queue(self.stream)
+        self.player.play()
+
+        self.fade_from = self.player.volume
+        self.fade_to = volume
+        self.fade_time = fade_in
+        self.fade_elapsed = 0.0
+
+    @property
+    def fading(self):
+        return self.fade_elapsed < self.fade_time
+
+    def fade(self, volume, duration):
+        self.fade_from = self.player.volume
+        self.fade_to = volume
+        self.fade_time = duration
+        self.fade_elapsed = 0.0
+        if duration <= 0:
+            self.player.volume = volume
+
+    def update(self, delta_time):
+        #Steps the fade, returns False once a fade out has finished & the channel can go
+        if self.fading:
+            self.fade_elapsed = min(self.fade_time, self.fade_elapsed + delta_time)
+            t = self.fade_elapsed / self.fade_time
+            self.player.volume = self.fade_from + (self.fade_to - self.fade_from) * t
+        return self.fading or self.fade_to > 0
+
+    def set_volume(self, volume):
+        self.target_volume = volume
+        if not self.fading:
+            self.player.volume = volume
+        elif self.fade_to > 0:
+            self.fade_to = volume
+
+    def pause(self):
+        self.player.pause()
+
+    def resume(self):
+        self.player.play()
+
+    def stop(self):
+        self.player.pause()
+        self.player.delete()
+        self.stream.delete()
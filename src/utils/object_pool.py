@@ -0,0 +1,90 @@
+#Object pools - removed sprites are kept, reset & handed out again instead of constructed
+#A level restart or a mass spawn then reuses the instances the last one left behind, so it
+#doesn't allocate thousands of sprites (and their textures & hit boxes) in one frame
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import settings
+
+class ObjectPool:
+    #Spare instances of one class, item_class.reset() must take the same arguments as its constructor
+
+    def __init__(self, item_class, max_free=None, enabled=None):
+        self.item_class = item_class
+        self.max_free = settings.POOL_MAX_FREE if max_free is None else max_free
+        self.enabled = settings.OBJECT_POOLING if enabled is None else enabled
+        self.free = []
+
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+        self.discarded = 0  # Released past max_free, or while pooling is off
+
+    def __len__(self):
+        return len(self.free)
+
+    def acquire(self, *args, **kwargs):
+        if self.free:
+            item = self.free.pop()
+            item.in_pool = False
+            item.reset(*args, **kwargs)
+            self.reused += 1
+            return item
+
+        item = self.item_class(*args, **kwargs)
+        item.in_pool = False
+        self.created += 1
+        return item
+
+    def release(self, item):
+        #Only for items that are out of every sprite list & nothing else will touch again
+        if getattr(item, 'in_pool', False):
+            return False
+
+        if not self.enabled or len(self.free) >= self.max_free:
+            self.discarded += 1
+            return False
+
+        item.in_pool = True
+        self.free.append(item)
+        self.released += 1
+        return True
+
+    def release_all(self, items):
+        for item in items:
+            self.release(item)
+
+    def prewarm(self, count, *args, **kwargs):
+        #Builds spares ahead of time, e.g. behind a loading screen
+        while len(self.free) < min(count, self.max_free):
+            item = self.item_class(*args, **kwargs)
+            item.in_pool = True
+            self.free.append(item)
+            self.created += 1
+
+    def clear(self):
+        self.free.clear()
+
+    def get_stats(self):
+        return {
+            'free': len(self.free),
+            'created': self.created,
+            'reused': self.reused,
+            'released': self.released,
+            'discarded': self.discarded
+        }
+
+#Shared pools, one per class, so every spawn path for a class draws from the same spares
+_pools = {}
+
+def get_pool(item_class):
+    pool = _pools.get(item_class)
+    if pool is None:
+        pool = ObjectPool(item_class)
+        _pools[item_class] = pool
+    return pool
+
+def is_poolable(item_class):
+    return callable(getattr(item_class, 'reset', None))
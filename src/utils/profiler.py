@@ -0,0 +1,107 @@
+#Frame-time profiler - per-subsystem timings with rolling percentiles
+import sys
+import os
+import time
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import settings
+
+MAX_STAGES = 32
+
+def _noop(*args):
+    pass
+
+class FrameProfiler:
+    #Lap timer - mark(name) charges the time since the previous start()/mark() to stage `name`
+    #Stages are summed over a frame (several ticks can run per frame) and end_frame() stores the
+    #frame's totals in a ring buffer of the last `history` frames
+    #Disabled, start/mark/end_frame are bound to a no-op so instrumented code costs one call per mark
+
+    def __init__(self, history=None, enabled=None):
+        self.history = history or settings.PROFILER_HISTORY
+
+        self.stages = {}  # name -> column, in first-seen order
+        self.samples = np.zeros((self.history, MAX_STAGES))  # Milliseconds per frame & stage
+        self.current = [0.0] * MAX_STAGES
+        self.frames = 0  # Frames recorded so far, samples row is frames % history
+        self._last = 0.0
+
+        self.set_enabled(settings.PROFILER_ENABLED if enabled is None else enabled)
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        self.current = [0.0] * MAX_STAGES
+
+        if enabled:
+            self.start = self._start
+            self.mark = self._mark
+            self.end_frame = self._end_frame
+        else:
+            self.start = self.mark = self.end_frame = _noop
+
+    def toggle(self):
+        self.set_enabled(not self.enabled)
+        return self.enabled
+
+    def _start(self):
+        self._last = time.perf_counter()
+
+    def _mark(self, name):
+        now = time.perf_counter()
+        column = self.stages.get(name)
+        if column is None:
+            column = self._add_stage(name)
+
+        self.current[column] += now - self._last
+        self._last = now
+
+    def _add_stage(self, name):
+        if len(self.stages) >= MAX_STAGES:
+            raise ValueError(f"Profiler supports at most {MAX_STAGES} stages")
+        self.stages[name] = len(self.stages)
+        return self.stages[name]
+
+    def _end_frame(self):
+        row = self.frames % self.history
+        self.samples[row] = self.current
+        self.samples[row] *= 1000.0
+        self.current = [0.0] * MAX_STAGES
+        self.frames += 1
+
+    def reset(self):
+        self.samples.fill(0.0)
+        self.current = [0.0] * MAX_STAGES
+        self.frames = 0
+
+    def recent(self):
+        #(frames, stages) array of the stored frames, oldest first
+        count = min(self.frames, self.history)
+        if count < self.history:
+            return self.samples[:count, :len(self.stages)]
+
+        row = self.frames % self.history
+        return np.roll(self.samples, -row, axis=0)[:, :len(self.stages)]
+
+    def percentiles(self, quantiles=(50, 95, 99)):
+        #name -> (p50, p95, p99) in ms over the stored frames, 'frame' is the whole frame
+        samples = self.recent()
+        if not len(samples):
+            return {}
+
+        results = {}
+        names = list(self.stages) + ['frame']
+        columns = np.column_stack((samples, samples.sum(axis=1)))
+        values = np.percentile(columns, quantiles, axis=0)
+
+        for column, name in enumerate(names):
+            results[name] = tuple(float(value) for value in values[:, column])
+        return results
+
+    def summary(self):
+        #Plain text table, for headless runs & logs
+        lines = [f"{'stage':<16}{'p50':>8}{'p95':>8}{'p99':>8}  (ms over {min(self.frames, self.history)} frames)"]
+        for name, (p50, p95, p99) in self.percentiles().items():
+            lines.append(f"{name:<16}{p50:>8.3f}{p95:>8.3f}{p99:>8.3f}")
+        return "\n".join(lines)
@@ -9,6 +9,9 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import settings
+from utils.music_stream import MusicChannel, open_stream
+from utils.voice_pool import VoicePool
+from utils.audio_thread import AudioWorker
 
 class SoundManager:
     
@@ -18,13 +21,18 @@ class SoundManager:
         self.music_volume = settings.MUSIC_VOLUME
         self.sound_enabled = settings.ENABLE_SOUND
 
-        self.current_music = None
+        #What should be playing - owned by the game thread
         self.paused_music_name = None
         self.current_music_name = None
-        self.music_player = None
         self.music_loop = False
 
-        self.active_sounds: Dict[str, List] = {}
+        #Players & streams - only touched on the game thread, from commands run by worker.tick()
+        self.current_music = None  # MusicChannel of the track playing now
+        self.fading_music: List[MusicChannel] = []  # Old tracks fading out under the current one
+        self.voice_pool = VoicePool(settings.SOUND_VOICES)
+        self.worker = AudioWorker(on_tick=self._update_fades, threaded=settings.AUDIO_THREAD)
+        self.music_loads = 0  # Streams being opened on the worker
+        self.worker.start()
         self.sound_cooldowns: Dict[str, float] = {}
         self.last_played: Dict[str, float] = {}
 
@@ -32,18 +40,18 @@ class SoundManager:
         
         self.sound_configs = {
             #Player
-            'jump': {'cooldown': 0.1, 'priority': 'high'},
+            'jump': {'cooldown': 0.1, 'priority': 'high', 'max_instances': 2},
             'land': {'cooldown': 0.2, 'priority': 'medium'},
             'run': {'cooldown': 0.3, 'priority': 'low'},
             'death': {'cooldown': 1.0, 'priority': 'critical'},
 
             #Collection
-            'coin': {'cooldown': 0.05, 'priority': 'high'},
+            'coin': {'cooldown': 0.05, 'priority': 'high', 'max_instances': 3},
             'powerup': {'cooldown': 0.5, 'priority': 'high'},
             'life': {'cooldown': 1.0, 'priority': 'critical'},
 
             #Enemy
-            'stomp': {'cooldown': 0.1, 'priority': 'high'},
+            'stomp': {'cooldown': 0.1, 'priority': 'high', 'max_instances': 3},
             'enemy_death': {'cooldown': 0.2, 'priority': 'medium'},
             'enemy_hit': {'cooldown': 0.1, 'priority': 'medium'},
 
@@ -54,7 +62,7 @@ class SoundManager:
 
             #UI
             'menu_select': {'cooldown': 0.2, 'priority': 'medium'},
-            'menu_move': {'cooldown': 0.1, 'priority': 'low'},
+            'menu_move': {'cooldown': 0.1, 'priority': 'low', 'max_instances': 1},
             'pause': {'cooldown': 0.3, 'priority': 'medium'},
             'unpause': {'cooldown': 0.3, 'priority': 'medium'},
 
@@ -86,53 +94,51 @@ class SoundManager:
         return True
 
     def play_sound(self, sound_name: str, volume_override: Optional[float] = None, force_play: bool = False) -> bool:
+        #Cooldowns & the sound lookup happen here, the voice work is queued for worker.tick()
+        #The AssetLoader isn't thread safe - under LAZY_ASSETS a lookup may decode & store the sound
         if not self.sound_enabled or not self.asset_loader:
             print(f"Warning: Unconfigured sound: {sound_name}")
             return False
         
         current_time = time.time()
+        config = self.sound_configs.get(sound_name, {})
 
         if not force_play and sound_name in self.last_played:
-            cooldown = self.sound_configs.get(sound_name, {}).get('cooldown', 0.1)
+            cooldown = config.get('cooldown', 0.1)
             if (current_time - self.last_played.get(sound_name, 0)) < cooldown:
                 return False
-            
-        sound = self.asset_loader.get_sound(sound_name)
-        if not sound:
-            if settings.DEBUG_MODE:
-                print(f"Sound not found: {sound_name}")
-            return False
         
         final_volume = volume_override if volume_override is not None else 1.0
         final_volume *= self.sfx_volume * self.master_volume
         final_volume = max(0.0, min(1.0, final_volume))
-        
-
-        try:
-            arcade.play_sound(sound, volume=final_volume)
-            self.last_played[sound_name] = current_time
-
-            if sound_name not in self.active_sounds:
-                self.active_sounds[sound_name] = []
-            self.active_sounds[sound_name].append(current_time)
 
+        sound = self.asset_loader.get_sound(sound_name)
+        if not sound:
             if settings.DEBUG_MODE:
-                print(f"Played sound: {sound_name} at volume {final_volume:.2f}")
-
-            return True
-        except Exception as e:
-            print(f"Error playing sound {sound_name}: {e}")
+                print(f"Sound not found: {sound_name}")
             return False
+
+        self.last_played[sound_name] = current_time
+        self.worker.post(
+            self._play_sound_now, sound_name, sound, final_volume,
+            config.get('priority', 'medium'), config.get('max_instances', settings.SOUND_MAX_INSTANCES)
+        )
+        return True
+
+    def _play_sound_now(self, sound_name: str, sound: arcade.Sound, volume: float, priority: str, max_instances: int):
+        if self.voice_pool.play(sound_name, sound, volume, priority, max_instances) and settings.DEBUG_MODE:
+            print(f"Played sound: {sound_name} at volume {volume:.2f}")
         
-    def play_music(self, music_name: str, volume_override: Optional[float] = None) -> bool:
+    def play_music(self, music_name: str, volume_override: Optional[float] = None, crossfade: Optional[float] = None) -> bool:
+        #Streams the track from disk, fading out whatever was playing over crossfade seconds
         if not self.sound_enabled or not self.asset_loader:
             return False
-        
-        self.stop_music()
 
-        music_key = f"music_{music_name}"
-        music = self.asset_loader.get_sound(music_key)
-        if not music:
+        if music_name == self.current_music_name and not self.paused_music_name:
+            return True
+
+        music_path = self.asset_loader.get_music_path(music_name)
+        if not music_path:
             if settings.DEBUG_MODE:
                 print(f"Music not found: {music_name}")
             return False
@@ -144,55 +150,86 @@ class SoundManager:
         target_volume *= self.music_volume * self.master_volume
         target_volume = max(0.0, min(1.0, target_volume))
 
-        try:
-            if should_loop:
-                self.music_player = arcade.play_sound(music, volume=target_volume, looping=True)
-            else:
-                self.music_player = arcade.play_sound(music, volume=target_volume)
+        fade_time = settings.MUSIC_CROSSFADE if crossfade is None else crossfade
+        if not self.current_music_name or self.paused_music_name:
+            fade_time = 0.0
 
-            self.current_music = music
-            self.current_music_name = music_name
-            self.music_loop = should_loop
+        self.current_music_name = music_name
+        self.paused_music_name = None
+        self.music_loop = should_loop
+        self.music_loads += 1
+        self.worker.load(
+            open_stream, music_path, should_loop,
+            done=lambda stream: self._start_music(music_name, stream, target_volume, fade_time)
+        )
+        return True
 
+    def _start_music(self, music_name: str, stream, volume: float, fade_time: float):
+        #Game thread, once the worker has opened the stream
+        self.music_loads -= 1
+        if stream is None:
+            print(f"Error playing music {music_name}: stream could not be opened")
+            return
+
+        #Stopped or replaced while the stream was opening
+        if music_name != self.current_music_name:
+            stream.delete()
+            return
+
+        self._fade_out_music(fade_time)
+        try:
+            self.current_music = MusicChannel(music_name, stream, volume, fade_in=fade_time)
+            if self.paused_music_name:
+                self.current_music.pause()
             print(f"Started playing music: {music_name}")
-            return True
-        
         except Exception as e:
             print(f"Error playing music {music_name}: {e}")
-            return False
-        
-    def stop_music(self):
+
+    def _fade_out_music(self, fade_time: float):
         if not self.current_music:
             return
 
-        try:
-            if self.music_player:
-                self.music_player.delete()
-            self.current_music = None
-            self.current_music_name = None
-            self.music_player = None
-            self.music_loop = False
-            print("music stopped")
-        except Exception as e:
-            print(f"Error stopping music: {e}")
+        if fade_time > 0:
+            self.current_music.fade(0.0, fade_time)
+            self.fading_music.append(self.current_music)
+        else:
+            self.current_music.stop()
+        self.current_music = None
+        
+    def stop_music(self, fade_time: float = 0.0):
+        if not self.current_music_name:
+            return
+
+        self.current_music_name = None
+        self.paused_music_name = None
+        self.music_loop = False
+        self.worker.post(self._fade_out_music, fade_time)
+        print("music stopped")
 
     def pause_music(self):
-        if self.music_player and self.current_music_name:
+        #Keeps the stream where it is, resume_music carries on from there
+        if self.current_music_name and not self.paused_music_name:
             self.paused_music_name = self.current_music_name
-            self.stop_music()
+            self.worker.post(self._pause_music_now)
             print(f"music paused: {self.current_music_name}")
 
+    def _pause_music_now(self):
+        if self.current_music:
+            self.current_music.pause()
+
     def resume_music(self):
-        if hasattr(self, 'paused_music_name') and self.paused_music_name:
-            self.play_music(self.paused_music_name)
-            self.current_music_name = self.paused_music_name
+        if self.paused_music_name:
+            self.paused_music_name = None
+            self.worker.post(self._resume_music_now)
             print(f"Music resumed: {self.current_music_name}")
-        elif self.current_music_name:
-            self.play_music(self.current_music_name)
-            print(f"Starting: {self.current_music_name}")
+
+    def _resume_music_now(self):
+        if self.current_music:
+            self.current_music.resume()
 
     def set_master_volume(self, volume: float):
         self.master_volume = max(0.0, min(1.0, volume))
+        self.worker.post(self._set_music_volume_now, self.music_volume * self.master_volume)
         print(f"Master volume set to {self.master_volume:.2f}")
 
     def set_sfx_volume(self, volume: float):
@@ -201,43 +238,57 @@ class SoundManager:
 
     def set_music_volume(self, volume: float):
         self.music_volume = max(0.0, min(1.0, volume))
+        self.worker.post(self._set_music_volume_now, self.music_volume * self.master_volume)
         print(f"Music volume set to {self.music_volume:.2f}")
 
+    def _set_music_volume_now(self, volume: float):
+        if self.current_music:
+            self.current_music.set_volume(volume)
+
     def toggle_sound(self) -> bool:
         self.sound_enabled = not self.sound_enabled
         if not self.sound_enabled:
             self.stop_music()
+            self.worker.post(self._silence_now)
         print(f"Sound {'enabled' if self.sound_enabled else 'disabled'}")
         return self.sound_enabled
-    
-    def cleanup_old_sounds(self):
-        current_time = time.time()
-        cleanup_threshold = 5.0
-
-        for sound_name in list(self.active_sounds.keys()):
-            self.active_sounds[sound_name] = [
-                timestamp for timestamp in self.active_sounds[sound_name]
-                if current_time - timestamp < cleanup_threshold
-            ]
-
-            if not self.active_sounds[sound_name]:
-                del self.active_sounds[sound_name]
 
+    def _silence_now(self):
+        self.voice_pool.stop_all()
+        for channel in self.fading_music:
+            channel.stop()
+        self.fading_music.clear()
+    
     def get_sound_info(self) -> Dict:
         return {
             'sound_enabled': self.sound_enabled,
             'current_music': self.current_music_name,
             'music_looping': self.music_loop,
-            'active_sounds': len(self.active_sounds),
+            'active_sounds': self.voice_pool.active_count(),
+            'voice_pool': self.voice_pool.get_stats(),
+            'audio_thread': self.worker.threaded,
+            'queued_commands': len(self.worker.commands),
+            'music_loads': self.music_loads,
         }
     
     def update(self, delta_time: float):
-        if hasattr(self, '_last_cleanup'):
-            if time.time() - self._last_cleanup > 1.0:
-                self.cleanup_old_sounds()
-                self._last_cleanup = time.time()
-        else:
-            self._last_cleanup = time.time()
+        #Once a frame on the game thread - runs queued player commands & finished loads, then steps the fades
+        self.worker.tick(delta_time)
+
+    def _update_fades(self, delta_time: float):
+        if self.current_music and self.current_music.fading:
+            self.current_music.update(delta_time)
+        if self.fading_music:
+            still_fading = []
+            for channel in self.fading_music:
+                if channel.update(delta_time):
+                    still_fading.append(channel)
+                else:
+                    channel.stop()
+            self.fading_music = still_fading
+
+    def shutdown(self):
+        self.worker.stop()
 
     def preload_level_sounds(self, level_type: str):
         level_sound_sets = {
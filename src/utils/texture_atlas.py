@@ -0,0 +1,103 @@
+#Sprite atlas - packs the small sprite textures into the GPU atlas up front, looked up by asset name
+import arcade
+
+def shelf_pack(sizes, width, border=1):
+    #Places (w, h) rects left to right in shelves, returns [(x, y)] or None if they don't fit in width x width
+    #sizes should come tallest first, that's what keeps the shelves tight
+    positions = []
+    x = y = shelf_height = 0
+    for w, h in sizes:
+        w += border * 2
+        h += border * 2
+        if x + w > width:
+            x = 0
+            y += shelf_height
+            shelf_height = 0
+        if w > width or y + h > width:
+            return None
+
+        positions.append((x + border, y + border))
+        x += w
+        shelf_height = max(shelf_height, h)
+    return positions
+
+def atlas_side(sizes, border=1, minimum=256, maximum=4096):
+    #Smallest power of two square the sizes shelf-pack into
+    side = minimum
+    while side <= maximum:
+        if shelf_pack(sizes, side, border) is not None:
+            return side
+        side *= 2
+    return maximum
+
+class SpriteAtlas:
+    #arcade draws every SpriteList through one texture atlas, but fills it lazily - each new texture
+    #is allocated (and the atlas possibly grown & rebuilt) the first frame it's drawn
+    #This adds all tile, sprite & UI textures in one pass at startup, tallest first, into an atlas
+    #already big enough to hold them, and keeps each asset's region so UVs can be looked up by name
+
+    def __init__(self, textures, atlas=None):
+        #textures - asset name -> arcade.Texture, atlas defaults to the window's shared atlas
+        self.atlas = atlas if atlas is not None else arcade.get_window().ctx.default_atlas
+        self.textures = {}
+        self.regions = {}
+
+        self.add(textures)
+
+    def add(self, textures):
+        #Packs more textures (a group loaded later), tallest first, growing the atlas once if needed
+        #Same pixels under several names (player_small/player_big) only take one slot
+        unique = {}
+        for name, texture in textures.items():
+            self.textures[name] = texture
+            if not self.atlas.has_texture(texture):
+                unique.setdefault(texture.atlas_name, texture)
+
+        if not unique:
+            for name, texture in textures.items():
+                self.regions[name] = self.atlas.get_texture_region_info(texture.atlas_name)
+            return
+
+        #Sized for everything packed so far, so the atlas doesn't have to grow one texture at a time
+        packed = {texture.atlas_name: texture for texture in self.textures.values()}
+        ordered = sorted(unique.values(), key=lambda texture: (-texture.height, -texture.width, texture.atlas_name))
+        side = atlas_side(
+            sorted((texture.size for texture in packed.values()), key=lambda size: (-size[1], -size[0])),
+            self.atlas.border
+        )
+        if side > self.atlas.width or side > self.atlas.height:
+            self.atlas.resize((max(side, self.atlas.width), max(side, self.atlas.height)))
+
+        for texture in ordered:
+            self.atlas.add(texture)
+
+        for name, texture in textures.items():
+            self.regions[name] = self.atlas.get_texture_region_info(texture.atlas_name)
+
+    def __contains__(self, name):
+        return name in self.regions
+
+    def region(self, name):
+        #AtlasRegion (pixel x, y, width, height in the atlas) or None
+        return self.regions.get(name)
+
+    def uv(self, name):
+        #(u0, v0, u1, v1) of the asset inside the atlas texture, or None
+        region = self.regions.get(name)
+        if region is None:
+            return None
+
+        coords = region.texture_coordinates
+        return (min(coords[0::2]), min(coords[1::2]), max(coords[0::2]), max(coords[1::2]))
+
+    def get_stats(self):
+        used = sum(region.width * region.height for region in {id(r): r for r in self.regions.values()}.values())
+        return {
+            'assets': len(self.regions),
+            'atlas_size': self.atlas.size,
+            'fill': used / (self.atlas.width * self.atlas.height)
+        }
+
+    def save(self, path):
+        #Atlas image for eyeballing the packing
+        self.atlas.save(path)
@@ -0,0 +1,111 @@
+#Persistent texture cache - resized & placeholder textures kept as raw RGBA on disk
+#Entries are content addressed: the file name is a hash of the source file's bytes, the target size
+#and the resample policy, so editing an asset (or changing the policy) simply misses the old entry
+#
+#Entry layout (little endian):
+#   header      magic, version, width, height, hit box point count
+#   hash        64 byte hex sha256 of the pixels - arcade's atlas key, saved so it isn't recomputed
+#   hit box     point count * (x, y) float pairs
+#   pixels      width * height * 4 bytes RGBA, memory-mapped on load
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import arcade
+from PIL import Image
+
+MAGIC = b'BTEX'
+VERSION = 1
+EXTENSION = '.rgba'
+
+HEADER = struct.Struct('<4sHHHH')
+HASH_SIZE = 64
+POINT = struct.Struct('<ff')
+
+#Must change whenever AssetLoader._resize_image picks filters differently
+RESAMPLE_POLICY = 'lanczos-down/bicubic-up'
+
+class TextureCache:
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def file_key(source_bytes, size, resample=RESAMPLE_POLICY):
+        digest = hashlib.sha256(source_bytes)
+        digest.update(f"|{size[0]}x{size[1]}|{resample}|{VERSION}".encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def placeholder_key(size, color):
+        return hashlib.sha256(f"placeholder|{size[0]}x{size[1]}|{tuple(color)}|{VERSION}".encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + EXTENSION)
+
+    def load(self, key):
+        #Texture for key or None - the pixels stay in a read-only mapping of the entry
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        try:
+            magic, version, width, height, point_count = HEADER.unpack_from(mapping)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("stale entry")
+
+            offset = HEADER.size
+            pixel_hash = bytes(mapping[offset:offset + HASH_SIZE]).decode('ascii')
+            offset += HASH_SIZE
+
+            points = [POINT.unpack_from(mapping, offset + i * POINT.size) for i in range(point_count)]
+            offset += point_count * POINT.size
+
+            if len(mapping) != offset + width * height * 4:
+                raise ValueError("truncated entry")
+            image = Image.frombuffer('RGBA', (width, height), memoryview(mapping)[offset:], 'raw', 'RGBA', 0, 1)
+        except (struct.error, ValueError, UnicodeDecodeError):
+            mapping.close()
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return arcade.Texture(image, hash=pixel_hash, hit_box_points=points)
+
+    def store(self, key, texture):
+        #Writes texture's pixels, hash & hit box - failures only cost the next start a decode
+        image = texture.image
+        if image.mode != 'RGBA':
+            image = image.convert('RGBA')
+
+        points = texture.hit_box_points
+        data = bytearray(HEADER.pack(MAGIC, VERSION, image.width, image.height, len(points)))
+        data += texture.image_data.hash.encode('ascii').ljust(HASH_SIZE, b'\0')[:HASH_SIZE]
+        for x, y in points:
+            data += POINT.pack(x, y)
+        data += image.tobytes()
+
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Could not write texture cache entry {path}: {e}")
+            return False
+        return True
+
+    def clear(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(EXTENSION):
+                    os.remove(os.path.join(root, name))
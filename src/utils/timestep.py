@@ -0,0 +1,115 @@
+#Fixed timestep scheduling & render interpolation
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import settings
+
+class FixedTimestep:
+    #Accumulates real frame time & runs the simulation in constant-size ticks
+    #Frame drops are caught up with extra ticks, up to max_steps per frame
+
+    def __init__(self, step=None, max_steps=None):
+        self.step = step or settings.FIXED_TIMESTEP
+        self.max_steps = max_steps or settings.MAX_CATCH_UP_STEPS
+
+        self.accumulator = 0.0
+        self.total_steps = 0
+        self.dropped_time = 0.0  # Time thrown away once the catch-up budget ran out
+
+    def advance(self, delta_time, step_function):
+        #Calls step_function(step) once per due tick, stops early if it returns False
+        self.accumulator += delta_time
+        steps = 0
+
+        while self.accumulator >= self.step:
+            if steps >= self.max_steps:
+                #Too far behind (breakpoint, window drag) - drop the backlog instead of spiralling
+                backlog = self.accumulator - (self.accumulator % self.step)
+                self.dropped_time += backlog
+                self.accumulator -= backlog
+                break
+
+            if step_function(self.step) is False:
+                self.accumulator = 0.0
+                break
+
+            self.accumulator -= self.step
+            self.total_steps += 1
+            steps += 1
+
+        return steps
+
+    @property
+    def alpha(self):
+        #How far the renderer is between the last two ticks, 0.0 - 1.0
+        return min(1.0, self.accumulator / self.step)
+
+    def reset(self):
+        self.accumulator = 0.0
+
+class RenderInterpolator:
+    #Remembers positions from before the latest tick so drawing can blend between ticks
+
+    def __init__(self, snap_distance=None):
+        self.snap_distance = snap_distance or settings.INTERPOLATION_SNAP_DISTANCE
+
+        self.previous_positions = {}
+        self.previous_camera = None
+        self.camera = None
+
+        self._restore_positions = []
+        self._restore_camera = None
+
+    def capture(self, sprite_lists, camera=None):
+        #Call right before each simulation tick
+        self.previous_positions = {
+            sprite: (sprite.center_x, sprite.center_y)
+            for sprite_list in sprite_lists
+            for sprite in sprite_list
+        }
+
+        self.camera = camera
+        self.previous_camera = tuple(camera.position) if camera else None
+
+    def apply(self, alpha):
+        #Moves everything to its blended position, restore() puts the real ones back
+        self._restore_positions = []
+
+        for sprite, (prev_x, prev_y) in self.previous_positions.items():
+            x, y = sprite.center_x, sprite.center_y
+            dx = x - prev_x
+            dy = y - prev_y
+
+            #Teleports (respawns, warps) should not smear across the screen
+            if abs(dx) > self.snap_distance or abs(dy) > self.snap_distance:
+                continue
+
+            self._restore_positions.append((sprite, x, y))
+            sprite.center_x = prev_x + dx * alpha
+            sprite.center_y = prev_y + dy * alpha
+
+        if self.camera and self.previous_camera:
+            current_x, current_y = self.camera.position
+            prev_x, prev_y = self.previous_camera
+            self._restore_camera = (current_x, current_y)
+            self.camera.position = (
+                prev_x + (current_x - prev_x) * alpha,
+                prev_y + (current_y - prev_y) * alpha
+            )
+
+    def restore(self):
+        for sprite, x, y in self._restore_positions:
+            sprite.center_x = x
+            sprite.center_y = y
+        self._restore_positions = []
+
+        if self._restore_camera is not None:
+            self.camera.position = self._restore_camera
+            self._restore_camera = None
+
+    def clear(self):
+        self.previous_positions = {}
+        self.previous_camera = None
+        self.camera = None
@@ -0,0 +1,103 @@
+#Voice pool - a fixed set of players every sound effect plays through
+#A burst of requests (a coin line, a mass stomp) retriggers or steals voices instead of
+#creating a new audio player per play
+import time
+import arcade  # Before pyglet.media, arcade sets pyglet's options (headless etc.)
+from pyglet import media
+
+PRIORITIES = {'low': 0, 'medium': 1, 'high': 2, 'critical': 3}
+
+class Voice:
+    __slots__ = ('player', 'sound_name', 'priority', 'started')
+
+    def __init__(self):
+        self.player = media.Player()
+        self.sound_name = None
+        self.priority = 0
+        self.started = 0.0
+
+    @property
+    def busy(self):
+        #The player drops its source once it runs out
+        return self.player.source is not None
+
+    def start(self, sound_name, sound, volume, priority):
+        player = self.player
+        if self.busy and self.sound_name == sound_name:
+            player.pause()
+            player.seek(0.0)  # Same source - keeps the driver player & its buffers
+        else:
+            if self.busy:
+                player.pause()
+                player.next_source()
+            player.queue(sound.source)
+
+        player.volume = volume
+        player.play()
+        self.sound_name = sound_name
+        self.priority = priority
+        self.started = time.perf_counter()
+
+    def stop(self):
+        if self.busy:
+            self.player.pause()
+            self.player.next_source()
+        self.sound_name = None
+
+class VoicePool:
+
+    def __init__(self, size):
+        self.size = size
+        self.voices = []  # Players are made as needed, up to size
+        self.played = 0
+        self.retriggered = 0
+        self.stolen = 0
+        self.dropped = 0
+
+    def play(self, sound_name, sound, volume, priority='medium', max_instances=None):
+        #Plays sound on a voice, returns it or None if every voice is busy with something more important
+        #Past max_instances the oldest instance of the same sound restarts rather than layering another
+        rank = PRIORITIES.get(priority, 1)
+        now_playing = [voice for voice in self.voices if voice.busy]
+
+        voice = None
+        if max_instances:
+            same = [voice for voice in now_playing if voice.sound_name == sound_name]
+            if len(same) >= max_instances:
+                voice = min(same, key=lambda voice: voice.started)
+                self.retriggered += 1
+
+        if voice is None:
+            voice = next((voice for voice in self.voices if not voice.busy), None)
+        if voice is None and len(self.voices) < self.size:
+            voice = Voice()
+            self.voices.append(voice)
+        if voice is None:
+            #Steal the lowest priority, oldest voice - never one that outranks the new sound
+            candidates = [voice for voice in now_playing if voice.priority <= rank]
+            if not candidates:
+                self.dropped += 1
+                return None
+            voice = min(candidates, key=lambda voice: (voice.priority, voice.started))
+            self.stolen += 1
+
+        voice.start(sound_name, sound, volume, rank)
+        self.played += 1
+        return voice
+
+    def active_count(self, sound_name=None):
+        return sum(1 for voice in self.voices if voice.busy and (sound_name is None or voice.sound_name == sound_name))
+
+    def stop_all(self):
+        for voice in self.voices:
+            voice.stop()
+
+    def get_stats(self):
+        return {
+            'voices': len(self.voices),
+            'active': self.active_count(),
+            'played': self.played,
+            'retriggered': self.retriggered,
+            'stolen': self.stolen,
+            'dropped': self.dropped
+        }